@@ -0,0 +1,34 @@
+# 팔로워/팔로잉 목록 보조 조회
+# "내가 팔로우하는 사람 중 이 회원을 팔로우하는 사람" 힌트를 페이지 단위로 한 번에 계산합니다.
+# 페이지에 나온 회원 id로 (following, id) 인덱스 범위를 잡고, 윈도우 함수로 회원마다 전체 수와 앞의 몇 명만 남깁니다.
+from django.db.models import Count, F, Window
+from django.db.models.functions import RowNumber
+
+from diaries.models import Follow
+
+FOLLOWED_BY_SAMPLE_SIZE = 3
+
+
+def followed_by(viewer, member_ids, sample_size=FOLLOWED_BY_SAMPLE_SIZE):
+    # {회원 id: {'count': 내가 팔로우하는 사람 중 그 회원의 팔로워 수, 'members': 최근 팔로우한 순서로 몇 명의 user_id}}
+    if not member_ids:
+        return {}
+    rows = (
+        Follow.objects.filter(
+            following_id__in=member_ids,
+            follower_id__in=Follow.objects.filter(follower_id=viewer.id).values('following_id'),
+            follower__deleted_at__isnull=True,
+        )
+        .annotate(
+            rank=Window(RowNumber(), partition_by=[F('following_id')], order_by=F('id').desc()),
+            total=Window(Count('id'), partition_by=[F('following_id')]),
+        )
+        .filter(rank__lte=sample_size)
+        .order_by('following_id', 'rank')
+        .values_list('following_id', 'follower__user_id', 'total')
+    )
+    result = {}
+    for member_id, user_id, total in rows:
+        entry = result.setdefault(member_id, {'count': total, 'members': []})
+        entry['members'].append(user_id)
+    return result
@@ -0,0 +1,27 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from accounts.models import DeletionJob
+from accounts.purge import run_job
+
+
+class Command(BaseCommand):
+    help = '삭제 표시된 일기/게시물/회원의 연관 데이터를 작은 배치로 나눠 실제로 삭제합니다. 중단되면 저장된 단계부터 이어서 진행합니다.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500, help='한 트랜잭션에서 삭제할 최대 행 수')
+        parser.add_argument('--max-seconds', type=float, default=0, help='이 시간(초)이 지나면 멈춤 (0이면 제한 없음)')
+        parser.add_argument('--watch', type=float, default=0, help='지정하면 이 간격(초)으로 새 작업을 계속 확인')
+
+    def handle(self, *args, **options):
+        deadline = time.monotonic() + options['max_seconds'] if options['max_seconds'] else None
+        while True:
+            for job in DeletionJob.objects.filter(finished_at__isnull=True).order_by('id'):
+                finished = run_job(job, batch_size=options['batch_size'], deadline=deadline)
+                self.stdout.write(f'{job} {"완료" if finished else "중단"}')
+                if not finished:
+                    return
+            if not options['watch']:
+                break
+            time.sleep(options['watch'])
@@ -0,0 +1,44 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from accounts.models import MemberStats, RecommendationRun
+from accounts.recommendations import TOP_K, FollowGraph, affected_members, store
+
+
+class Command(BaseCommand):
+    help = (
+        '팔로우 그래프로 "알 수도 있는 사람"을 계산해서 회원마다 상위 K명을 저장합니다. '
+        '기본은 마지막 실행 이후 팔로우가 바뀐 회원과 그 팔로워만 다시 계산합니다. 주기적으로 실행합니다.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--full', action='store_true', help='모든 회원을 다시 계산')
+        parser.add_argument('--top-k', type=int, default=TOP_K, help='회원마다 저장할 추천 수')
+
+    def handle(self, *args, **options):
+        started = timezone.now()  # 실행 중에 바뀐 팔로우는 다음 실행에서 다시 계산되도록 시작 시각을 기록
+        last_run = RecommendationRun.objects.filter(finished_at__isnull=False).order_by('-started_at').first()
+        full = options['full'] or last_run is None
+        run = RecommendationRun.objects.create(full=full, started_at=started)
+
+        clock = time.perf_counter()
+        if full:
+            graph = FollowGraph()
+            member_ids = [member_id for member_id, pet_type in enumerate(graph.pet_types) if pet_type]
+        else:
+            changed = MemberStats.objects.filter(following_changed_at__gte=last_run.started_at).values_list('member_id', flat=True)
+            member_ids = affected_members(changed)
+            graph = FollowGraph(member_ids)
+        self.stdout.write(
+            f'그래프 로드: 팔로우 {len(graph.indices):,}건, {graph.nbytes / 1024 / 1024:.1f}MB, {time.perf_counter() - clock:.1f}초'
+        )
+
+        clock = time.perf_counter()
+        run.member_count = store(graph, member_ids, options['top_k'])
+        run.finished_at = timezone.now()
+        run.save(update_fields=['member_count', 'finished_at'])
+        self.stdout.write(self.style.SUCCESS(
+            f'{"전체" if full else "증분"} 계산: 회원 {run.member_count:,}명 추천 저장, {time.perf_counter() - clock:.1f}초'
+        ))
@@ -0,0 +1,42 @@
+from django.core.management.base import BaseCommand
+from django.db.models import F, Q
+
+from accounts.models import MemberStats
+from accounts.stats import STAT_FIELDS, actual_counts
+from users.models import Member
+
+
+class Command(BaseCommand):
+    help = '일기/팔로우 테이블을 기준으로 MemberStats를 다시 계산합니다. 없는 행은 만들고 어긋난 값만 고칩니다.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help='한 번에 검사할 회원 수')
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        drifted = Q()
+        for field in STAT_FIELDS:
+            drifted |= ~Q(**{f'stats__{field}': F(f'actual_{field}')})
+        annotations = {f'actual_{field}': expression for field, expression in actual_counts().items()}
+
+        last_id, checked, created, fixed = 0, 0, 0, 0
+        while True:
+            ids = list(Member.objects.filter(id__gt=last_id).order_by('id').values_list('id', flat=True)[:batch_size])
+            if not ids:
+                break
+            rows = list(Member.objects.filter(id__in=ids).annotate(**annotations).filter(Q(stats__isnull=True) | drifted).values(
+                'id', 'stats__member', *annotations,
+            ))
+            missing = [row for row in rows if row['stats__member'] is None]
+            MemberStats.objects.bulk_create([
+                MemberStats(member_id=row['id'], **{field: row[f'actual_{field}'] for field in STAT_FIELDS}) for row in missing
+            ], ignore_conflicts=True)
+            for row in rows:
+                if row['stats__member'] is not None:
+                    MemberStats.objects.filter(member_id=row['id']).update(**{field: row[f'actual_{field}'] for field in STAT_FIELDS})
+            created += len(missing)
+            fixed += len(rows) - len(missing)
+            checked += len(ids)
+            last_id = ids[-1]
+
+        self.stdout.write(self.style.SUCCESS(f'{checked}명 검사, 통계 {created}개 생성, {fixed}개 보정 완료'))
@@ -1,3 +1,80 @@
 from django.db import models
+from users.models import Member
 
 # Create your models here.
+class DeletionJob(models.Model):
+    # 삭제 표시된 일기/게시물/회원의 연관 데이터를 나눠서 지우는 작업 (진행 상황 저장, 중단 후 재개 가능)
+    DIARY = 'diary'
+    POST = 'post'
+    MEMBER = 'member'
+
+    KIND_CHOICES = [
+        (DIARY, 'Diary'),
+        (POST, 'Post'),
+        (MEMBER, 'Member'),
+    ]
+
+    id = models.AutoField(primary_key=True) # 작업 키
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES) # 삭제 대상 종류
+    target_id = models.IntegerField() # 삭제 대상 키
+    stage = models.PositiveIntegerField(default=0) # 진행 중인 단계 번호
+    deleted_rows = models.PositiveIntegerField(default=0) # 지금까지 삭제한 행 수
+    created_at = models.DateTimeField(auto_now_add=True) # 생성일자
+    updated_at = models.DateTimeField(auto_now=True) # 마지막 진행 일자
+    finished_at = models.DateTimeField(null=True, blank=True) # 완료 일자
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['finished_at', 'id'], name='deletion_job_pending_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.kind} {self.target_id} (stage {self.stage}, {self.deleted_rows} rows)"
+
+
+class MemberStats(models.Model):
+    # 프로필에 보이는 개수를 미리 저장 (일기 작성/삭제, 팔로우/언팔로우 시 증감, repair_member_stats로 보정)
+    member = models.OneToOneField(Member, verbose_name="회원", on_delete=models.CASCADE, primary_key=True, related_name="stats") # 회원정보 키
+    post_count = models.IntegerField(default=0) # 작성한 일기 수
+    follower_count = models.IntegerField(default=0) # 나를 팔로우하는 회원 수
+    following_count = models.IntegerField(default=0) # 내가 팔로우하는 회원 수
+    updated_at = models.DateTimeField(auto_now=True) # 마지막으로 다시 계산한 일자
+    following_changed_at = models.DateTimeField(null=True, blank=True) # 마지막으로 팔로우/언팔로우한 일자 (추천 증분 갱신 대상 선정)
+
+    def __str__(self):
+        return f"{self.member_id}: {self.post_count} / {self.follower_count} / {self.following_count}"
+
+
+class Recommendation(models.Model):
+    # "알 수도 있는 사람": recommend_people 명령이 팔로우 그래프로 계산해서 회원마다 상위 K명을 저장
+    id = models.AutoField(primary_key=True) # 추천 키
+    member = models.ForeignKey(Member, verbose_name="추천받는 회원", on_delete=models.CASCADE, related_name="recommendations") # 추천받는 회원 키
+    candidate = models.ForeignKey(Member, verbose_name="추천 회원", on_delete=models.CASCADE, related_name="+") # 추천된 회원 키
+    rank = models.PositiveSmallIntegerField() # 추천 순위 (0부터)
+    score = models.FloatField() # 점수 (함께 아는 사람 수 + 같은 반려동물 종류 가산점)
+    shared_count = models.PositiveIntegerField() # 내가 팔로우하는 사람 중 이 회원을 팔로우하는 사람 수
+    same_pet_type = models.BooleanField(default=False) # 반려동물 종류가 같은지
+    created_at = models.DateTimeField(auto_now_add=True) # 계산 일자
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['member', 'candidate'], name='unique_recommendation')
+        ]
+        indexes = [
+            models.Index(fields=['member', 'rank'], name='recommendation_member_rank_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.member_id} -> {self.candidate_id} ({self.score})"
+
+
+class RecommendationRun(models.Model):
+    # recommend_people 실행 기록. 증분 실행은 마지막으로 끝난 실행의 시작 시각 이후 팔로우가 바뀐 회원만 다시 계산
+    id = models.AutoField(primary_key=True) # 실행 키
+    full = models.BooleanField(default=False) # 전체 계산 여부
+    member_count = models.PositiveIntegerField(default=0) # 다시 계산한 회원 수
+    started_at = models.DateTimeField() # 시작 일자
+    finished_at = models.DateTimeField(null=True, blank=True) # 완료 일자
+
+    def __str__(self):
+        return f"{'full' if self.full else 'incremental'} {self.started_at} ({self.member_count} members)"
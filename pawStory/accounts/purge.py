@@ -0,0 +1,138 @@
+# 삭제 표시(tombstone)와 백그라운드 정리
+# 요청에서는 대상 행에 deleted_at만 기록해서 즉시 모든 조회에서 숨기고,
+# 연관 데이터는 purge_tombstones 명령이 단계별로 작은 배치씩 지웁니다.
+# 배치마다 커밋하고 진행 단계를 DeletionJob에 저장하므로 SQLite 쓰기 잠금을 오래 잡지 않고, 중단되어도 이어서 진행합니다.
+import time
+from collections import Counter
+
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from community import tag_counts
+from community.models import Post, PostComment, PostLike
+from pawStory import response_cache
+from diaries.models import Diary, DiaryComment, DiaryLike, Follow, TimelineEntry
+from users.authentication import mark_inactive, member_cache
+from users.models import Member
+from users.signals import invalidate_activity_responses
+from . import stats as member_stats
+from .models import DeletionJob
+
+
+def tombstone_diary(diary):
+    with transaction.atomic():
+        if Diary.objects.filter(pk=diary.pk).update(deleted_at=timezone.now()):
+            member_stats.adjust(diary.member_id, post_count=-1)
+    response_cache.invalidate('diary', diary.pk)  # UPDATE는 시그널을 보내지 않으므로 직접 무효화
+    response_cache.invalidate('diary_comments', diary.pk)
+    response_cache.invalidate('member', diary.member_id)
+    return DeletionJob.objects.create(kind=DeletionJob.DIARY, target_id=diary.pk)
+
+
+def tombstone_post(post):
+    with transaction.atomic():
+        if Post.objects.filter(pk=post.pk).update(deleted_at=timezone.now()):
+            tag_counts.adjust({post.tag_part: -1})
+        response_cache.invalidate('post', post.pk)
+        response_cache.invalidate('post_comments', post.pk)
+        return DeletionJob.objects.create(kind=DeletionJob.POST, target_id=post.pk)
+
+
+def tombstone_member(member):
+    # 로그인을 막고, 작성한 일기/게시물을 한 번의 UPDATE로 숨김
+    now = timezone.now()
+    with transaction.atomic():
+        Member.objects.filter(pk=member.pk).update(is_active=False, deleted_at=now, updated_at=now)  # 프로필이 들어간 응답의 ETag도 바뀌도록
+        response_cache.invalidate('member', member.pk)
+        invalidate_activity_responses(member.pk)  # 좋아요/댓글 미리보기에서 빠지도록 (UPDATE라 시그널 없음)
+        transaction.on_commit(lambda: (member_cache.discard(member.pk), mark_inactive(member.pk)))  # 발급된 토큰도 거부
+        Diary.objects.filter(member=member).update(deleted_at=now)
+        posts = Post.objects.filter(Q(user=member) | Q(member=member))
+        removed = tag_counts.count_by_part(posts)
+        posts.update(deleted_at=now)
+        tag_counts.adjust({part: -count for part, count in removed.items()})
+        return DeletionJob.objects.create(kind=DeletionJob.MEMBER, target_id=member.pk)
+
+
+def _decrement_diary_counts(field):
+    # 다른 사람 일기에 남긴 좋아요/댓글을 지울 때 일기의 like_count/comment_count 차감
+    def decrement(rows):
+        for diary_id, count in Counter(rows.values_list('diary_id', flat=True)).items():
+            Diary.all_objects.filter(pk=diary_id).update(**{field: F(field) - count})
+    return decrement
+
+
+def _decrement_follow_counts(other, field):
+    # 탈퇴 회원의 팔로우 관계를 지울 때 상대 회원의 팔로워/팔로잉 수 차감
+    def decrement(follows):
+        for member_id in follows.values_list(other, flat=True):
+            member_stats.adjust(member_id, **{field: -1})
+    return decrement
+
+
+def _decrement_post_counts(field):
+    # 다른 사람 게시물에 남긴 좋아요/댓글을 지울 때 게시물의 like_count/comment_count 차감
+    def decrement(rows):
+        for post_id, count in Counter(rows.values_list('post_id', flat=True)).items():
+            Post.all_objects.filter(pk=post_id).update(**{field: F(field) - count})
+    return decrement
+
+
+def purge_steps(job):
+    # (쿼리셋, 삭제 직전 훅) 목록. 자식 테이블부터 지우고 마지막에 대상 행을 지웁니다.
+    pk = job.target_id
+    if job.kind == DeletionJob.DIARY:
+        return [
+            (TimelineEntry.objects.filter(diary_id=pk), None),
+            (DiaryLike.objects.filter(diary_id=pk), None),
+            (DiaryComment.objects.filter(diary_id=pk), None),
+            (Diary.all_objects.filter(pk=pk), None),
+        ]
+    if job.kind == DeletionJob.POST:
+        return [
+            (PostLike.objects.filter(post_id=pk), None),
+            (PostComment.objects.filter(post_id=pk), None),
+            (Post.all_objects.filter(pk=pk), None),
+        ]
+    own_posts = Q(post__user_id=pk) | Q(post__member_id=pk)
+    return [
+        (TimelineEntry.objects.filter(owner_id=pk), None),
+        (TimelineEntry.objects.filter(author_id=pk), None),
+        (DiaryLike.objects.filter(diary__member_id=pk), None),
+        (DiaryLike.objects.filter(member_id=pk), _decrement_diary_counts('like_count')),
+        (DiaryComment.objects.filter(diary__member_id=pk), None),
+        (DiaryComment.objects.filter(member_id=pk), _decrement_diary_counts('comment_count')),
+        (Diary.all_objects.filter(member_id=pk), None),
+        (Follow.objects.filter(follower_id=pk), _decrement_follow_counts('following_id', 'follower_count')),
+        (Follow.objects.filter(following_id=pk), _decrement_follow_counts('follower_id', 'following_count')),
+        (PostLike.objects.filter(own_posts), None),
+        (PostLike.objects.filter(user_id=pk), _decrement_post_counts('like_count')),
+        (PostComment.objects.filter(own_posts), None),
+        (PostComment.objects.filter(user_id=pk), _decrement_post_counts('comment_count')),
+        (Post.all_objects.filter(Q(user_id=pk) | Q(member_id=pk)), None),
+        (Member.objects.filter(pk=pk), None),
+    ]
+
+
+def run_job(job, batch_size=500, deadline=None):
+    # 배치 하나씩 삭제하고 진행 상황을 저장. deadline(time.monotonic 기준)을 넘기면 멈추고 False 반환
+    steps = purge_steps(job)
+    while job.stage < len(steps):
+        queryset, before_delete = steps[job.stage]
+        ids = list(queryset.order_by('pk').values_list('pk', flat=True)[:batch_size])
+        with transaction.atomic():
+            if ids:
+                batch = queryset.model._base_manager.filter(pk__in=ids)
+                if before_delete is not None:
+                    before_delete(batch)
+                deleted, _ = batch.delete()
+                job.deleted_rows += deleted
+            else:
+                job.stage += 1  # 이 단계의 행을 모두 지웠으면 다음 단계로
+            job.save(update_fields=['stage', 'deleted_rows', 'updated_at'])
+        if deadline is not None and time.monotonic() > deadline:
+            return False
+    job.finished_at = timezone.now()
+    job.save(update_fields=['finished_at', 'updated_at'])
+    return True
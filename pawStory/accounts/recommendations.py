@@ -0,0 +1,126 @@
+# "알 수도 있는 사람" 추천
+# 팔로우 테이블 전체를 CSR(압축 희소 행) 형태의 정수 배열 두 개로 메모리에 올립니다.
+#   indptr[회원 id] ~ indptr[회원 id + 1] 구간의 indices 값이 그 회원이 팔로우하는 회원 id
+# 팔로우 한 건당 4바이트, 회원 id 하나당 8바이트라서 수백만 건도 수십 MB 안에 들어가고,
+# (follower, id) 인덱스 순서로 스트리밍해서 만들기 때문에 쿼리 결과를 한꺼번에 들고 있지 않습니다.
+# 후보는 내가 팔로우하는 사람이 팔로우하는 사람(2단계)이고, 점수는 그 경로 수(함께 아는 사람 수)에
+# 반려동물 종류가 같으면 가산점을 더합니다. 회원마다 상위 K명만 Recommendation 테이블에 저장합니다.
+# 증분 실행은 다시 계산할 회원과 그 회원이 팔로우하는 회원의 팔로우 행만 읽어서 부분 그래프를 만듭니다.
+import heapq
+from array import array
+
+from django.db import transaction
+from django.db.models import Max
+
+from diaries.models import Follow
+from users.models import Member
+from .models import Recommendation
+
+TOP_K = 20
+PET_TYPE_BONUS = 0.5  # 같은 반려동물 종류 가산점 (함께 아는 사람 1명보다 작게)
+MAX_SCANNED_FOLLOWEES = 500  # 많이 팔로우하는 회원은 최근 팔로우한 이만큼만 후보 탐색에 사용
+LOAD_CHUNK_SIZE = 10_000
+WRITE_BATCH_SIZE = 500
+
+
+class FollowGraph:
+    def __init__(self, member_ids=None):
+        # member_ids가 있으면 그 회원들의 추천에 필요한 2단계까지만 읽음
+        max_id = Member.objects.aggregate(max_id=Max('id'))['max_id'] or 0
+        self.size = max_id + 1
+        self.pet_types = bytearray(self.size)  # 0: 탈퇴/비활성, 1~: 반려동물 종류 번호
+        self.unknown_pet_type = len(Member.PetType.values) + 1  # 종류를 입력하지 않은 활성 회원 (가산점 없음)
+        self.indptr = array('q', bytes(8 * (self.size + 1)))
+        self.indices = array('i')
+        self._load_members()
+        if member_ids is None:
+            self._load_follows()
+        else:
+            self._load_follows(set(member_ids) | self._followee_ids(member_ids))
+
+    def _load_members(self):
+        codes = {value: number for number, value in enumerate(Member.PetType.values, start=1)}
+        active = Member.objects.filter(is_active=True, deleted_at__isnull=True).order_by('id')
+        for member_id, pet_type in active.values_list('id', 'pet_type').iterator(chunk_size=LOAD_CHUNK_SIZE):
+            self.pet_types[member_id] = codes.get(pet_type, self.unknown_pet_type)
+
+    @staticmethod
+    def _followee_ids(member_ids):
+        member_ids = sorted(member_ids)
+        found = set()
+        for start in range(0, len(member_ids), WRITE_BATCH_SIZE):
+            found.update(Follow.objects.filter(follower_id__in=member_ids[start:start + WRITE_BATCH_SIZE]).values_list('following_id', flat=True))
+        return found
+
+    def _load_follows(self, follower_ids=None):
+        # follower 순서로 읽으면서 팔로우 수를 indptr에 누적 (탈퇴 회원은 건너뜀)
+        counts = self.indptr
+        for follower_id, following_id in self._iter_follows(follower_ids):
+            if follower_id < self.size and following_id < self.size and self.pet_types[follower_id] and self.pet_types[following_id]:
+                self.indices.append(following_id)
+                counts[follower_id + 1] += 1
+        for member_id in range(1, self.size + 1):
+            counts[member_id] += counts[member_id - 1]
+
+    @staticmethod
+    def _iter_follows(follower_ids):
+        follows = Follow.objects.order_by('follower_id', 'id')
+        if follower_ids is None:
+            yield from follows.values_list('follower_id', 'following_id').iterator(chunk_size=LOAD_CHUNK_SIZE)
+            return
+        # IN 목록이 너무 길어지지 않도록 follower id를 오름차순으로 나눠서 조회 (follower 순서 유지)
+        follower_ids = sorted(follower_ids)
+        for start in range(0, len(follower_ids), WRITE_BATCH_SIZE):
+            batch = follower_ids[start:start + WRITE_BATCH_SIZE]
+            yield from follows.filter(follower_id__in=batch).values_list('follower_id', 'following_id')
+
+    @property
+    def nbytes(self):
+        return self.indptr.itemsize * len(self.indptr) + self.indices.itemsize * len(self.indices) + len(self.pet_types)
+
+    def followees(self, member_id):
+        return self.indices[self.indptr[member_id]:self.indptr[member_id + 1]]
+
+    def recommend(self, member_id, k=TOP_K):
+        # [(점수, 함께 아는 사람 수, 같은 종류 여부, 후보 id), ...] 점수 높은 순
+        if member_id >= self.size or not self.pet_types[member_id]:
+            return []
+        followees = self.followees(member_id)[-MAX_SCANNED_FOLLOWEES:]
+        excluded = set(self.followees(member_id))
+        excluded.add(member_id)
+        shared = {}
+        for followee in followees:
+            for candidate in self.followees(followee)[-MAX_SCANNED_FOLLOWEES:]:
+                if candidate not in excluded:
+                    shared[candidate] = shared.get(candidate, 0) + 1
+        pet_type = self.pet_types[member_id]
+        scored = []
+        for candidate, count in shared.items():
+            same = pet_type != self.unknown_pet_type and self.pet_types[candidate] == pet_type
+            scored.append((count + PET_TYPE_BONUS * same, count, same, candidate))
+        return heapq.nlargest(k, scored, key=lambda item: (item[0], -item[3]))  # 점수가 같으면 먼저 가입한 회원
+
+
+def affected_members(changed_ids):
+    # 팔로우가 바뀐 회원과, 그 회원을 팔로우하는 회원(2단계 후보가 바뀜)
+    changed_ids = list(changed_ids)
+    affected = set(changed_ids)
+    for start in range(0, len(changed_ids), WRITE_BATCH_SIZE):
+        affected.update(Follow.objects.filter(following_id__in=changed_ids[start:start + WRITE_BATCH_SIZE]).values_list('follower_id', flat=True))
+    return affected
+
+
+def store(graph, member_ids, k=TOP_K):
+    # 배치마다 기존 추천을 지우고 새로 저장. 저장한 회원 수를 반환
+    member_ids = sorted(member_ids)
+    for start in range(0, len(member_ids), WRITE_BATCH_SIZE):
+        batch = member_ids[start:start + WRITE_BATCH_SIZE]
+        rows = [
+            Recommendation(member_id=member_id, candidate_id=candidate, rank=rank, score=score, shared_count=count, same_pet_type=same)
+            for member_id in batch
+            for rank, (score, count, same, candidate) in enumerate(graph.recommend(member_id, k))
+        ]
+        with transaction.atomic():
+            Recommendation.objects.filter(member_id__in=batch).delete()
+            Recommendation.objects.bulk_create(rows, batch_size=WRITE_BATCH_SIZE)
+    return len(member_ids)
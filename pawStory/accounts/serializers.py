@@ -1,6 +1,17 @@
 from rest_framework import serializers
 from users.models import Member
-from diaries.models import Diary, Follow
+from pawStory.renditions import SrcsetField
+from .models import MemberStats, Recommendation
+from .stats import get_stats
+
+class MemberStatsSerializer(serializers.ModelSerializer):
+    # 프로필과 팔로워/팔로잉 목록에서 함께 사용 (select_related('stats')로 불러오면 한 번의 조인)
+    class Meta:
+        model = MemberStats
+        fields = ['post_count', 'follower_count', 'following_count']
+
+    def to_representation(self, instance):
+        return super().to_representation(get_stats(instance) if isinstance(instance, Member) else instance)
 
 class ProfileSerializer(serializers.ModelSerializer):
     post_count = serializers.SerializerMethodField()
@@ -12,10 +23,41 @@ class ProfileSerializer(serializers.ModelSerializer):
         fields = ['id', 'pet_photo', 'user_id', 'post_count', 'follower_count', 'following_count']
 
     def get_post_count(self, obj):
-        return Diary.objects.filter(member=obj).count()
+        return get_stats(obj).post_count
 
     def get_follower_count(self, obj):
-        return Follow.objects.filter(following=obj).count()
+        return get_stats(obj).follower_count
 
     def get_following_count(self, obj):
-        return Follow.objects.filter(follower=obj).count()
+        return get_stats(obj).following_count
+
+class FollowMemberSerializer(serializers.ModelSerializer):
+    # 팔로워/팔로잉 목록 항목. context의 followees(내가 팔로우하는 id), followed_by(accounts.follows.followed_by 결과) 사용
+    pet_photo_srcset = SrcsetField('pet_photo', 'pet_photo_renditions')
+    stats = MemberStatsSerializer(source='*', read_only=True)
+    is_following = serializers.SerializerMethodField()
+    followed_by = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Member
+        fields = ['id', 'user_id', 'pet_photo', 'pet_photo_srcset', 'stats', 'is_following', 'followed_by']
+
+    def get_is_following(self, obj):
+        return obj.id in self.context['followees']
+
+    def get_followed_by(self, obj):
+        return self.context['followed_by'].get(obj.id, {'count': 0, 'members': []})
+
+class RecommendedMemberSerializer(serializers.ModelSerializer):
+    pet_photo_srcset = SrcsetField('pet_photo', 'pet_photo_renditions')
+
+    class Meta:
+        model = Member
+        fields = ['id', 'user_id', 'pet_photo', 'pet_photo_srcset', 'pet_type']
+
+class RecommendationSerializer(serializers.ModelSerializer):
+    candidate = RecommendedMemberSerializer(read_only=True)
+
+    class Meta:
+        model = Recommendation
+        fields = ['candidate', 'score', 'shared_count', 'same_pet_type']
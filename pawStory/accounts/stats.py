@@ -0,0 +1,52 @@
+# 회원 통계(MemberStats) 증감
+# 프로필을 볼 때마다 일기/팔로우 테이블을 COUNT하지 않도록 쓰기 시점에 F()로 증감합니다.
+# 행이 아직 없으면 그 시점의 실제 개수로 만들고, 어긋난 값은 repair_member_stats 명령으로 보정합니다.
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from diaries.models import Diary, Follow
+from .models import MemberStats
+
+STAT_FIELDS = ('post_count', 'follower_count', 'following_count')
+
+
+def _count_of(queryset, field):
+    return Coalesce(Subquery(queryset.order_by().values(field).annotate(total=Count('id')).values('total')), 0)
+
+
+def actual_counts():
+    # Member 쿼리셋에 annotate해서 쓰는 실제 개수 표현식
+    return {
+        'post_count': _count_of(Diary.objects.filter(member=OuterRef('pk')), 'member'),
+        'follower_count': _count_of(Follow.objects.filter(following=OuterRef('pk')), 'following'),
+        'following_count': _count_of(Follow.objects.filter(follower=OuterRef('pk')), 'follower'),
+    }
+
+
+def compute_stats(member_id):
+    from users.models import Member
+
+    row = Member.objects.filter(pk=member_id).annotate(**actual_counts()).values(*STAT_FIELDS).first()
+    return row or dict.fromkeys(STAT_FIELDS, 0)
+
+
+def adjust(member_id, **deltas):
+    # 쓰기와 같은 트랜잭션 안에서, 쓰기 이후에 호출
+    changes = {field: F(field) + delta for field, delta in deltas.items()}
+    extra = {}
+    if 'following_count' in deltas:
+        extra['following_changed_at'] = timezone.now()  # 추천(recommend_people) 증분 갱신 대상
+    updated = MemberStats.objects.filter(member_id=member_id).update(**changes, **extra)
+    if not updated:
+        MemberStats.objects.get_or_create(member_id=member_id, defaults={**compute_stats(member_id), **extra})
+
+
+def get_stats(member):
+    # select_related('stats')로 불러온 회원이면 추가 쿼리 없음. 통계 행이 없으면 만들어서 반환
+    try:
+        return member.stats
+    except MemberStats.DoesNotExist:
+        stats, _ = MemberStats.objects.get_or_create(member_id=member.pk, defaults=compute_stats(member.pk))
+        member.stats = stats
+        return stats
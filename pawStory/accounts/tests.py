@@ -1,3 +1,211 @@
+import io
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from community.models import Post, PostComment, PostLike
+from diaries.models import Diary, DiaryComment, DiaryLike, Follow
+from diaries.tests import QueryPlanTestCase, authenticated_client, create_diary, create_member
+from users.models import Member
+from .models import DeletionJob, MemberStats, Recommendation, RecommendationRun
+from .purge import tombstone_diary, tombstone_member
+from .recommendations import FollowGraph
+from .stats import STAT_FIELDS, compute_stats
+
+
+class FollowQueryPlanTests(QueryPlanTestCase):
+    def setUp(self):
+        super().setUp()
+        self.owner = create_member('owner')
+        self.others = [create_member(f'member{number}') for number in range(3)]
+        for other in self.others:
+            Follow.objects.create(follower=other, following=self.owner)
+            Follow.objects.create(follower=self.owner, following=other)
+        self.client = authenticated_client(self.owner)
+
+    def test_follower_list(self):
+        self.assertIndexedPlan(self.client, f'/accounts/{self.owner.id}/followers', 'diaries_follow', 'follow_following_id_idx')
+
+    def test_following_list(self):
+        response, _ = self.assertIndexedPlan(self.client, f'/accounts/{self.owner.id}/following?page_size=1', 'diaries_follow', 'follow_follower_id_idx')
+        self.assertIndexedPlan(self.client, response.data['next'], 'diaries_follow', 'follow_follower_id_idx')
+
+    def test_mutual_follower_list(self):
+        self.assertIndexedPlan(self.client, f'/accounts/{self.owner.id}/followers?mutual=true', 'diaries_follow', 'follow_following_id_idx')
+
+    def test_recommendations(self):
+        Recommendation.objects.create(member=self.owner, candidate=self.others[0], rank=0, score=1, shared_count=1, same_pet_type=False)
+        self.assertIndexedPlan(self.client, '/accounts/recommendations', 'accounts_recommendation', 'recommendation_member_rank_idx')
+
+
+class PurgeCounterTests(TestCase):
+    def setUp(self):
+        self.author = create_member('author')
+        self.leaving = create_member('leaving')
+        self.diary = create_diary(self.author)
+        self.post = Post.objects.create(user=self.author, member=self.author, title='post', content='post')
+        client = authenticated_client(self.leaving)
+        self.assertEqual(client.post('/diaries/follow', {'following': self.author.id}, format='json').status_code, 201)
+        authenticated_client(self.author).post('/diaries/follow', {'following': self.leaving.id}, format='json')
+        DiaryLike.objects.create(member=self.leaving, diary=self.diary)
+        Diary.objects.filter(pk=self.diary.pk).update(like_count=1)
+        for content in ('first', 'second'):
+            DiaryComment.objects.create(member=self.leaving, diary=self.diary, content=content)
+            PostComment.objects.create(user=self.leaving, post=self.post, content=content)
+        PostLike.objects.create(user=self.leaving, post=self.post)
+        create_diary(self.leaving)
+
+    def purge(self):
+        call_command('purge_tombstones', batch_size=1, stdout=io.StringIO())
+        self.assertFalse(DeletionJob.objects.filter(finished_at__isnull=True).exists())
+
+    def assertStatsMatch(self, member):
+        self.assertEqual(
+            MemberStats.objects.filter(member=member).values(*STAT_FIELDS).get(),
+            compute_stats(member.pk),
+        )
+
+    def test_member_purge_decrements_counters_of_others(self):
+        self.assertEqual(MemberStats.objects.get(member=self.author).follower_count, 1)
+        tombstone_member(self.leaving)
+        self.purge()
+
+        self.assertFalse(Member.objects.filter(pk=self.leaving.pk).exists())
+        diary = Diary.objects.get(pk=self.diary.pk)
+        self.assertEqual((diary.like_count, diary.comment_count), (0, 0))
+        post = Post.objects.get(pk=self.post.pk)
+        self.assertEqual((post.like_count, post.comment_count), (0, 0))
+        self.assertStatsMatch(self.author)
+        self.assertEqual(MemberStats.objects.get(member=self.author).follower_count, 0)
+
+    def test_diary_tombstone_decrements_post_count(self):
+        self.assertEqual(MemberStats.objects.get(member=self.author).post_count, 1)
+        tombstone_diary(self.diary)
+        self.assertStatsMatch(self.author)
+        self.purge()
+        self.assertStatsMatch(self.author)
+        self.assertFalse(Diary.all_objects.filter(pk=self.diary.pk).exists())
+        self.assertFalse(DiaryComment.objects.filter(diary_id=self.diary.pk).exists())
+
+
+class FollowListTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.viewer = create_member('viewer')
+        self.owner = create_member('owner')
+        self.popular = create_member('popular')
+        self.quiet = create_member('quiet')
+        for member in (self.popular, self.quiet):
+            Follow.objects.create(follower=member, following=self.owner)
+        Follow.objects.create(follower=self.owner, following=self.popular)  # 맞팔로우
+        Follow.objects.create(follower=self.viewer, following=self.popular)
+        self.friends = [create_member(f'friend{number}') for number in range(5)]
+        for friend in self.friends:
+            Follow.objects.create(follower=self.viewer, following=friend)
+            Follow.objects.create(follower=friend, following=self.popular)
+        tombstone_member(self.friends[-1])  # 탈퇴한 회원은 힌트에서 빠짐
+        self.client = authenticated_client(self.viewer)
+
+    def followers(self, query=''):
+        response = self.client.get(f'/accounts/{self.owner.id}/followers{query}')
+        self.assertEqual(response.status_code, 200)
+        return {item['user_id']: item for item in response.data['results']}
+
+    def test_followed_by_hint(self):
+        followers = self.followers()
+        self.assertEqual(list(followers), ['quiet', 'popular'])  # 최근 팔로우 순
+        self.assertEqual(followers['popular']['followed_by'], {'count': 4, 'members': ['friend3', 'friend2', 'friend1']})
+        self.assertEqual(followers['quiet']['followed_by'], {'count': 0, 'members': []})
+        self.assertEqual((followers['popular']['is_following'], followers['quiet']['is_following']), (True, False))
+
+    def test_mutual_filter(self):
+        self.assertEqual(list(self.followers('?mutual=true')), ['popular'])
+
+    def test_following_list_hides_deleted_members(self):
+        response = authenticated_client(self.owner).get(f'/accounts/{self.viewer.id}/following')
+        self.assertEqual([item['user_id'] for item in response.data['results']], ['friend3', 'friend2', 'friend1', 'friend0', 'popular'])
+
+    def test_query_count_does_not_grow_with_page_size(self):
+        url = f'/accounts/{self.viewer.id}/following'
+        self.client.get(url)  # 내 팔로우 목록 캐시
+        with CaptureQueriesContext(connection) as small:
+            self.client.get(f'{url}?page_size=1')
+        with CaptureQueriesContext(connection) as large:
+            self.client.get(f'{url}?page_size=5')
+        self.assertEqual(len(small.captured_queries), len(large.captured_queries))
+
+    def test_deleted_owner_is_404(self):
+        tombstone_member(self.owner)
+        self.assertEqual(self.client.get(f'/accounts/{self.owner.id}/followers').status_code, 404)
+
+
+class RecommendationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.me, self.a, self.b, self.x, self.y, self.z = members = [
+            create_member(user_id) for user_id in ('me', 'a', 'b', 'x', 'y', 'z')
+        ]
+        Member.objects.filter(pk__in=[self.me.pk, self.z.pk]).update(pet_type=Member.PetType.CAT)
+        for follower, following in (
+            (self.me, self.a), (self.me, self.b),
+            (self.a, self.x), (self.a, self.y), (self.a, self.me), (self.a, self.b),
+            (self.b, self.x), (self.b, self.z),
+        ):
+            Follow.objects.create(follower=follower, following=following)
+
+    def test_scores_shared_followees_and_pet_type(self):
+        recommended = [(candidate, count, same) for _, count, same, candidate in FollowGraph().recommend(self.me.pk)]
+        # 함께 아는 사람 2명 > 1명 + 같은 종류 가산점 > 1명. 이미 팔로우한 사람과 자신은 제외
+        self.assertEqual(recommended, [(self.x.pk, 2, False), (self.z.pk, 1, True), (self.y.pk, 1, False)])
+        self.assertEqual(FollowGraph().recommend(self.me.pk, k=1)[0][0], 2)
+
+    def test_deleted_members_are_skipped(self):
+        tombstone_member(self.x)
+        self.assertEqual([item[3] for item in FollowGraph().recommend(self.me.pk)], [self.z.pk, self.y.pk])
+        tombstone_member(self.me)
+        self.assertEqual(FollowGraph().recommend(self.me.pk), [])
+
+    def test_command_stores_and_updates_incrementally(self):
+        call_command('recommend_people', stdout=io.StringIO())
+        client = authenticated_client(self.me)
+        response = client.get('/accounts/recommendations')
+        self.assertEqual([item['candidate']['user_id'] for item in response.data], ['x', 'z', 'y'])
+
+        newcomer = create_member('newcomer')
+        authenticated_client(self.b).post('/diaries/follow', {'following': newcomer.pk}, format='json')  # 팔로잉 변경 시각 기록
+        call_command('recommend_people', stdout=io.StringIO())
+        self.assertFalse(RecommendationRun.objects.latest('started_at').full)
+        candidates = list(Recommendation.objects.filter(member=self.me).order_by('rank').values_list('candidate__user_id', flat=True))
+        self.assertEqual(candidates, ['x', 'z', 'y', 'newcomer'])  # 점수가 같으면 먼저 가입한 회원
+
+
+class RepairMemberStatsTests(TestCase):
+    def setUp(self):
+        self.drifted, self.missing, self.correct = create_member('drifted'), create_member('missing'), create_member('correct')
+        for diary_author in (self.drifted, self.drifted, self.missing):
+            create_diary(diary_author)
+        Follow.objects.create(follower=self.drifted, following=self.missing)
+        Follow.objects.create(follower=self.correct, following=self.drifted)
+        for member in (self.drifted, self.correct):
+            MemberStats.objects.update_or_create(member=member, defaults=compute_stats(member.pk))
+        MemberStats.objects.filter(member=self.drifted).update(post_count=10, follower_count=0, following_count=5)
+        MemberStats.objects.filter(member=self.missing).delete()
+
+    def test_repair_creates_missing_rows_and_fixes_drift(self):
+        stdout = io.StringIO()
+        call_command('repair_member_stats', '--batch-size', '2', stdout=stdout)
+        self.assertIn('3명 검사, 통계 1개 생성, 1개 보정 완료', stdout.getvalue())
+        expected = {
+            self.drifted.pk: {'post_count': 2, 'follower_count': 1, 'following_count': 1},
+            self.missing.pk: {'post_count': 1, 'follower_count': 1, 'following_count': 0},
+            self.correct.pk: {'post_count': 0, 'follower_count': 0, 'following_count': 1},
+        }
+        for member_id, counts in expected.items():
+            self.assertEqual(MemberStats.objects.filter(member_id=member_id).values(*STAT_FIELDS).get(), counts)
 
-# Create your tests here.
+        stdout = io.StringIO()
+        call_command('repair_member_stats', stdout=stdout)
+        self.assertIn('3명 검사, 통계 0개 생성, 0개 보정 완료', stdout.getvalue())  # 다시 실행하면 고칠 것이 없음
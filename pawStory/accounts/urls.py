@@ -1,6 +1,10 @@
 from django.urls import path
-from .views import ProfileDetailView
+from .views import FollowerListView, FollowingListView, ProfileDetailView, RecommendationListView, ResponseCacheStatsView
 
 urlpatterns = [
     path('<int:pk>', ProfileDetailView.as_view(), name='profile-detail'),
+    path('<int:pk>/followers', FollowerListView.as_view(), name='follower-list'),  # 팔로워 목록 (?mutual=true: 맞팔로우만)
+    path('<int:pk>/following', FollowingListView.as_view(), name='following-list'),  # 팔로잉 목록
+    path('recommendations', RecommendationListView.as_view(), name='recommendation-list'),  # 알 수도 있는 사람
+    path('cache-stats', ResponseCacheStatsView.as_view(), name='response-cache-stats'),  # 응답 캐시 적중률 (관리자)
 ]
@@ -1,7 +1,20 @@
-from rest_framework import generics
+from django.db.models import Exists, OuterRef
+from django.http import Http404
+from rest_framework import generics, status
+from rest_framework.exceptions import PermissionDenied
+from rest_framework.response import Response
 from users.models import Member
-from .serializers import ProfileSerializer
-from rest_framework.permissions import IsAuthenticated
+from diaries.models import Follow
+from diaries.visibility import followee_ids
+from .follows import followed_by
+from .models import Recommendation
+from .serializers import FollowMemberSerializer, ProfileSerializer, RecommendationSerializer
+from .purge import tombstone_member
+from pawStory.conditional import ConditionalRetrieveMixin, version_etag
+from pawStory import response_cache
+from pawStory.pagination import KeysetCursorPagination
+from pawStory.response_cache import CachedRetrieveMixin
+from rest_framework.permissions import IsAdminUser, IsAuthenticated
 from drf_yasg.utils import swagger_auto_schema
 from drf_yasg import openapi
 
@@ -14,8 +27,9 @@ authorization_header = openapi.Parameter(
     required=True
 )
 
-class ProfileDetailView(generics.RetrieveAPIView):
-    queryset = Member.objects.all()
+class ProfileDetailView(ConditionalRetrieveMixin, CachedRetrieveMixin, generics.RetrieveDestroyAPIView):
+    cache_scope = 'member'  # 프로필 수정, 일기 작성/삭제, 팔로우 시 무효화
+    queryset = Member.objects.filter(deleted_at__isnull=True).select_related('stats')  # 통계는 조인으로 함께 조회
     serializer_class = ProfileSerializer
     permission_classes = [IsAuthenticated]
 
@@ -24,6 +38,7 @@ class ProfileDetailView(generics.RetrieveAPIView):
         operation_description="특정 회원의 프로필을 조회합니다.",
         responses={
             200: ProfileSerializer,
+            304: '변경되지 않음 (If-None-Match 일치)',
             404: '해당 일기를 찾을 수 없습니다.',
             500: '서버 오류입니다.'
         }
@@ -31,3 +46,153 @@ class ProfileDetailView(generics.RetrieveAPIView):
     def get(self, request, *args, **kwargs):
         response = super().retrieve(request, *args, **kwargs)
         return response
+
+    def get_validators(self):
+        # 프로필 값과 미리 계산된 일기/팔로워/팔로잉 수를 조인 한 번으로 읽어서 ETag 생성
+        stamp = self.get_queryset().filter(pk=self.kwargs['pk']).values_list(
+            'updated_at', 'stats__post_count', 'stats__follower_count', 'stats__following_count',
+        ).first()
+        if stamp is None:
+            raise Http404
+        return version_etag(self.kwargs['pk'], *stamp), None  # 팔로우 수 변화는 updated_at에 남지 않으므로 ETag만 사용
+
+    @swagger_auto_schema(
+        operation_summary="회원 탈퇴",
+        operation_description="내 계정을 탈퇴합니다. 계정과 작성한 일기/게시물은 즉시 숨겨지고, 연관 데이터는 백그라운드에서 삭제됩니다.",
+        manual_parameters=[authorization_header],
+        responses={
+            204: '탈퇴됨',
+            403: '본인 계정만 탈퇴할 수 있습니다.',
+            404: '해당 회원을 찾을 수 없습니다.',
+            500: '서버 오류입니다.'
+        }
+    )
+    def delete(self, request, *args, **kwargs):
+        instance = self.get_object()
+        if instance.pk != request.user.pk:
+            raise PermissionDenied('본인 계정만 탈퇴할 수 있습니다.')
+        tombstone_member(instance)
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+class FollowListPagination(KeysetCursorPagination):
+    ordering = ('-id',)  # 최근 팔로우 순, (following, id) / (follower, id) 인덱스 범위 스캔
+
+class FollowListView(generics.ListAPIView):
+    # 페이지마다 쿼리 수 고정: 회원 확인 1 + 팔로우 목록(회원, 통계 조인) 1 + 힌트 1 (+ 내 팔로우 목록 캐시 미스 시 1)
+    owner_field = None  # 프로필 주인 쪽 FK
+    member_field = None  # 목록에 보여줄 쪽 FK
+    serializer_class = FollowMemberSerializer
+    pagination_class = FollowListPagination
+    permission_classes = [IsAuthenticated]
+
+    def get_queryset(self):
+        if getattr(self, 'swagger_fake_view', False):  # 스웨거 문서 생성 시에는 URL 인자가 없음
+            return Follow.objects.none()
+        owner_id = self.kwargs['pk']
+        queryset = Follow.objects.filter(**{
+            f'{self.owner_field}_id': owner_id,
+            f'{self.member_field}__deleted_at__isnull': True,
+        }).select_related(f'{self.member_field}__stats')
+        if self.request.query_params.get('mutual') in ('true', '1'):
+            # 맞팔로우만: 반대 방향 팔로우가 있는지 unique_follow 인덱스로 확인
+            queryset = queryset.filter(Exists(Follow.objects.filter(**{
+                self.member_field: owner_id, self.owner_field: OuterRef(self.member_field),
+            })))
+        return queryset
+
+    def list(self, request, *args, **kwargs):
+        if not Member.objects.filter(pk=self.kwargs['pk'], deleted_at__isnull=True).exists():
+            raise Http404
+        page = self.paginate_queryset(self.get_queryset())
+        members = [getattr(follow, self.member_field) for follow in page]
+        serializer = self.get_serializer(members, many=True, context={
+            **self.get_serializer_context(),
+            'followees': followee_ids(request.user),
+            'followed_by': followed_by(request.user, [member.id for member in members]),
+        })
+        return self.get_paginated_response(serializer.data)
+
+follow_list_parameters = [
+    authorization_header,
+    openapi.Parameter('mutual', openapi.IN_QUERY, description="true면 맞팔로우한 회원만", type=openapi.TYPE_BOOLEAN),
+]
+
+class FollowerListView(FollowListView):
+    owner_field = 'following'
+    member_field = 'follower'
+
+    @swagger_auto_schema(
+        operation_summary="팔로워 목록",
+        operation_description="특정 회원을 팔로우하는 회원 목록을 최근 팔로우 순으로 조회합니다. 각 회원에 대해 내가 팔로우하는지 여부와, 내가 팔로우하는 사람 중 그 회원을 팔로우하는 사람 수/일부 아이디를 함께 반환합니다.",
+        manual_parameters=follow_list_parameters,
+        responses={
+            200: FollowMemberSerializer(many=True),
+            404: '해당 회원을 찾을 수 없습니다.',
+            500: '서버 오류입니다.'
+        }
+    )
+    def get(self, request, *args, **kwargs):
+        return super().get(request, *args, **kwargs)
+
+class FollowingListView(FollowListView):
+    owner_field = 'follower'
+    member_field = 'following'
+
+    @swagger_auto_schema(
+        operation_summary="팔로잉 목록",
+        operation_description="특정 회원이 팔로우하는 회원 목록을 최근 팔로우 순으로 조회합니다. 응답 형식은 팔로워 목록과 같습니다.",
+        manual_parameters=follow_list_parameters,
+        responses={
+            200: FollowMemberSerializer(many=True),
+            404: '해당 회원을 찾을 수 없습니다.',
+            500: '서버 오류입니다.'
+        }
+    )
+    def get(self, request, *args, **kwargs):
+        return super().get(request, *args, **kwargs)
+
+class RecommendationListView(generics.ListAPIView):
+    # recommend_people 명령이 저장한 추천을 (member, rank) 인덱스로 한 번에 조회
+    serializer_class = RecommendationSerializer
+    permission_classes = [IsAuthenticated]
+    pagination_class = None  # 회원마다 최대 K개
+
+    def get_queryset(self):
+        return Recommendation.objects.filter(
+            member_id=self.request.user.id, candidate__is_active=True, candidate__deleted_at__isnull=True,
+        ).select_related('candidate').order_by('rank')
+
+    @swagger_auto_schema(
+        operation_summary="알 수도 있는 사람",
+        operation_description="내가 팔로우하는 사람들이 팔로우하는 회원을 함께 아는 사람 수와 반려동물 종류로 점수를 매겨 추천합니다. 추천은 주기적으로 다시 계산되며, 그 사이에 팔로우한 회원은 제외됩니다.",
+        manual_parameters=[authorization_header],
+        responses={
+            200: RecommendationSerializer(many=True),
+            500: '서버 오류입니다.'
+        }
+    )
+    def get(self, request, *args, **kwargs):
+        followees = followee_ids(request.user)  # 계산 이후 팔로우한 회원 제외 (캐시)
+        recommendations = [item for item in self.get_queryset() if item.candidate_id not in followees]
+        return Response(self.get_serializer(recommendations, many=True).data)
+
+class ResponseCacheStatsView(generics.GenericAPIView):
+    permission_classes = [IsAdminUser]
+    pagination_class = None
+    scopes = ['diary', 'post', 'member', 'diary_comments', 'post_comments']
+
+    @swagger_auto_schema(
+        operation_summary="응답 캐시 통계",
+        operation_description="응답 캐시의 대상별 적중(hit)/미적중(miss)/대기(wait) 횟수를 조회합니다. 관리자만 사용할 수 있습니다.",
+        manual_parameters=[authorization_header],
+        responses={
+            200: '대상별 hit/miss/wait 횟수와 적중률',
+            403: '관리자만 조회할 수 있습니다.',
+        }
+    )
+    def get(self, request, *args, **kwargs):
+        result = response_cache.stats(self.scopes)
+        for counts in result.values():
+            total = counts['hit'] + counts['miss']
+            counts['hit_rate'] = round(counts['hit'] / total, 3) if total else None
+        return Response(result)
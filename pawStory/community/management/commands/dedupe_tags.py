@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, Min
+
+from community.models import Post, Tag
+
+
+class Command(BaseCommand):
+    help = '이름과 part가 같은 중복 태그를 하나로 합칩니다. unique_tag 제약을 추가하기 전에 실행합니다.'
+
+    def handle(self, *args, **options):
+        merged = 0
+        duplicates = Tag.objects.values('name', 'part').annotate(keep=Min('id'), total=Count('id')).filter(total__gt=1)
+        for row in duplicates:
+            with transaction.atomic():
+                others = Tag.objects.filter(name=row['name'], part=row['part']).exclude(pk=row['keep'])
+                Post.all_objects.filter(tag__in=others).update(tag_id=row['keep'])
+                merged += others.delete()[0]
+        self.stdout.write(self.style.SUCCESS(f'중복 태그 {merged}개 정리 완료'))
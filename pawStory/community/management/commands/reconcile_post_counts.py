@@ -0,0 +1,41 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Count, F, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce
+
+from community.models import Post, PostComment, PostLike
+
+
+class Command(BaseCommand):
+    help = 'PostLike/PostComment 테이블을 기준으로 Post.like_count와 comment_count를 다시 계산합니다.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help='한 번에 검사할 게시물 수')
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        actual_likes = self.count_of(PostLike)
+        actual_comments = self.count_of(PostComment)
+
+        last_id, checked, fixed = 0, 0, 0
+        while True:
+            ids = list(Post.all_objects.filter(id__gt=last_id).order_by('id').values_list('id', flat=True)[:batch_size])
+            if not ids:
+                break
+            batch = Post.all_objects.filter(id__gte=ids[0], id__lte=ids[-1])
+            drifted = list(
+                batch.annotate(likes=actual_likes, comments=actual_comments)
+                .filter(~Q(like_count=F('likes')) | ~Q(comment_count=F('comments')))
+                .values_list('id', flat=True)
+            )
+            if drifted:
+                fixed += Post.all_objects.filter(id__in=drifted).update(like_count=actual_likes, comment_count=actual_comments)
+            checked += len(ids)
+            last_id = ids[-1]
+
+        self.stdout.write(self.style.SUCCESS(f'{checked}개 게시물 검사, {fixed}개 좋아요/댓글 수 보정 완료'))
+
+    @staticmethod
+    def count_of(model):
+        return Coalesce(Subquery(
+            model.objects.filter(post=OuterRef('pk')).order_by().values('post').annotate(total=Count('id')).values('total')
+        ), 0)
@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+from django.db.models import OuterRef, Subquery
+
+from community import tag_counts
+from community.models import Post, Tag
+
+
+class Command(BaseCommand):
+    help = '게시물의 tag_part를 태그 기준으로 채우고 게시판별 게시물 수를 다시 계산합니다.'
+
+    def handle(self, *args, **options):
+        # tag_part 필드가 추가되기 전에 작성된 게시물, 태그가 지워진 게시물 정리
+        tag_part = Subquery(Tag.objects.filter(pk=OuterRef('tag_id')).values('part')[:1])
+        filled = Post.all_objects.filter(tag__isnull=False).exclude(tag_part=tag_part).update(tag_part=tag_part)
+        cleared = Post.all_objects.filter(tag__isnull=True).exclude(tag_part='').update(tag_part='')
+        counts = tag_counts.recount()
+        summary = ', '.join(f'{part} {count}개' for part, count in counts.items())
+        self.stdout.write(self.style.SUCCESS(f'tag_part {filled + cleared}개 보정, 게시판별 게시물 수: {summary}'))
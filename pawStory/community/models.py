@@ -1,16 +1,25 @@
 # community/models.py
-from django.db import models
+from django.db import models, transaction
+from django.db.models import F
 from users.models import Member  # users 앱의 Member 모델을 가져옴
+from diaries.models import AliveManager  # 삭제 표시된 행을 숨기는 매니저
+
+TAG_PARTS = [
+    ('TOG', '같이해요'),
+    ('QST', '궁금해요'),
+    ('INF', '정보공유'),
+    ('DAI', '일상공유')  # [로 잘못된 부분 수정]
+]
 
 # 태그 모델
 class Tag(models.Model):
     name = models.CharField(max_length=20)  # 태그 이름
-    part = models.CharField(max_length=4, choices=[
-        ('TOG', '같이해요'),
-        ('QST', '궁금해요'),
-        ('INF', '정보공유'),
-        ('DAI', '일상공유')  # [로 잘못된 부분 수정]
-    ])
+    part = models.CharField(max_length=4, choices=TAG_PARTS)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['name', 'part'], name='unique_tag')  # 동시에 같은 태그가 두 번 만들어지지 않도록 설정
+        ]
 
     def __str__(self):
         return self.name
@@ -22,34 +31,98 @@ class Post(models.Model):
     content = models.TextField()  # 내용
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
-    like_count = models.PositiveIntegerField(default=0)  # 좋아요 수
+    like_count = models.PositiveIntegerField(default=0)  # 좋아요 수 (PostLike 저장/삭제 시 갱신)
+    comment_count = models.PositiveIntegerField(default=0)  # 댓글 수 (PostComment 저장/삭제 시 갱신)
     member = models.ForeignKey(Member, verbose_name='글 작성자', on_delete=models.CASCADE, default=1, related_name='posts')  # 회원정보 키
     tag = models.ForeignKey(Tag, on_delete=models.SET_NULL, null=True, blank=True)  # Tag 모델과 1:N 관계 설정
+    tag_part = models.CharField(max_length=4, blank=True, default='')  # 태그 게시판 코드 (Tag 조인 없이 게시판별 조회용)
+    trending_score = models.FloatField(default=0)  # 인기순 점수 (rescore_trending 명령이 갱신)
+    deleted_at = models.DateTimeField(null=True, blank=True)  # 삭제 표시 일자 (백그라운드에서 실제 삭제)
+
+    objects = AliveManager()
+    all_objects = models.Manager()  # 삭제 표시된 게시물 포함
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['tag_part', '-created_at', '-id'], name='post_tag_part_created_idx'),
+            models.Index(fields=['-trending_score', '-id'], name='post_trending_idx'),
+            models.Index(fields=['-created_at', '-id'], name='post_created_idx'),  # 전체 게시물 최신순
+        ]
 
     def __str__(self):
         return self.content
 
+    def save(self, *args, **kwargs):
+        if self.tag_id is not None:
+            self.tag_part = self.tag.part  # 게시판 코드는 항상 태그를 따라감
+        super().save(*args, **kwargs)
+
+# 게시판별 게시물 수 (게시물 생성/삭제 시 증감)
+class TagPartCount(models.Model):
+    part = models.CharField(max_length=4, choices=TAG_PARTS, primary_key=True)
+    post_count = models.IntegerField(default=0)
+
+    def __str__(self):
+        return f'{self.part}: {self.post_count}'
+
 # 댓글 모델
 class PostComment(models.Model):
-    post = models.ForeignKey(Post, on_delete=models.CASCADE)  # Post 모델과 1:N 관계 설정
+    post = models.ForeignKey(Post, on_delete=models.CASCADE, db_index=False)  # Post 모델과 1:N 관계 설정 (postcomment_post_created_idx가 FK 인덱스 역할)
     user = models.ForeignKey(Member, on_delete=models.CASCADE)  # Member 모델과 1:N 관계 설정
     content = models.TextField()  # 내용
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['created_at'], name='postcomment_created_idx'),
+            models.Index(fields=['post', '-created_at', '-id'], name='postcomment_post_created_idx'),  # 게시물별 댓글 최신순
+        ]
+
     def __str__(self):
         return self.content
 
+    def save(self, *args, **kwargs):
+        # 댓글 저장과 게시물 댓글 수 증가를 한 트랜잭션으로 처리
+        with transaction.atomic():
+            adding = self._state.adding
+            super().save(*args, **kwargs)
+            if adding:
+                Post.all_objects.filter(pk=self.post_id).update(comment_count=F('comment_count') + 1)
+
+    def delete(self, *args, **kwargs):
+        with transaction.atomic():
+            result = super().delete(*args, **kwargs)
+            Post.all_objects.filter(pk=self.post_id, comment_count__gt=0).update(comment_count=F('comment_count') - 1)
+        return result
+
 # 게시물-좋아요 모델
 class PostLike(models.Model):
-    post = models.ForeignKey(Post, on_delete=models.CASCADE)  # Post 모델과 1:N 관계 설정
+    post = models.ForeignKey(Post, on_delete=models.CASCADE, db_index=False)  # Post 모델과 1:N 관계 설정 (unique_post_like가 FK 인덱스 역할)
     user = models.ForeignKey(Member, on_delete=models.CASCADE)  # Member 모델과 1:N 관계 설정
     created_at = models.DateTimeField(auto_now_add=True)
 
     def __str__(self):
         return f'{self.user}님이 {self.post}에 좋아요'  # 사용자가 게시글에 좋아요를 눌렀다는 의미로 문자열 반환
 
+    def save(self, *args, **kwargs):
+        # 좋아요 저장과 게시물 좋아요 수 증가를 한 트랜잭션으로 처리
+        with transaction.atomic():
+            adding = self._state.adding
+            super().save(*args, **kwargs)
+            if adding:
+                Post.all_objects.filter(pk=self.post_id).update(like_count=F('like_count') + 1)
+
+    def delete(self, *args, **kwargs):
+        with transaction.atomic():
+            result = super().delete(*args, **kwargs)
+            Post.all_objects.filter(pk=self.post_id, like_count__gt=0).update(like_count=F('like_count') - 1)
+        return result
+
     class Meta:
         constraints = [
             models.UniqueConstraint(fields=['post', 'user'], name='unique_post_like')  # 게시글과 사용자의 조합이 중복되지 않도록 설정
         ]
+        indexes = [
+            models.Index(fields=['created_at'], name='postlike_created_idx'),  # 인기순 재계산 시 최근 좋아요 조회
+        ]
@@ -1,12 +1,24 @@
+from django.db import transaction
+from django.db.models import Prefetch
+from django.urls import reverse
 from rest_framework import serializers
+from rest_framework.utils.urls import replace_query_param
+from pawStory.pagination import KeysetCursorPagination
+from pawStory.renditions import SrcsetField
 from .models import Post, PostLike, PostComment, Tag
+from . import tag_counts
+from .tags import tag_registry
 from users.models import Member
 
+COMMENT_PREVIEW_SIZE = 3  # 게시물 상세에 포함하는 최신 댓글 수
+
 # 멤버 시리얼라이저
 class MemberSerializer(serializers.ModelSerializer):
+    pet_photo_srcset = SrcsetField('pet_photo', 'pet_photo_renditions')  # 반려동물 사진 축소본
+
     class Meta:
         model = Member
-        fields = ['id', 'user_id', 'pet_photo']  # 멤버 모델에서 id, user_id, pet_photo 필드를 포함
+        fields = ['id', 'user_id', 'pet_photo', 'pet_photo_srcset']  # 멤버 모델에서 id, user_id, pet_photo 필드를 포함
 
 # 태그 시리얼라이저
 class TagSerializer(serializers.ModelSerializer):
@@ -42,8 +54,10 @@ class PostCreateSerializer(serializers.ModelSerializer):
         tag_name = validated_data.pop('tag')  # 입력받은 태그 이름 추출
         tag_part = self.get_tag_part(tag_name)  # 태그 이름을 코드 값으로 변환
         user = self.context['request'].user  # 현재 요청을 보낸 사용자 가져오기
-        tag, created = Tag.objects.get_or_create(name=tag_name, part=tag_part)  # 태그가 없으면 생성, 있으면 가져오기
-        post = Post.objects.create(user=user, tag=tag, **validated_data)  # 새로운 포스트 생성 시 태그와 함께 저장
+        tag = tag_registry.resolve(tag_name, tag_part)  # 메모리에 캐시된 태그 사용, 없으면 생성
+        with transaction.atomic():
+            post = Post.objects.create(user=user, tag=tag, **validated_data)  # 새로운 포스트 생성 시 태그와 함께 저장
+            tag_counts.adjust({post.tag_part: 1})  # 게시판별 게시물 수 증가
         return post
 
     def get_tag_part(self, tag_name):
@@ -58,14 +72,46 @@ class PostCreateSerializer(serializers.ModelSerializer):
 # 포스트 시리얼라이저
 class PostSerializer(serializers.ModelSerializer):
     user = MemberSerializer(read_only=True)  # 작성자를 멤버 시리얼라이저로 포함, 읽기 전용
-    comments = PostCommentSerializer(many=True, read_only=True, source='postcomment_set')  # 댓글을 포함
-    like_count = serializers.IntegerField(source='postlike_set.count', read_only=True)  # 좋아요 수를 포함
-    comment_count = serializers.IntegerField(source='postcomment_set.count', read_only=True)  # 댓글 수를 포함
+    comments = serializers.SerializerMethodField()  # 최신 댓글 일부만 포함
+    comments_next = serializers.SerializerMethodField()  # 나머지 댓글을 이어서 조회할 댓글 목록 URL
     tag = TagSerializer(read_only=True)  # 태그를 태그 시리얼라이저로 포함
 
     class Meta:
         model = Post
-        fields = ['id', 'title', 'content', 'created_at', 'updated_at', 'user', 'comments', 'like_count', 'comment_count', 'tag']  # 포스트 모델에서 필요한 필드 포함
+        fields = ['id', 'title', 'content', 'created_at', 'updated_at', 'user', 'comments', 'comments_next', 'like_count', 'comment_count', 'tag']  # 포스트 모델에서 필요한 필드 포함
+        read_only_fields = ['like_count', 'comment_count']  # 좋아요/댓글 저장 시 갱신되는 값
+
+    @staticmethod
+    def latest_comments_queryset():
+        return PostComment.objects.filter(user__deleted_at__isnull=True).select_related('user').order_by('-created_at', '-id')
+
+    @classmethod
+    def setup_eager_loading(cls, queryset):
+        # 작성자/태그는 조인, 최신 댓글 COMMENT_PREVIEW_SIZE개만 prefetch (댓글이 많아도 조회량이 일정함)
+        return queryset.select_related('user', 'tag').prefetch_related(
+            Prefetch('postcomment_set', queryset=cls.latest_comments_queryset()[:COMMENT_PREVIEW_SIZE], to_attr='latest_comments'),
+        )
+
+    def get_latest_comments(self, obj):
+        if not hasattr(obj, 'latest_comments'):
+            obj.latest_comments = list(self.latest_comments_queryset().filter(post=obj)[:COMMENT_PREVIEW_SIZE])
+        return obj.latest_comments
+
+    def get_comments(self, obj):
+        return PostCommentSerializer(self.get_latest_comments(obj), many=True, context=self.context).data
+
+    def get_comments_next(self, obj):
+        # 미리보기 마지막 댓글 다음부터 시작하는 댓글 목록 커서
+        comments = self.get_latest_comments(obj)
+        if len(comments) < COMMENT_PREVIEW_SIZE or obj.comment_count <= len(comments):
+            return None
+        last = comments[-1]
+        url = reverse('post-comment-list', kwargs={'post_id': obj.pk})
+        request = self.context.get('request')
+        if request is not None:
+            url = request.build_absolute_uri(url)
+        cursor = KeysetCursorPagination().encode_cursor(False, [last.created_at, last.id])
+        return replace_query_param(url, KeysetCursorPagination.cursor_query_param, cursor)
 
 # 포스트리스트 시리얼라이저
 class PostListSerializer(serializers.ModelSerializer):
@@ -0,0 +1,42 @@
+from django.core.signals import request_started
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from pawStory import response_cache
+from .models import Post, PostComment, PostLike, Tag
+from .tags import tag_registry
+
+
+@receiver(request_started)
+def seed_tag_registry(sender, **kwargs):
+    # 워커의 첫 요청에서 태그 맵을 채움 (ready()에서는 DB를 쓰지 않음)
+    request_started.disconnect(seed_tag_registry)
+    tag_registry.load()
+
+
+@receiver(post_save, sender=Tag)
+@receiver(post_delete, sender=Tag)
+def invalidate_tag_registry(sender, created=False, **kwargs):
+    # 새 태그는 resolve가 맵에 넣으므로 전체를 다시 읽게 하지 않음. 수정/삭제만 같은 캐시를 쓰는 프로세스에 알림
+    if not created:
+        tag_registry.invalidate()
+
+
+# 응답 캐시 무효화
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def invalidate_post_responses(sender, instance, **kwargs):
+    response_cache.invalidate('post', instance.pk)
+
+
+@receiver(post_save, sender=PostLike)
+@receiver(post_delete, sender=PostLike)
+def invalidate_post_like_responses(sender, instance, **kwargs):
+    response_cache.invalidate('post', instance.post_id)
+
+
+@receiver(post_save, sender=PostComment)
+@receiver(post_delete, sender=PostComment)
+def invalidate_post_comment_responses(sender, instance, **kwargs):
+    response_cache.invalidate('post', instance.post_id)
+    response_cache.invalidate('post_comments', instance.post_id)
@@ -0,0 +1,51 @@
+# 게시판(태그 part)별 게시물 수
+# 게시판 목록을 열 때마다 COUNT(*)를 하지 않도록 TagPartCount 테이블에 개수를 유지하고,
+# 네 게시판의 개수를 캐시 한 항목에 담아둡니다. 게시물 생성/삭제 시 F()로 증감하고 캐시를 지웁니다.
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, F
+
+from .models import Post, TagPartCount, TAG_PARTS
+
+BOARD_PARTS = [part for part, _ in TAG_PARTS]
+CACHE_KEY = 'community:tag_part_counts'
+CACHE_TIMEOUT = 60 * 10
+
+
+def adjust(deltas):
+    # deltas: {part: 증감} 게시판이 아닌 코드(OTH 등)는 무시
+    deltas = {part: delta for part, delta in deltas.items() if part in BOARD_PARTS and delta}
+    if not deltas:
+        return
+    with transaction.atomic():
+        for part, delta in deltas.items():
+            if not TagPartCount.objects.filter(part=part).update(post_count=F('post_count') + delta):
+                # 아직 행이 없으면 실제 개수로 만들어둠 (방금 반영된 게시물 포함)
+                TagPartCount.objects.get_or_create(part=part, defaults={'post_count': Post.objects.filter(tag_part=part).count()})
+    transaction.on_commit(lambda: cache.delete(CACHE_KEY))
+
+
+def part_counts():
+    # {'TOG': 3, 'QST': 0, ...}
+    counts = cache.get(CACHE_KEY)
+    if counts is None:
+        stored = dict(TagPartCount.objects.values_list('part', 'post_count'))
+        if len(stored) < len(BOARD_PARTS):
+            stored = recount()
+        counts = {part: stored.get(part, 0) for part in BOARD_PARTS}
+        cache.set(CACHE_KEY, counts, CACHE_TIMEOUT)
+    return counts
+
+
+def count_by_part(queryset):
+    return dict(queryset.order_by().values_list('tag_part').annotate(total=Count('id')))
+
+
+def recount():
+    # 실제 게시물 수로 전체를 다시 계산 (처음 실행 시, 또는 reconcile_tag_counts 명령)
+    actual = count_by_part(Post.objects.filter(tag_part__in=BOARD_PARTS))
+    with transaction.atomic():
+        for part in BOARD_PARTS:
+            TagPartCount.objects.update_or_create(part=part, defaults={'post_count': actual.get(part, 0)})
+    cache.delete(CACHE_KEY)
+    return {part: actual.get(part, 0) for part in BOARD_PARTS}
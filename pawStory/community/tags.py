@@ -0,0 +1,57 @@
+# 태그 이름 -> Tag 조회 캐시
+# 태그 종류는 거의 늘지 않으므로 워커 프로세스 메모리에 (이름, part) -> Tag 맵을 들고 있고,
+# 게시물 작성 시에는 맵에서 찾기만 해서 태그 쿼리 없이 저장합니다. 맵은 워커의 첫 요청 때 전체 태그를 읽어 채웁니다.
+# 태그 이름은 사용자가 자유롭게 입력하므로 새 태그는 흔합니다. 새 태그는 만든 프로세스의 맵에만 넣고(다른 프로세스는 맵에
+# 없으면 DB에서 찾아서 넣음) 전체를 다시 읽게 하지 않습니다. 태그가 수정/삭제된 경우에만 Django 캐시의 버전 번호를 바꿔,
+# 같은 캐시를 보는 프로세스의 맵을 다음 조회 때 다시 읽도록 합니다.
+# 캐시를 공유하지 않는 프로세스(locmem을 쓰는 다른 워커)는 버전이 바뀐 것을 알 수 없어 수정/삭제된 태그가 재시작할 때까지
+# 늦게 반영됩니다. (settings.CACHES 참고)
+import threading
+import time
+
+from django.core.cache import cache
+
+from .models import Tag
+
+VERSION_KEY = 'community:tags:version'
+
+
+class TagRegistry:
+    def __init__(self):
+        self._tags = None
+        self._version = None
+        self._lock = threading.Lock()
+
+    def _current_version(self):
+        version = cache.get(VERSION_KEY)
+        if version is None:
+            version = time.time_ns()
+            cache.add(VERSION_KEY, version, None)
+            version = cache.get(VERSION_KEY, version)
+        return version
+
+    def load(self):
+        # 전체 태그를 한 번에 읽어 맵을 만듦 (워커의 첫 요청, 그리고 버전이 바뀌었을 때)
+        version = self._current_version()
+        if self._tags is None or self._version != version:
+            with self._lock:
+                if self._tags is None or self._version != version:
+                    self._tags = {(tag.name, tag.part): tag for tag in Tag.objects.all()}
+                    self._version = version
+        return self._tags
+
+    def resolve(self, name, part):
+        tags = self.load()
+        tag = tags.get((name, part))
+        if tag is None:
+            # 처음 쓰이는 태그: 유니크 제약 덕분에 동시에 만들어도 하나만 생기고, 나머지는 기존 행을 가져옴
+            tag, _ = Tag.objects.get_or_create(name=name, part=part)
+            with self._lock:
+                tags[(name, part)] = tag
+        return tag
+
+    def invalidate(self):
+        cache.set(VERSION_KEY, time.time_ns(), None)
+
+
+tag_registry = TagRegistry()
@@ -1,3 +1,315 @@
+import io
+from datetime import timedelta
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.signals import request_started
+from django.db import connection
+from django.db.models.query import QuerySet
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from accounts.purge import tombstone_member
+from diaries.tests import QueryPlanTestCase, authenticated_client, create_member
+from pawStory.trending import trending_score
+from .models import Post, PostComment, PostLike, Tag, TagPartCount
+from .serializers import COMMENT_PREVIEW_SIZE
+from .signals import seed_tag_registry
+from .tags import VERSION_KEY, TagRegistry, tag_registry
+
+
+class PostQueryPlanTests(QueryPlanTestCase):
+    def setUp(self):
+        super().setUp()
+        self.member = create_member('writer')
+        tag = Tag.objects.create(name='산책', part='TOG')
+        for number in range(3):
+            self.post = Post.objects.create(user=self.member, member=self.member, title=f'title {number}', content='content', tag=tag)
+        PostComment.objects.create(post=self.post, user=self.member, content='first')
+        PostComment.objects.create(post=self.post, user=self.member, content='second')
+        self.client = authenticated_client(self.member)
+
+    def test_post_list(self):
+        response, _ = self.assertIndexedPlan(self.client, '/community/posts?page_size=1', 'community_post', 'post_created_idx')
+        _, plan = self.assertIndexedPlan(self.client, response.data['next'], 'community_post', 'post_created_idx')
+        self.assertTrue(any('created_at<?' in step for step in plan), plan)
+
+    def test_posts_by_tag(self):
+        self.assertIndexedPlan(self.client, '/community/posts/tag/TOG', 'community_post', 'post_tag_part_created_idx')
+
+    def test_trending_list(self):
+        self.assertIndexedPlan(self.client, '/community/posts/trending', 'community_post', 'post_trending_idx')
+
+    def test_comment_list(self):
+        self.assertIndexedPlan(self.client, f'/community/posts/{self.post.id}/comments', 'community_postcomment', 'postcomment_post_created_idx')
+
+
+class KeysetPaginationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.member = create_member('writer')
+        tag = Tag.objects.create(name='산책', part='TOG')
+        posts = [Post.objects.create(user=self.member, member=self.member, title=f'title {number}', content='content', tag=tag) for number in range(7)]
+        Post.objects.filter(pk__in=[post.pk for post in posts[2:5]]).update(created_at=timezone.now())  # 같은 created_at은 id로 구분
+        self.expected = list(Post.objects.order_by('-created_at', '-id').values_list('id', flat=True))
+        self.client = authenticated_client(self.member)
+
+    def walk(self, url, link):
+        pages = []
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            pages.append([item['id'] for item in response.data['results']])
+            url = response.data[link]
+        return pages
+
+    def test_forward_and_backward_round_trip(self):
+        forward = self.walk('/community/posts?page_size=2', 'next')
+        self.assertEqual([post_id for page in forward for post_id in page], self.expected)
+        self.assertEqual([len(page) for page in forward], [2, 2, 2, 1])
+
+        # 마지막 페이지에서 이전 링크를 따라가면 같은 페이지가 역순으로 나옴
+        last = self.client.get('/community/posts?page_size=2')
+        while last.data['next']:
+            last = self.client.get(last.data['next'])
+        backward = self.walk(last.data['previous'], 'previous')
+        self.assertEqual(backward, forward[-2::-1])
+
+    def test_new_post_does_not_shift_pages(self):
+        first = self.client.get('/community/posts?page_size=3')
+        Post.objects.create(user=self.member, member=self.member, title='new', content='content')
+        second = self.client.get(first.data['next'])
+        self.assertEqual([item['id'] for item in second.data['results']], self.expected[3:6])
+
+    def test_invalid_cursor(self):
+        response = self.client.get('/community/posts?cursor=not-a-cursor')
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(response.data['detail'], '잘못된 커서입니다.')
+
+
+class PostDetailQueryTests(TestCase):
+    def setUp(self):
+        self.member = create_member('writer')
+        self.post = Post.objects.create(user=self.member, member=self.member, title='title', content='content')
+        self.client = authenticated_client(self.member)
+
+    def comment(self, count):
+        for number in range(count):
+            PostComment.objects.create(post=self.post, user=self.member, content=str(number))
+
+    def test_query_count_does_not_grow_with_comments(self):
+        self.comment(1)
+        cache.clear()
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(f'/community/posts/{self.post.id}')
+        self.comment(10)
+        cache.clear()
+        with self.assertNumQueries(len(queries.captured_queries)):
+            response = self.client.get(f'/community/posts/{self.post.id}')
+        self.assertEqual(response.data['comment_count'], 11)
+        self.assertEqual(len(response.data['comments']), COMMENT_PREVIEW_SIZE)
+        self.assertIsNotNone(response.data['comments_next'])
+
+
+class PostConditionalGetTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.author = create_member('author')
+        self.post = Post.objects.create(user=self.author, member=self.author, title='title', content='content')
+        self.commenter = create_member('commenter')
+        PostComment.objects.create(post=self.post, user=self.commenter, content='hi')
+        self.client = authenticated_client(self.author)
+
+    def etag(self):
+        response = self.client.get(f'/community/posts/{self.post.id}')
+        self.assertEqual(response.status_code, 200)
+        return response['ETag']
+
+    def assertModified(self, etag):
+        response = self.client.get(f'/community/posts/{self.post.id}', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+        return response.json()
+
+    def test_unchanged_post_answers_304(self):
+        etag = self.etag()
+        self.assertEqual(self.client.get(f'/community/posts/{self.post.id}', HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+    def test_profile_changes_of_author_and_commenter_change_etag(self):
+        for member in (self.author, self.commenter):
+            etag = self.etag()
+            with self.captureOnCommitCallbacks(execute=True):
+                member.user_id = f'{member.user_id}2'
+                member.save()
+            self.assertModified(etag)
+        self.assertEqual(self.assertModified('"stale"')['comments'][0]['user']['user_id'], 'commenter2')
+
+    def test_commenter_tombstone_changes_etag(self):
+        etag = self.etag()
+        with self.captureOnCommitCallbacks(execute=True):
+            tombstone_member(self.commenter)
+        self.assertEqual(self.assertModified(etag)['comments'], [])
+
+
+class TrendingCreateTests(TestCase):
+    def test_new_post_enters_trending_by_creation_time(self):
+        self.addCleanup(tag_registry.invalidate)  # 작성하면서 만든 태그가 맵에 남지 않도록
+        author = create_member('author')
+        old = Post.objects.create(user=author, member=author, title='old', content='old')
+        Post.objects.filter(pk=old.pk).update(trending_score=trending_score(0, 0, timezone.now() - timedelta(days=3)))
+        client = authenticated_client(author)
+        response = client.post('/community/posts/create', {'title': 'new', 'content': 'new', 'tag': '일상공유'}, format='json')
+        self.assertEqual(response.status_code, 201)
+        cache.clear()
+        titles = [item['title'] for item in client.get('/community/posts/trending').data['results']]
+        self.assertEqual(titles, ['new', 'old'])
+
+
+class TagRegistryTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(tag_registry.invalidate)  # 롤백된 태그가 다른 테스트의 맵에 남지 않도록
+        self.tag = Tag.objects.create(name='산책', part='TOG')
+        self.registry = TagRegistry()
+        self.registry.load()
+
+    def test_warm_registry_resolves_without_queries(self):
+        with self.assertNumQueries(0):
+            self.assertEqual(self.registry.resolve('산책', 'TOG'), self.tag)
+
+    def test_new_tag_is_added_without_reloading_every_process(self):
+        other = TagRegistry()  # 같은 캐시를 쓰는 다른 프로세스
+        other.load()
+        version = cache.get(VERSION_KEY)
+        created = self.registry.resolve('놀이터', 'DAI')
+        self.assertEqual(cache.get(VERSION_KEY), version)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.registry.resolve('놀이터', 'DAI'), created)
+            self.assertEqual(other.resolve('산책', 'TOG'), self.tag)  # 전체를 다시 읽지 않음
+        with self.assertNumQueries(1):
+            self.assertEqual(other.resolve('놀이터', 'DAI'), created)  # 맵에 없는 태그만 DB에서 찾음
+
+    def test_concurrent_create_hits_unique_tag(self):
+        existing = Tag.objects.create(name='놀이터', part='DAI')  # 맵을 읽은 뒤 다른 프로세스가 만든 태그
+        get = QuerySet.get
+        raced = []
+
+        def racing_get(queryset, *args, **kwargs):
+            if queryset.model is Tag and not raced:
+                raced.append(True)
+                raise Tag.DoesNotExist  # 확인한 직후 다른 프로세스가 만든 것처럼
+            return get(queryset, *args, **kwargs)
+
+        with mock.patch.object(QuerySet, 'get', racing_get):
+            self.assertEqual(self.registry.resolve('놀이터', 'DAI'), existing)
+        self.assertTrue(raced)
+        self.assertEqual(Tag.objects.filter(name='놀이터', part='DAI').count(), 1)
+
+    def test_update_and_delete_reload_the_map(self):
+        self.tag.name = '산책로'
+        self.tag.save()
+        with self.assertNumQueries(1):
+            self.assertEqual(self.registry.resolve('산책로', 'TOG'), self.tag)
+
+        self.tag.delete()
+        self.assertNotEqual(self.registry.resolve('산책로', 'TOG').pk, self.tag.pk)  # 지워진 태그를 돌려주지 않음
+
+    def test_first_request_seeds_the_map(self):
+        request_started.connect(seed_tag_registry)  # 테스트 실행의 첫 요청에서 이미 해제됨
+        self.addCleanup(request_started.disconnect, seed_tag_registry)
+        registry = TagRegistry()
+        with mock.patch('community.signals.tag_registry', registry):
+            self.client.get('/community/posts/tag/TOG')
+            with self.assertNumQueries(0):
+                self.assertEqual(registry.resolve('산책', 'TOG'), self.tag)
+            with mock.patch.object(registry, 'load') as load:
+                self.client.get('/community/posts/tag/TOG')
+        load.assert_not_called()  # 한 번만 채움
+
+
+class PostCounterTests(TestCase):
+    def setUp(self):
+        self.author = create_member('author')
+        self.post = Post.objects.create(user=self.author, member=self.author, title='title', content='content')
+        self.fan = create_member('fan')
+        self.client = authenticated_client(self.fan)
+
+    def counts(self):
+        self.post.refresh_from_db()
+        return self.post.like_count, self.post.comment_count
+
+    def test_likes_keep_like_count(self):
+        url = f'/community/posts/{self.post.id}'
+        self.assertEqual(self.client.post(f'{url}/like').status_code, 201)
+        self.assertEqual(self.client.post(f'{url}/like').status_code, 400)  # 중복 좋아요는 세지 않음
+        authenticated_client(self.author).post(f'{url}/like')
+        self.assertEqual(self.counts(), (2, 0))
+        self.assertEqual(self.client.delete(f'{url}/unlike').status_code, 204)
+        self.assertEqual(self.client.delete(f'{url}/unlike').status_code, 404)
+        self.assertEqual(self.counts(), (1, 0))
+
+    def test_comments_keep_comment_count(self):
+        url = f'/community/posts/{self.post.id}/comments'
+        ids = [self.client.post(f'{url}/create', {'content': str(number)}, format='json').data['id'] for number in range(3)]
+        self.assertEqual(self.counts(), (0, 3))
+        self.assertEqual(authenticated_client(self.author).delete(f'{url}/{ids[0]}').status_code, 403)  # 남의 댓글
+        self.assertEqual(self.client.delete(f'{url}/{ids[0]}').status_code, 204)
+        self.assertEqual(self.counts(), (0, 2))
+
+    def test_reconcile_fixes_drift(self):
+        PostLike.objects.create(post=self.post, user=self.fan)
+        PostComment.objects.create(post=self.post, user=self.fan, content='hi')
+        untouched = Post.objects.create(user=self.author, member=self.author, title='other', content='other')
+        Post.all_objects.filter(pk=self.post.pk).update(like_count=7, comment_count=0)
+        stdout = io.StringIO()
+        call_command('reconcile_post_counts', '--batch-size', '1', stdout=stdout)
+        self.assertIn('2개 게시물 검사, 1개 좋아요/댓글 수 보정 완료', stdout.getvalue())
+        self.assertEqual(self.counts(), (1, 1))
+        untouched.refresh_from_db()
+        self.assertEqual((untouched.like_count, untouched.comment_count), (0, 0))
+
+
+class TagCountTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(tag_registry.invalidate)  # 작성하면서 만든 태그가 맵에 남지 않도록
+        self.author = create_member('author')
+        self.client = authenticated_client(self.author)
+
+    def create(self, tag):
+        with self.captureOnCommitCallbacks(execute=True):  # 개수 캐시는 커밋 후에 지워짐
+            response = self.client.post('/community/posts/create', {'title': tag, 'content': 'content', 'tag': tag}, format='json')
+        self.assertEqual(response.status_code, 201)
+        return response.data['id']
+
+    def counts(self):
+        response = self.client.get('/community/posts/tag/TOG')
+        self.assertEqual(response.status_code, 200)
+        return response.data['tag_counts']
+
+    def test_counts_follow_create_and_tombstone(self):
+        together = [self.create('같이해요') for _ in range(2)]
+        self.create('일상공유')
+        self.create('자유')  # 게시판이 아닌 태그(OTH)는 세지 않음
+        self.assertEqual(self.counts(), {'TOG': 2, 'QST': 0, 'INF': 0, 'DAI': 1})
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(self.client.delete(f'/community/posts/{together[0]}').status_code, 204)
+        self.assertEqual(self.counts(), {'TOG': 1, 'QST': 0, 'INF': 0, 'DAI': 1})
+
+        with self.captureOnCommitCallbacks(execute=True):
+            tombstone_member(self.author)
+        self.assertEqual(self.counts(), {'TOG': 0, 'QST': 0, 'INF': 0, 'DAI': 0})
 
-# Create your tests here.
+    def test_reconcile_fixes_drift(self):
+        self.create('같이해요')
+        self.create('궁금해요')
+        TagPartCount.objects.filter(part='TOG').update(post_count=9)
+        TagPartCount.objects.filter(part='QST').delete()
+        Post.objects.filter(tag__part='QST').update(tag_part='')  # tag_part가 비어 있는 예전 게시물
+        stdout = io.StringIO()
+        call_command('reconcile_tag_counts', stdout=stdout)
+        self.assertIn('tag_part 1개 보정', stdout.getvalue())
+        self.assertEqual(self.counts(), {'TOG': 1, 'QST': 1, 'INF': 0, 'DAI': 0})
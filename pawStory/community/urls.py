@@ -3,6 +3,7 @@ from .views import *
 
 urlpatterns = [
     path('posts', PostListView.as_view(), name='post-list'),  # 게시물 목록 조회
+    path('posts/trending', PostTrendingListView.as_view(), name='post-trending'),  # 인기 게시물 조회
     path('posts/create', PostCreateView.as_view(), name='post-create'),  # 게시물 생성
     path('posts/<int:pk>', PostDetailView.as_view(), name='post-detail'),  # 게시물 상세 조회, 수정, 삭제
     path('posts/<int:post_id>/like', PostLikeCreateView.as_view(), name='post-like'),  # 게시물 좋아요 생성
@@ -1,11 +1,22 @@
+from django.db import IntegrityError
+from django.db.models import OuterRef, Q, Subquery
+from django.http import Http404
+from django.utils import timezone
 from rest_framework import generics, status
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
-from rest_framework.exceptions import ValidationError 
+from rest_framework.exceptions import NotFound, PermissionDenied, ValidationError 
+from rest_framework.generics import get_object_or_404
 from .models import Post, PostLike, PostComment, Tag
 from .serializers import PostCreateSerializer, PostSerializer, PostListSerializer, PostLikeSerializer, PostCommentSerializer
 from rest_framework.views import APIView  # 스웨거에서 APIView를 사용하기 위해 import
 from drf_yasg.utils import swagger_auto_schema
+from accounts.purge import tombstone_post
+from users.models import Member
+from pawStory.trending import TrendingPagination, trending_score
+from pawStory.conditional import ConditionalListMixin, ConditionalRetrieveMixin, version_etag
+from pawStory.response_cache import CachedListMixin, CachedRetrieveMixin
+from . import tag_counts
 
 # 게시물 생성 뷰
 class PostCreateView(generics.CreateAPIView):
@@ -32,17 +43,19 @@ class PostCreateView(generics.CreateAPIView):
         return Response(post_serializer.data, status=status.HTTP_201_CREATED, headers=headers)
 
     def perform_create(self, serializer): 
-        return serializer.save()
+        # rescore_trending 전에도 작성 시각 기준으로 인기순 목록에 들어가도록 (0이면 맨 뒤로 밀림)
+        return serializer.save(trending_score=trending_score(0, 0, timezone.now()))
 
 # 게시물 목록 조회 뷰
-class PostListView(generics.ListAPIView):
-    queryset = Post.objects.all().order_by('-created_at')  # 생성일 기준으로 내림차순 정렬된 모든 게시물 쿼리셋
+class PostListView(ConditionalListMixin, generics.ListAPIView):
+    queryset = Post.objects.all().select_related('tag').order_by('-created_at')  # 생성일 기준으로 내림차순 정렬된 모든 게시물 쿼리셋
     serializer_class = PostListSerializer  # 게시물 목록 시리얼라이저 사용
     permission_classes = [IsAuthenticated]
+    etag_fields = ('id', 'updated_at', 'tag_id')  # 목록에 보이는 값이 바뀌면 함께 바뀌는 필드
     
     @swagger_auto_schema(
         operation_summary="게시물 목록 조회",
-        operation_description="모든 게시물의 목록을 조회합니다.",
+        operation_description="모든 게시물의 목록을 최신순으로 조회합니다. 다음 페이지는 응답의 next 커서로 조회합니다.",
         responses={
             200: PostListSerializer(many=True),
             400: '잘못된 요청입니다.',
@@ -53,9 +66,31 @@ class PostListView(generics.ListAPIView):
         return super().get(request, *args, **kwargs)
     
 
+# 인기 게시물 목록 조회 뷰
+class PostTrendingListView(ConditionalListMixin, generics.ListAPIView):
+    queryset = Post.objects.all().select_related('tag')
+    serializer_class = PostListSerializer
+    pagination_class = TrendingPagination  # (trending_score, id) 인덱스 순서대로 조회
+    permission_classes = [IsAuthenticated]
+    etag_fields = ('id', 'updated_at', 'tag_id')
+
+    @swagger_auto_schema(
+        operation_summary="인기 게시물 목록 조회",
+        operation_description="좋아요/댓글 수와 작성 시각을 반영한 인기순으로 게시물을 조회합니다. 점수는 주기적으로 갱신됩니다. 다음 페이지는 응답의 next 커서로 조회합니다.",
+        responses={
+            200: PostListSerializer(many=True),
+            400: '잘못된 요청입니다.',
+            500: '서버 오류입니다.'
+        }
+    )
+    def get(self, request, *args, **kwargs):
+        return super().get(request, *args, **kwargs)
+
+
 # 게시물 상세 조회, 수정, 삭제 뷰
-class PostDetailView(generics.RetrieveUpdateDestroyAPIView):
-    queryset = Post.objects.all()  
+class PostDetailView(ConditionalRetrieveMixin, CachedRetrieveMixin, generics.RetrieveUpdateDestroyAPIView):
+    cache_scope = 'post'
+    queryset = PostSerializer.setup_eager_loading(Post.objects.all())  # 댓글/좋아요 수와 상관없이 일정한 쿼리 수로 조회
     serializer_class = PostSerializer  
     permission_classes = [IsAuthenticated]  
     @swagger_auto_schema(
@@ -63,6 +98,7 @@ class PostDetailView(generics.RetrieveUpdateDestroyAPIView):
         operation_description="특정 게시물의 상세 정보를 조회합니다.",
         responses={
             200: PostSerializer,
+            304: '변경되지 않음 (If-None-Match 일치)',
             404: '게시물을 찾을 수 없습니다.',
             500: '서버 오류입니다.'
         }
@@ -96,6 +132,31 @@ class PostDetailView(generics.RetrieveUpdateDestroyAPIView):
     def delete(self, request, *args, **kwargs):
         return super().delete(request, *args, **kwargs)
 
+    def get_validators(self):
+        # 본문/태그는 updated_at, 댓글 미리보기는 comment_count, 작성자/댓글 작성자 프로필은 members_updated_at으로 바뀜을 알 수 있음
+        stamp = Post.objects.filter(pk=self.kwargs['pk']).annotate(members_updated_at=self.members_updated_at()).values_list(
+            'updated_at', 'like_count', 'comment_count', 'tag_id', 'members_updated_at', 'user_id',
+        ).first()
+        if stamp is None:
+            raise Http404
+        self.author_id = stamp[-1]
+        return version_etag(self.kwargs['pk'], *stamp), None  # 좋아요/댓글은 updated_at을 바꾸지 않으므로 ETag만 사용
+
+    @staticmethod
+    def members_updated_at():
+        # 작성자와 댓글 작성자 중 가장 최근에 프로필이 바뀐(탈퇴 포함) 시각 (DiaryDetailView와 같은 방식)
+        # 탈퇴한 회원의 댓글은 미리보기에서 빠지므로 미리보기에 보이는 회원만이 아니라 댓글 작성자 전체를 봄
+        members = Member.objects.filter(
+            Q(pk=OuterRef('user_id')) | Q(pk__in=PostComment.objects.filter(post_id=OuterRef(OuterRef('pk'))).values('user_id'))
+        )
+        return Subquery(members.order_by('-updated_at').values('updated_at')[:1])
+
+    def get_cache_objects(self):
+        return [('post', self.kwargs['pk']), ('member', self.author_id)]  # 작성자 프로필이 바뀌어도 무효화
+
+    def perform_destroy(self, instance):
+        tombstone_post(instance)  # 삭제 표시만 하고 즉시 숨김, 좋아요/댓글은 purge_tombstones가 나눠서 삭제
+
 # 좋아요 생성 뷰
 class PostLikeCreateView(generics.CreateAPIView):
     queryset = PostLike.objects.all()  
@@ -111,12 +172,13 @@ class PostLikeCreateView(generics.CreateAPIView):
             500: '서버 오류입니다.'
         }
     )
-    def post(self, serializer):
+    def post(self, request, *args, **kwargs):
+        post = get_object_or_404(Post, pk=self.kwargs['post_id'])  # 게시물 ID를 기반으로 게시물 가져오기
         try:
-            post = Post.objects.get(pk=self.kwargs['post_id'])  # 게시물 ID를 기반으로 게시물 가져오기
-            serializer.save(user=self.request.user, post=post)  # 좋아요 저장
-        except Post.DoesNotExist:
-            raise ValidationError("좋아요를 누를 게시물을 찾을 수 없습니다.")  # 게시물이 없을 경우 예외 처리
+            like = PostLike.objects.create(user=request.user, post=post)  # 좋아요 저장 (게시물 좋아요 수도 함께 증가)
+        except IntegrityError:
+            raise ValidationError("이미 좋아요를 누른 게시물입니다.")  # unique_post_like 제약 위반
+        return Response(self.get_serializer(like).data, status=status.HTTP_201_CREATED)
 
 # 좋아요 삭제 뷰
 class PostLikeDeleteView(generics.DestroyAPIView):
@@ -133,11 +195,11 @@ class PostLikeDeleteView(generics.DestroyAPIView):
             500: '서버 오류입니다.'
         }
     )
-    def delete(self):
-        try:
-            return PostLike.objects.get(post_id=self.kwargs['post_id'], user=self.request.user)  # 게시물 ID와 사용자 정보를 기반으로 좋아요 객체 가져오기
-        except PostLike.DoesNotExist:
-            raise ValidationError("좋아요를 찾을 수 없습니다")  # 좋아요가 없을 경우 예외 처리
+    def delete(self, request, *args, **kwargs):
+        return super().delete(request, *args, **kwargs)
+
+    def get_object(self):
+        return get_object_or_404(PostLike, post_id=self.kwargs['post_id'], user=self.request.user)  # 게시물 ID와 사용자 정보를 기반으로 좋아요 객체 가져오기
 
 # 댓글 생성 뷰
 class PostCommentCreateView(generics.CreateAPIView):
@@ -155,27 +217,35 @@ class PostCommentCreateView(generics.CreateAPIView):
             500: '서버 오류입니다.'
         }
     )
-    def post(self, serializer):
-        post = Post.objects.get(pk=self.kwargs['post_id'])  # 게시물 ID를 기반으로 게시물 가져오기
-        serializer.save(user=self.request.user, post=post)  # 댓글 저장
+    def post(self, request, *args, **kwargs):
+        return super().post(request, *args, **kwargs)
+
+    def perform_create(self, serializer):
+        post = get_object_or_404(Post, pk=self.kwargs['post_id'])  # 게시물 ID를 기반으로 게시물 가져오기
+        serializer.save(user=self.request.user, post=post)  # 댓글 저장 (게시물 댓글 수도 함께 증가)
 
 # 댓글 목록 조회 뷰
-class PostCommentListView(generics.ListAPIView):
+class PostCommentListView(CachedListMixin, generics.ListAPIView):
     serializer_class = PostCommentSerializer  # 댓글 시리얼라이저 사용
+    cache_scope = 'post_comments'  # 댓글 작성/삭제 시 무효화
+    cache_lookup_kwarg = 'post_id'
     permission_classes = [IsAuthenticated]  # 인증된 사용자만 접근 가능
     
     @swagger_auto_schema(
         operation_summary="댓글 목록 조회",
-        operation_description="특정 게시물에 달린 모든 댓글을 조회합니다.",
+        operation_description="특정 게시물에 달린 댓글을 최신순으로 조회합니다. 다음 페이지는 응답의 next 커서로 조회합니다.",
         responses={
             200: PostCommentSerializer(many=True),
             404: '댓글을 찾을 수 없습니다.',
             500: '서버 오류입니다.'
         }
     )
-    def get(self):
+    def get(self, request, *args, **kwargs):
+        return super().get(request, *args, **kwargs)
+
+    def get_queryset(self):
         post_id = self.kwargs['post_id']  # URL에서 게시물 ID 가져오기
-        return PostComment.objects.filter(post_id=post_id)  # 해당 게시물에 달린 댓글들 가져오기
+        return PostComment.objects.filter(post_id=post_id, user__deleted_at__isnull=True).select_related('user')  # 해당 게시물에 달린 댓글들과 작성자 가져오기 (탈퇴 표시된 회원 제외)
 
 # 댓글 삭제 뷰
 class PostCommentDeleteView(generics.DestroyAPIView):
@@ -188,27 +258,48 @@ class PostCommentDeleteView(generics.DestroyAPIView):
         operation_description="특정 게시물에서 댓글을 삭제합니다.",
         responses={
             204: '삭제됨',
+            403: '본인이 작성한 댓글이 아닙니다.',
             404: '댓글을 찾을 수 없습니다.',
             500: '서버 오류입니다.'
         }
     )
-    def get(self):
-        return PostComment.objects.get(pk=self.kwargs['comment_id'], post_id=self.kwargs['post_id'])  # 댓글 ID와 게시물 ID를 기반으로 댓글 객체 가져오기
+    def delete(self, request, *args, **kwargs):
+        return super().delete(request, *args, **kwargs)
+
+    def get_object(self):
+        comment = get_object_or_404(PostComment, pk=self.kwargs['comment_id'], post_id=self.kwargs['post_id'])  # 댓글 ID와 게시물 ID를 기반으로 댓글 객체 가져오기
+        if comment.user_id != self.request.user.id:
+            raise PermissionDenied("본인이 작성한 댓글만 삭제할 수 있습니다.")
+        return comment
 
 # 태그별 게시물 목록 조회 뷰
-class PostByTagListView(generics.ListAPIView):
-    serializer_class = PostSerializer 
+class PostByTagListView(ConditionalListMixin, generics.ListAPIView):
+    serializer_class = PostListSerializer  # 목록에는 댓글/좋아요 수 없이 가벼운 시리얼라이저 사용
     permission_classes = [IsAuthenticated]  
+    etag_fields = ('id', 'updated_at', 'tag_id')
     
     @swagger_auto_schema(
         operation_summary="태그별 게시물 목록 조회",
-        operation_description="특정 태그에 해당하는 모든 게시물을 조회합니다.",
+        operation_description="특정 게시판(TOG/QST/INF/DAI)의 게시물을 최신순으로 조회합니다. 응답의 tag_counts에 게시판별 게시물 수가 포함됩니다.",
         responses={
-            200: PostSerializer(many=True),
+            200: PostListSerializer(many=True),
             404: '게시물을 찾을 수 없습니다.',
             500: '서버 오류입니다.'
         }
     )
-    def get(self):
+    def get(self, request, *args, **kwargs):
+        return super().get(request, *args, **kwargs)
+
+    def get_etag_extra(self):
+        return tag_counts.part_counts()
+
+    def get_paginated_response(self, data):
+        response = super().get_paginated_response(data)
+        response.data['tag_counts'] = tag_counts.part_counts()  # 캐시된 게시판별 게시물 수
+        return response
+
+    def get_queryset(self):
         tag_part = self.kwargs.get('tag_part')  # URL에서 태그 부분 코드 가져오기
-        return Post.objects.filter(tag__part=tag_part)  # 해당 태그 부분에 맞는 게시물들 가져오기
+        if tag_part not in tag_counts.BOARD_PARTS:
+            raise NotFound("존재하지 않는 게시판입니다.")
+        return Post.objects.filter(tag_part=tag_part).select_related('tag')  # (tag_part, created_at) 인덱스로 Tag 조인 없이 범위 조회
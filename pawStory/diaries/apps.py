@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class DiariesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'diaries'
+
+    def ready(self):
+        from . import signals  # 시그널 수신기 등록
@@ -0,0 +1,90 @@
+# 좋아요 수 쓰기 병합 버퍼
+# 좋아요/좋아요 취소 요청마다 Diary 행을 갱신하면 인기 일기에 쓰기가 몰려 같은 행을 두고 경합이 생깁니다.
+# 요청에서는 프로세스 메모리에 증감분만 쌓고, 짧은 주기마다 한 트랜잭션에서 F() 업데이트로 반영합니다.
+# 반영에 실패하면(예: database is locked) 증감분을 버퍼로 되돌리고 다음 주기에 다시 시도합니다.
+# 프로세스가 비정상 종료되면 반영되지 않은 증감분이 사라질 수 있으므로 reconcile_like_counts 명령으로 보정합니다.
+import atexit
+import logging
+import threading
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import connections, transaction
+from django.db.models import F
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+
+class LikeCountBuffer:
+    def __init__(self):
+        self._pending = defaultdict(int)
+        self._lock = threading.Lock()
+        self._timer = None
+
+    @property
+    def interval(self):
+        return getattr(settings, 'DIARY_LIKE_FLUSH_INTERVAL', 2)
+
+    def add(self, diary_id, delta):
+        if not self.interval:
+            self._apply({diary_id: delta})  # 주기가 0이면 바로 반영
+            return
+        with self._lock:
+            self._pending[diary_id] += delta
+            self._schedule()
+
+    def _schedule(self):
+        # _lock을 잡은 상태에서 호출
+        if self._timer is None:
+            self._timer = threading.Timer(self.interval, self._flush_in_background)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def pending(self, diary_id):
+        # 아직 DB에 반영되지 않은 증감분 (읽기 시 보정용)
+        with self._lock:
+            return self._pending.get(diary_id, 0)
+
+    def flush(self):
+        with self._lock:
+            pending, self._pending = self._pending, defaultdict(int)
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+        try:
+            self._apply(pending)
+        except Exception:
+            self._restore(pending)
+            raise
+
+    def _restore(self, pending):
+        # 한 트랜잭션으로 반영하므로 실패하면 아무것도 반영되지 않음: 전부 버퍼로 되돌림
+        with self._lock:
+            for diary_id, delta in pending.items():
+                self._pending[diary_id] += delta
+            if self._pending and self.interval:
+                self._schedule()
+
+    def _flush_in_background(self):
+        try:
+            self.flush()
+        except Exception:
+            logger.exception('좋아요 수 반영에 실패했습니다. 다음 주기에 다시 시도합니다.')
+        finally:
+            connections.close_all()  # 타이머 스레드가 연 DB 연결 정리
+
+    def _apply(self, pending):
+        from .models import Diary
+
+        changes = {diary_id: delta for diary_id, delta in pending.items() if delta}
+        if not changes:
+            return
+        now = timezone.now()  # 좋아요 수가 바뀌면 일기 버전(updated_at)도 함께 갱신
+        with transaction.atomic():
+            for diary_id, delta in changes.items():
+                Diary.objects.filter(pk=diary_id).update(like_count=F('like_count') + delta, updated_at=now)
+
+
+like_counter = LikeCountBuffer()
+atexit.register(like_counter.flush)
@@ -0,0 +1,43 @@
+from django.core.management.base import BaseCommand
+
+from diaries.models import Diary
+from pawStory.renditions import generate_renditions, needs_renditions, save_renditions
+from users.models import Member
+
+TARGETS = [
+    (Diary, 'photo', 'photo_renditions'),
+    (Member, 'pet_photo', 'pet_photo_renditions'),
+]
+
+
+class Command(BaseCommand):
+    help = '기존 일기 사진과 반려동물 사진의 파생본(너비별 WebP/JPEG)을 생성합니다.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--force', action='store_true', help='이미 생성된 파생본도 다시 생성')
+        parser.add_argument('--batch-size', type=int, default=200, help='한 번에 불러올 행 수')
+
+    def handle(self, *args, **options):
+        for model, field_name, renditions_field in TARGETS:
+            done, failed, last_pk = 0, 0, 0
+            while True:
+                rows = list(
+                    model._base_manager.filter(pk__gt=last_pk).exclude(**{field_name: ''}).exclude(**{f'{field_name}__isnull': True})
+                    .order_by('pk').only('pk', field_name, renditions_field)[:options['batch_size']]
+                )
+                if not rows:
+                    break
+                for instance in rows:
+                    if not options['force'] and not needs_renditions(instance, field_name, renditions_field):
+                        continue
+                    field_file = getattr(instance, field_name)
+                    try:
+                        renditions = generate_renditions(field_file)
+                    except (OSError, ValueError) as e:
+                        failed += 1
+                        self.stderr.write(f'{model.__name__} {instance.pk}: {e}')
+                        continue
+                    save_renditions(model, instance.pk, renditions_field, renditions, **{field_name: field_file.name})
+                    done += 1
+                last_pk = rows[-1].pk
+            self.stdout.write(self.style.SUCCESS(f'{model.__name__}: {done}개 생성, {failed}개 실패'))
@@ -0,0 +1,118 @@
+import os
+import statistics
+import tempfile
+import threading
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import OperationalError, connections, transaction
+
+SCHEMA = [
+    'CREATE TABLE bench_diary (id INTEGER PRIMARY KEY, like_count INTEGER NOT NULL DEFAULT 0, comment_count INTEGER NOT NULL DEFAULT 0)',
+    'CREATE TABLE bench_like (id INTEGER PRIMARY KEY, diary_id INTEGER NOT NULL, member_id INTEGER NOT NULL, created_at REAL NOT NULL)',
+    'CREATE TABLE bench_comment (id INTEGER PRIMARY KEY, diary_id INTEGER NOT NULL, member_id INTEGER NOT NULL, content TEXT NOT NULL, created_at REAL NOT NULL)',
+]
+
+
+class Command(BaseCommand):
+    help = (
+        '임시 SQLite 파일에 좋아요/댓글 쓰기(일기 조회 -> 행 추가 -> 카운터 증가)를 여러 스레드로 동시에 실행해서 '
+        'Django 기본 sqlite3 설정과 운영 설정(settings.DATABASES)의 "database is locked" 비율과 지연 시간(p50/p99)을 비교합니다.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, default=8, help='동시에 쓰는 스레드 수')
+        parser.add_argument('--ops', type=int, default=200, help='스레드마다 실행할 쓰기 수')
+        parser.add_argument('--readers', type=int, default=2, help='계속 목록을 읽는 스레드 수')
+        parser.add_argument('--diaries', type=int, default=50, help='쓰기가 몰리는 일기 수')
+
+    def handle(self, *args, **options):
+        production = settings.DATABASES['default']
+        profiles = [
+            ('기본 설정', {'ENGINE': 'django.db.backends.sqlite3', 'OPTIONS': {}}),
+            ('운영 설정', {'ENGINE': production['ENGINE'], 'OPTIONS': dict(production.get('OPTIONS', {}))}),
+        ]
+        for number, (label, profile) in enumerate(profiles):
+            with tempfile.TemporaryDirectory() as directory:
+                alias = f'benchmark_{number}'
+                self.register(alias, {**profile, 'NAME': os.path.join(directory, 'bench.sqlite3')})
+                try:
+                    self.run_profile(label, alias, options)
+                finally:
+                    connections[alias].close()
+                    del connections[alias]
+                    del connections.settings[alias]
+
+    @staticmethod
+    def register(alias, database):
+        # configure_settings가 TEST, TIME_ZONE 등 나머지 기본값을 채움 ('default' 키가 있어야 함)
+        connections.settings[alias] = connections.configure_settings({'default': database})['default']
+
+    def run_profile(self, label, alias, options):
+        with connections[alias].cursor() as cursor:
+            for statement in SCHEMA:
+                cursor.execute(statement)
+            cursor.executemany('INSERT INTO bench_diary (id) VALUES (%s)', [(number,) for number in range(1, options['diaries'] + 1)])
+
+        latencies, errors, lock = [], [0], threading.Lock()
+        stop = threading.Event()
+
+        def writer(worker):
+            mine, failed = [], 0
+            for op in range(options['ops']):
+                diary_id = (worker * 7 + op) % options['diaries'] + 1
+                started = time.perf_counter()
+                try:
+                    with transaction.atomic(using=alias), connections[alias].cursor() as cursor:
+                        # 뷰와 같은 순서: 일기 조회(읽기) 후 행 추가와 카운터 증가(쓰기)
+                        cursor.execute('SELECT like_count FROM bench_diary WHERE id = %s', [diary_id])
+                        cursor.fetchone()
+                        if op % 3:
+                            cursor.execute('INSERT INTO bench_like (diary_id, member_id, created_at) VALUES (%s, %s, %s)', [diary_id, worker, time.time()])
+                            cursor.execute('UPDATE bench_diary SET like_count = like_count + 1 WHERE id = %s', [diary_id])
+                        else:
+                            cursor.execute(
+                                'INSERT INTO bench_comment (diary_id, member_id, content, created_at) VALUES (%s, %s, %s, %s)',
+                                [diary_id, worker, 'benchmark comment', time.time()],
+                            )
+                            cursor.execute('UPDATE bench_diary SET comment_count = comment_count + 1 WHERE id = %s', [diary_id])
+                except OperationalError as e:
+                    if 'locked' not in str(e):
+                        raise
+                    failed += 1
+                mine.append(time.perf_counter() - started)
+            connections[alias].close()
+            with lock:
+                latencies.extend(mine)
+                errors[0] += failed
+
+        def reader():
+            while not stop.is_set():
+                try:
+                    with connections[alias].cursor() as cursor:
+                        cursor.execute('SELECT id, like_count, comment_count FROM bench_diary ORDER BY like_count DESC LIMIT 20')
+                        cursor.fetchall()
+                except OperationalError:
+                    pass
+            connections[alias].close()
+
+        readers = [threading.Thread(target=reader) for _ in range(options['readers'])]
+        writers = [threading.Thread(target=writer, args=(number,)) for number in range(options['threads'])]
+        started = time.perf_counter()
+        for thread in readers + writers:
+            thread.start()
+        for thread in writers:
+            thread.join()
+        elapsed = time.perf_counter() - started
+        stop.set()
+        for thread in readers:
+            thread.join()
+
+        total = len(latencies)
+        latencies.sort()
+        p99 = latencies[min(total - 1, int(total * 0.99))]
+        self.stdout.write(
+            f'{label}: {total:,}건, 성공 {(total - errors[0]) / elapsed:,.0f}건/초, locked 오류 {errors[0]}건 ({errors[0] / total:.1%}), '
+            f'p50 {statistics.median(latencies) * 1000:.1f}ms, p99 {p99 * 1000:.1f}ms'
+        )
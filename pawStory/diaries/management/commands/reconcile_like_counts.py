@@ -0,0 +1,40 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from diaries.counters import like_counter
+from diaries.models import Diary, DiaryLike
+
+
+class Command(BaseCommand):
+    # 웹 워커의 버퍼에 남은 증감분은 이 명령이 비울 수 없어서, 다시 계산한 값 위에 나중에 더해져 어긋납니다.
+    # 웹 워커를 멈춘 상태(또는 모든 워커가 DIARY_LIKE_FLUSH_INTERVAL = 0으로 즉시 반영하는 상태)에서 실행해야 합니다.
+    help = (
+        'DiaryLike 테이블을 기준으로 Diary.like_count를 정확한 값으로 다시 계산합니다. '
+        '웹 워커를 멈춘 상태에서 실행하세요 (워커에 남은 좋아요 증감분이 보정한 값에 다시 더해짐).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help='한 번에 검사할 일기 수')
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        like_counter.flush()  # 이 프로세스에 남아있는 증감분 먼저 반영
+
+        actual = Coalesce(Subquery(
+            DiaryLike.objects.filter(diary=OuterRef('pk')).order_by().values('diary').annotate(total=Count('id')).values('total')
+        ), 0)
+
+        last_id, checked, fixed = 0, 0, 0
+        while True:
+            ids = list(Diary.objects.filter(id__gt=last_id).order_by('id').values_list('id', flat=True)[:batch_size])
+            if not ids:
+                break
+            batch = Diary.objects.filter(id__gte=ids[0], id__lte=ids[-1])
+            drifted = list(batch.annotate(actual=actual).exclude(like_count=F('actual')).values_list('id', flat=True))
+            if drifted:
+                fixed += Diary.objects.filter(id__in=drifted).update(like_count=actual)
+            checked += len(ids)
+            last_id = ids[-1]
+
+        self.stdout.write(self.style.SUCCESS(f'{checked}개 일기 검사, {fixed}개 좋아요 수 보정 완료'))
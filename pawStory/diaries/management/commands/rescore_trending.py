@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from community.models import Post, PostComment, PostLike
+from diaries.counters import like_counter
+from diaries.models import Diary, DiaryComment, DiaryLike, TrendingCheckpoint
+from pawStory.trending import rescore, touched_ids
+
+
+class Command(BaseCommand):
+    help = '마지막 실행 이후 작성되었거나 좋아요/댓글이 달린 게시물과 일기의 인기순 점수를 다시 계산합니다. 주기적으로 실행합니다.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--full', action='store_true', help='모든 게시물과 일기를 다시 계산 (좋아요/댓글 취소 반영)')
+
+    def handle(self, *args, **options):
+        like_counter.flush()  # 이 프로세스에 남아있는 좋아요 수 증감분 먼저 반영
+        started = timezone.now()  # 실행 중에 생긴 활동은 다음 실행에서 다시 계산되도록 시작 시각을 기록
+
+        post_ids = self.target_ids(Post, 'post', options['full'], [(PostLike, 'post_id'), (PostComment, 'post_id')])
+        post_count = rescore(Post.objects.all(), post_ids, lambda post: (post.like_count, post.comment_count))
+        TrendingCheckpoint.objects.update_or_create(name='post', defaults={'scored_until': started})
+
+        diary_ids = self.target_ids(Diary, 'diary', options['full'], [(DiaryLike, 'diary_id'), (DiaryComment, 'diary_id')])
+        diary_count = rescore(Diary.objects.all(), diary_ids, lambda diary: (diary.like_count, diary.comment_count))
+        TrendingCheckpoint.objects.update_or_create(name='diary', defaults={'scored_until': started})
+
+        self.stdout.write(self.style.SUCCESS(f'게시물 {post_count}개, 일기 {diary_count}개 점수 갱신 완료'))
+
+    @staticmethod
+    def target_ids(model, name, full, related):
+        checkpoint = TrendingCheckpoint.objects.filter(name=name).first()
+        if full or checkpoint is None:
+            return set(model.objects.values_list('id', flat=True))
+        return touched_ids(model, checkpoint.scored_until, related)
@@ -0,0 +1,49 @@
+import sqlite3
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+
+
+class Command(BaseCommand):
+    help = (
+        '기본 DB를 읽기 복제본 파일로 복사합니다. SQLite 온라인 백업 API를 사용하므로 서버를 멈추지 않아도 되고, '
+        '복제본 파일을 그대로 덮어써서 열려 있는 복제본 연결도 다음 읽기부터 새 내용을 봅니다. --interval을 주면 그 주기로 계속 복사합니다.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--interval', type=float, default=0, help='복사 주기(초), 0이면 한 번만 복사')
+        parser.add_argument('--database', action='append', dest='aliases', help='복사할 복제본 별칭 (기본: 설정된 모든 복제본)')
+
+    def handle(self, *args, **options):
+        replicas = getattr(settings, 'REPLICA_DATABASES', [])
+        aliases = options['aliases'] or replicas
+        if not aliases:
+            raise CommandError('설정된 복제본이 없습니다. secrets.json의 DATABASE_REPLICAS를 확인하세요.')
+        unknown = set(aliases) - set(replicas)
+        if unknown:
+            raise CommandError(f"복제본이 아닌 별칭입니다: {', '.join(sorted(unknown))}")
+
+        interval = options['interval']
+        while True:
+            for alias in aliases:
+                elapsed = self.sync(alias)
+                if options['verbosity'] > (1 if interval else 0):  # 주기 실행 중에는 -v 2일 때만 출력
+                    self.stdout.write(f'{alias}: {elapsed * 1000:.0f}ms')
+            if not interval:
+                return
+            time.sleep(interval)
+
+    @staticmethod
+    def sync(alias):
+        source = connections[DEFAULT_DB_ALIAS]
+        source.ensure_connection()
+        started = time.perf_counter()
+        target = sqlite3.connect(connections[alias].settings_dict['NAME'], timeout=20)
+        try:
+            # 한 번에 모든 페이지를 복사: WAL이라 기본 DB의 쓰기는 막지 않고, 복제본 읽기는 복사가 끝날 때까지 이전 내용을 봄
+            source.connection.backup(target)
+        finally:
+            target.close()
+        return time.perf_counter() - started
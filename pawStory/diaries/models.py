@@ -2,6 +2,12 @@ from django.db import models
 from users.models import Member
 from django.db.models import UniqueConstraint
 from django.db.models import F
+from django.utils import timezone
+
+class AliveManager(models.Manager):
+    # 삭제 표시(deleted_at)된 행은 실제로 지워지기 전까지 모든 조회에서 숨김
+    def get_queryset(self):
+        return super().get_queryset().filter(deleted_at__isnull=True)
 
 # Create your models here.
 class Diary(models.Model):
@@ -17,25 +23,47 @@ class Diary(models.Model):
 
     id = models.AutoField(primary_key=True) # 일기 키
     photo = models.ImageField(upload_to='diary_photos/') # 사진
+    photo_renditions = models.JSONField(default=dict, blank=True) # 사진 파생본(너비별 WebP/JPEG) 경로
     content = models.CharField(max_length=100) # 내용
     created_at = models.DateTimeField(auto_now_add=True) # 생성일자
+    updated_at = models.DateTimeField(auto_now=True) # 내용/좋아요/댓글이 마지막으로 바뀐 시각 (조건부 GET 검증자)
     is_public = models.CharField(max_length=10, choices=VISIBILITY_CHOICES, default=PUBLIC) # 공개여부
     like_count = models.IntegerField(default=0) # 좋아요 수
     comment_count = models.IntegerField(default=0) # 댓글 수
-    member = models.ForeignKey(Member, verbose_name="일기 작성자", on_delete=models.CASCADE, related_name="diary") # 회원정보 키
+    trending_score = models.FloatField(default=0) # 인기순 점수 (rescore_trending 명령이 갱신)
+    member = models.ForeignKey(Member, verbose_name="일기 작성자", on_delete=models.CASCADE, related_name="diary", db_index=False) # 회원정보 키 (diary_member_created_idx가 FK 인덱스 역할)
+    deleted_at = models.DateTimeField(null=True, blank=True) # 삭제 표시 일자 (백그라운드에서 실제 삭제)
+
+    objects = AliveManager()
+    all_objects = models.Manager() # 삭제 표시된 일기 포함
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['is_public', '-trending_score', '-id'], name='diary_public_trending_idx'),
+            # 최신순 목록: 공개범위 OR 조건을 행마다 거르면서 정렬 순서대로 읽고 LIMIT에서 멈춤
+            models.Index(fields=['-created_at', '-id'], name='diary_created_idx'),
+            # 회원별 최신 일기 (타임라인 채우기, 읽기 시점 타임라인)
+            models.Index(fields=['member', '-created_at', '-id'], name='diary_member_created_idx'),
+            # 공개범위별 최신 일기
+            models.Index(fields=['is_public', '-created_at', '-id'], name='diary_public_created_idx'),
+        ]
 
     def __str__(self):
         return self.content
 
 class DiaryLike(models.Model):
     id = models.AutoField(primary_key=True) # 좋아요 키
-    member = models.ForeignKey(Member, verbose_name="좋아요한 사람", on_delete=models.CASCADE, related_name="diary_likes") # 회원정보 키
+    member = models.ForeignKey(Member, verbose_name="좋아요한 사람", on_delete=models.CASCADE, related_name="diary_likes", db_index=False) # 회원정보 키 (unique_like가 FK 인덱스 역할)
     diary = models.ForeignKey(Diary, verbose_name="좋아요한 일기", on_delete=models.CASCADE, related_name="diary_likes") # 일기 키
+    created_at = models.DateTimeField(auto_now_add=True) # 생성일자
 
     class Meta:
         constraints = [
                 UniqueConstraint(fields=['member', 'diary'], name='unique_like')
             ]
+        indexes = [
+            models.Index(fields=['created_at'], name='diarylike_created_idx'),
+        ]
 
     def __str__(self):
         return f"{self.member.user_id} likes {self.diary.content[:20]}"
@@ -45,7 +73,13 @@ class DiaryComment(models.Model):
     content = models.CharField(max_length=100) # 내용
     created_at = models.DateTimeField(auto_now_add=True) # 생성일자
     member = models.ForeignKey(Member, verbose_name="댓글 작성자", on_delete=models.CASCADE, related_name="diary_comments") # 회원정보 키
-    diary = models.ForeignKey(Diary, verbose_name="일기", on_delete=models.CASCADE, related_name="diary_comments") # 일기 키
+    diary = models.ForeignKey(Diary, verbose_name="일기", on_delete=models.CASCADE, related_name="diary_comments", db_index=False) # 일기 키 (diarycomment_diary_created_idx가 FK 인덱스 역할)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['created_at'], name='diarycomment_created_idx'),
+            models.Index(fields=['diary', '-created_at', '-id'], name='diarycomment_diary_created_idx'),  # 일기별 댓글 최신순
+        ]
 
     def __str__(self):
         return self.content
@@ -53,19 +87,66 @@ class DiaryComment(models.Model):
     def save(self, *args, **kwargs):
         if self._state.adding:
             self.diary.comment_count = F('comment_count') + 1
-            self.diary.save(update_fields=['comment_count'])
+            self.diary.save(update_fields=['comment_count', 'updated_at'])
         super(DiaryComment, self).save(*args, **kwargs)
 
+    def delete(self, *args, **kwargs):
+        result = super(DiaryComment, self).delete(*args, **kwargs)
+        Diary.all_objects.filter(pk=self.diary_id, comment_count__gt=0).update(
+            comment_count=F('comment_count') - 1, updated_at=timezone.now(),
+        )
+        return result
+
 class Follow(models.Model):
     id = models.AutoField(primary_key=True) # 팔로우 키
-    follower = models.ForeignKey(Member, verbose_name="팔로워", on_delete=models.CASCADE, related_name="following") # 팔로워 키 -> 역참조할 때는 그 사람 입장에서 이 모델이 자기가 팔로우한 사람들에 대한 것.
-    following = models.ForeignKey(Member, verbose_name="팔로잉", on_delete=models.CASCADE, related_name="follower") # 팔로잉 키 -> 역참조할 때는 그 사람 입장에서 이 모델이 자기 팔로워에 대한 것
+    follower = models.ForeignKey(Member, verbose_name="팔로워", on_delete=models.CASCADE, related_name="following", db_index=False) # 팔로워 키 -> 역참조할 때는 그 사람 입장에서 이 모델이 자기가 팔로우한 사람들에 대한 것.
+    following = models.ForeignKey(Member, verbose_name="팔로잉", on_delete=models.CASCADE, related_name="follower", db_index=False) # 팔로잉 키 -> 역참조할 때는 그 사람 입장에서 이 모델이 자기 팔로워에 대한 것
 
     class Meta:
         constraints = [
             UniqueConstraint(fields=['follower', 'following'], name='unique_follow')
         ]
+        indexes = [
+            # 팔로워/팔로잉 목록: 한쪽 회원으로 범위를 잡고 id 역순으로 키셋 페이지네이션
+            # FK 단일 인덱스 대신 사용 (두 FK 모두 db_index=False)
+            models.Index(fields=['following', 'id'], name='follow_following_id_idx'),
+            models.Index(fields=['follower', 'id'], name='follow_follower_id_idx'),
+        ]
 
     def __str__(self):
         return f"{self.follower.user_id} follows {self.following.user_id}"
 
+
+class TimelineEntry(models.Model):
+    id = models.AutoField(primary_key=True) # 타임라인 키
+    owner = models.ForeignKey(Member, verbose_name="타임라인 주인", on_delete=models.CASCADE, related_name="timeline_entries") # 피드를 보는 회원
+    diary = models.ForeignKey(Diary, verbose_name="일기", on_delete=models.CASCADE, related_name="timeline_entries") # 일기 키
+    author = models.ForeignKey(Member, verbose_name="일기 작성자", on_delete=models.CASCADE, related_name="+") # 언팔로우 시 정리용
+    created_at = models.DateTimeField() # 일기 생성일자 (정렬용으로 복사)
+
+    class Meta:
+        constraints = [
+            UniqueConstraint(fields=['owner', 'diary'], name='unique_timeline_entry')
+        ]
+        indexes = [
+            models.Index(fields=['owner', '-created_at', '-diary'], name='timeline_owner_created_idx'),
+            models.Index(fields=['owner', 'author'], name='timeline_owner_author_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.owner_id} <- {self.diary_id}"
+
+class FanoutOnReadAuthor(models.Model):
+    # 팔로워가 너무 많아 쓰기 시점 팬아웃을 하지 않는 작성자 (읽기 시점에 직접 조회)
+    member = models.OneToOneField(Member, verbose_name="작성자", on_delete=models.CASCADE, primary_key=True, related_name="fanout_on_read")
+
+    def __str__(self):
+        return str(self.member_id)
+
+class TrendingCheckpoint(models.Model):
+    # rescore_trending 명령이 마지막으로 점수를 계산한 시각 (이후에 활동이 있었던 글만 다시 계산)
+    name = models.CharField(max_length=20, primary_key=True) # 'post' 또는 'diary'
+    scored_until = models.DateTimeField() # 이 시각까지의 활동은 점수에 반영됨
+
+    def __str__(self):
+        return f"{self.name}: {self.scored_until}"
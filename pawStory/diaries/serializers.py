@@ -1,11 +1,16 @@
+from django.db.models import Prefetch
 from rest_framework import serializers
+from pawStory.renditions import SrcsetField
 from .models import Diary, DiaryLike, DiaryComment, Follow
+from .counters import like_counter
 from users.models import Member
 
 class MemberDiarySerializer(serializers.ModelSerializer):
+    pet_photo_srcset = SrcsetField('pet_photo', 'pet_photo_renditions')
+
     class Meta:
         model = Member
-        fields = ['id', 'user_id', 'pet_photo']
+        fields = ['id', 'user_id', 'pet_photo', 'pet_photo_srcset']
 
 class DiaryCommentSerializer(serializers.ModelSerializer):
     member = MemberDiarySerializer(read_only=True)
@@ -27,31 +32,71 @@ class DiaryCreateSerializer(serializers.ModelSerializer):
         fields = ['id', 'photo', 'content', 'is_public']
 
     def create(self, validated_data):
-        member = self.context['request'].user
-        diary = Diary.objects.create(member=member, **validated_data)
+        validated_data['member'] = self.context['request'].user
+        diary = Diary.objects.create(**validated_data)
         return diary
 
+LIKE_PREVIEW_SIZE = 20  # 일기 상세에 포함하는 최근 좋아요 수
+COMMENT_PREVIEW_SIZE = 20  # 일기 상세에 포함하는 최신 댓글 수 (나머지는 댓글 목록 API로 조회)
+
 class DiarySerializer(serializers.ModelSerializer):
     member = MemberDiarySerializer(read_only=True)
-    likes = DiaryLikeSerializer(many=True, read_only=True, source='diary_likes')
-    comments = DiaryCommentSerializer(many=True, read_only=True, source='diary_comments')
+    likes = serializers.SerializerMethodField()  # 최근 좋아요 일부만 포함
+    comments = serializers.SerializerMethodField()  # 최신 댓글 일부만 포함
     like_count = serializers.SerializerMethodField()
-    comment_count = serializers.SerializerMethodField()
 
     class Meta:
         model = Diary
         fields = ['id', 'photo', 'content', 'created_at', 'is_public', 'member', 'likes', 'comments', 'like_count', 'comment_count']
+        read_only_fields = ['comment_count']  # 댓글 저장/삭제 시 갱신되는 값
+
+    @staticmethod
+    def latest_likes_queryset():
+        # 탈퇴 표시된 회원의 좋아요/댓글은 이미 조인하는 회원 테이블에서 함께 거름
+        return DiaryLike.objects.filter(member__deleted_at__isnull=True).select_related('member').order_by('-id')
+
+    @staticmethod
+    def latest_comments_queryset():
+        return DiaryComment.objects.filter(member__deleted_at__isnull=True).select_related('member').order_by('-created_at', '-id')
+
+    @classmethod
+    def setup_eager_loading(cls, queryset):
+        # 작성자는 조인, 좋아요/댓글은 최근 것만 prefetch해서 좋아요/댓글 수와 상관없이 쿼리 수와 조회량을 일정하게 유지
+        return queryset.select_related('member').prefetch_related(
+            Prefetch('diary_likes', queryset=cls.latest_likes_queryset()[:LIKE_PREVIEW_SIZE], to_attr='latest_likes'),
+            Prefetch('diary_comments', queryset=cls.latest_comments_queryset()[:COMMENT_PREVIEW_SIZE], to_attr='latest_comments'),
+        )
+
+    def get_likes(self, obj):
+        if not hasattr(obj, 'latest_likes'):
+            obj.latest_likes = list(self.latest_likes_queryset().filter(diary=obj)[:LIKE_PREVIEW_SIZE])
+        return DiaryLikeSerializer(obj.latest_likes, many=True, context=self.context).data
+
+    def get_comments(self, obj):
+        if not hasattr(obj, 'latest_comments'):
+            obj.latest_comments = list(self.latest_comments_queryset().filter(diary=obj)[:COMMENT_PREVIEW_SIZE])
+        return DiaryCommentSerializer(obj.latest_comments, many=True, context=self.context).data
 
     def get_like_count(self, obj):
-        return obj.diary_likes.count()
+        return obj.like_count + like_counter.pending(obj.id)  # 비정규화된 좋아요 수 + 아직 반영되지 않은 증감분
+
+class DiaryFeedSerializer(serializers.ModelSerializer):
+    member = MemberDiarySerializer(read_only=True)
+    like_count = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Diary
+        fields = ['id', 'photo', 'content', 'created_at', 'is_public', 'member', 'like_count', 'comment_count']
 
-    def get_comment_count(self, obj):
-        return obj.diary_comments.count()
+    def get_like_count(self, obj):
+        return obj.like_count + like_counter.pending(obj.id)  # 비정규화된 좋아요 수 + 아직 반영되지 않은 증감분
 
 class DiaryListSerializer(serializers.ModelSerializer):
+    photo_srcset = SrcsetField('photo', 'photo_renditions')  # 그리드 타일용 축소 이미지
+
     class Meta:
         model = Diary
-        fields = ['id', 'photo']
+        fields = ['id', 'photo', 'photo_srcset']
 
 class FollowSerializer(serializers.ModelSerializer):
     follower = MemberDiarySerializer(read_only=True)
@@ -59,4 +104,10 @@ class FollowSerializer(serializers.ModelSerializer):
     
     class Meta:
         model = Follow
-        fields = ['id', 'follower', 'following']
\ No newline at end of file
+        fields = ['id', 'follower', 'following']
+
+class ViewerStateSerializer(serializers.Serializer):
+    diary_ids = serializers.ListField(child=serializers.IntegerField())
+    liked = serializers.CharField(help_text="diary_ids 순서대로 좋아요 여부 비트맵 (예: '1001')")
+    member_ids = serializers.ListField(child=serializers.IntegerField())
+    following = serializers.CharField(help_text="member_ids 순서대로 팔로우 여부 비트맵")
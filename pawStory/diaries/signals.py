@@ -0,0 +1,45 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from pawStory import response_cache
+from pawStory.renditions import renditions_saved, schedule_renditions
+from .models import Diary, DiaryComment, DiaryLike, Follow
+
+
+@receiver(post_save, sender=Diary)
+def create_photo_renditions(sender, instance, update_fields=None, **kwargs):
+    # 사진이 바뀐 저장에서만 파생본 생성 예약
+    if update_fields is None or 'photo' in update_fields:
+        schedule_renditions(instance, 'photo', 'photo_renditions')
+
+
+# 응답 캐시 무효화
+@receiver(renditions_saved, sender=Diary)
+def invalidate_diary_rendition_responses(sender, pk, **kwargs):
+    response_cache.invalidate('diary', pk)  # 사진 축소본 (UPDATE로 저장해서 post_save 없음)
+
+
+@receiver(post_save, sender=Diary)
+@receiver(post_delete, sender=Diary)
+def invalidate_diary_responses(sender, instance, **kwargs):
+    response_cache.invalidate('diary', instance.pk)
+    response_cache.invalidate('member', instance.member_id)  # 프로필의 일기 수
+
+
+@receiver(post_save, sender=DiaryLike)
+@receiver(post_delete, sender=DiaryLike)
+def invalidate_diary_like_responses(sender, instance, **kwargs):
+    response_cache.invalidate('diary', instance.diary_id)
+
+
+@receiver(post_save, sender=DiaryComment)
+@receiver(post_delete, sender=DiaryComment)
+def invalidate_diary_comment_responses(sender, instance, **kwargs):
+    response_cache.invalidate('diary', instance.diary_id)
+    response_cache.invalidate('diary_comments', instance.diary_id)
+
+
+@receiver(post_save, sender=Follow)
+@receiver(post_delete, sender=Follow)
+def invalidate_follow_responses(sender, instance, **kwargs):
+    response_cache.invalidate('member', instance.follower_id, instance.following_id)  # 팔로워/팔로잉 수
@@ -1,3 +1,603 @@
-from django.test import TestCase
+import io
+import shutil
+import tempfile
+from datetime import timedelta
+from unittest import mock
 
-# Create your tests here.
+from PIL import Image
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import OperationalError, connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from accounts.purge import tombstone_diary, tombstone_member
+from pawStory.renditions import SrcsetField, _run_in_background, build_renditions, generate_renditions
+from pawStory.trending import trending_score
+from users.models import Member
+from .counters import LikeCountBuffer, like_counter
+from .models import Diary, DiaryComment, DiaryLike, FanoutOnReadAuthor, Follow, TimelineEntry
+from .serializers import COMMENT_PREVIEW_SIZE, LIKE_PREVIEW_SIZE
+from .timeline import fan_out_diary
+from .viewer_state import MAX_VIEWER_STATE_IDS
+
+
+def create_member(user_id, password='password1234'):
+    with override_settings(PASSWORD_HASH_ITERATIONS=1000):  # 테스트에서는 해싱 반복 횟수를 낮춤
+        return Member.objects.create_user(email=f'{user_id}@example.com', user_id=user_id, name=user_id, user_bir='2000-01-01', password=password)
+
+
+def create_diary(member, visibility=Diary.PUBLIC, content='diary'):
+    # 작성 뷰와 같이 팔로워 타임라인까지 채움
+    diary = Diary.objects.create(member=member, content=content, is_public=visibility)
+    fan_out_diary(diary)
+    return diary
+
+
+def walk_pages(client, url):
+    # next 링크를 끝까지 따라가며 [[id, ...], ...] 반환
+    pages = []
+    while url:
+        response = client.get(url)
+        assert response.status_code == 200, response.status_code
+        pages.append([item['id'] for item in response.data['results']])
+        url = response.data['next']
+    return pages
+
+
+def authenticated_client(member):
+    client = APIClient()
+    client.force_authenticate(member)
+    return client
+
+
+class QueryPlanTestCase(TestCase):
+    # 엔드포인트의 주 쿼리를 EXPLAIN QUERY PLAN으로 확인: 지정한 인덱스를 쓰고, 전체 스캔이나 임시 B-트리 정렬이 없어야 함
+
+    def setUp(self):
+        cache.clear()  # 응답 캐시/팔로우 목록 캐시에 적중하면 쿼리가 실행되지 않음
+
+    def query_plan(self, client, url, table, contains=''):
+        # 응답을 만드는 동안 실행된 쿼리 중 table을 읽는 첫 SELECT의 실행 계획
+        with CaptureQueriesContext(connection) as queries:
+            response = client.get(url)
+        self.assertEqual(response.status_code, 200, url)
+        sql = next((
+            query['sql'] for query in queries.captured_queries
+            if query['sql'].startswith('SELECT') and f'FROM "{table}"' in query['sql'] and contains in query['sql']
+        ), None)
+        self.assertIsNotNone(sql, f'{url}: {table} 조회 쿼리가 없습니다.')
+        with connection.cursor() as cursor:
+            cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+            return response, [row[3] for row in cursor.fetchall()]
+
+    def assertIndexedPlan(self, client, url, table, index, contains=''):
+        response, plan = self.query_plan(client, url, table, contains)
+        self.assertTrue(any(f'INDEX {index}' in step for step in plan), f'{url}: {index} 인덱스를 사용하지 않습니다. {plan}')
+        self.assertFalse([step for step in plan if 'TEMP B-TREE' in step], f'{url}: 임시 B-트리로 정렬합니다. {plan}')
+        self.assertFalse([step for step in plan if step.startswith('SCAN') and 'INDEX' not in step], f'{url}: 전체 스캔이 있습니다. {plan}')
+        return response, plan
+
+
+class DiaryQueryPlanTests(QueryPlanTestCase):
+    def setUp(self):
+        super().setUp()
+        self.viewer = create_member('viewer')
+        self.author = create_member('author')
+        Follow.objects.create(follower=self.viewer, following=self.author)
+        for visibility in (Diary.PUBLIC, Diary.FOLLOWERS_ONLY, Diary.PRIVATE, Diary.PUBLIC):
+            self.diary = Diary.objects.create(member=self.author, content=visibility, is_public=visibility)
+        Diary.objects.create(member=self.viewer, content='mine', is_public=Diary.PRIVATE)
+        DiaryComment.objects.create(member=self.viewer, diary=self.diary, content='first')
+        DiaryComment.objects.create(member=self.author, diary=self.diary, content='second')
+        self.client = authenticated_client(self.viewer)
+
+    def test_diary_list_merges_visibility_branches(self):
+        # 공개범위별 쿼리를 각 인덱스 순서대로 읽어 병합 (OR 조건의 전체 정렬 없음)
+        response, plan = self.assertIndexedPlan(self.client, '/diaries/diary?page_size=1', 'diaries_diary', 'diary_public_created_idx')
+        self.assertIn('MERGE (UNION ALL)', plan)
+        self.assertTrue(any('INDEX diary_member_created_idx' in step for step in plan), plan)
+
+        # 다음 페이지는 커서 위치부터 인덱스 범위 스캔
+        _, plan = self.assertIndexedPlan(self.client, response.data['next'], 'diaries_diary', 'diary_public_created_idx')
+        self.assertTrue(any('created_at<?' in step for step in plan), plan)
+
+    def test_diary_list_pages_match_visibility(self):
+        seen, url = [], '/diaries/diary?page_size=2'
+        while url:
+            response = self.client.get(url)
+            seen += [item['id'] for item in response.data['results']]
+            url = response.data['next']
+        visible = Diary.objects.exclude(is_public=Diary.PRIVATE, member=self.author).order_by('-created_at', '-id')
+        self.assertEqual(seen, list(visible.values_list('id', flat=True)))
+
+    def test_trending_list(self):
+        self.assertIndexedPlan(self.client, '/diaries/diary/trending', 'diaries_diary', 'diary_public_trending_idx')
+
+    def test_comment_list(self):
+        self.assertIndexedPlan(self.client, f'/diaries/diary/{self.diary.id}/comments/list', 'diaries_diarycomment', 'diarycomment_diary_created_idx')
+
+    def test_home_timeline(self):
+        self.assertIndexedPlan(self.client, '/diaries/diary/home', 'diaries_timelineentry', 'timeline_owner_created_idx')
+
+    def test_home_timeline_fanout_on_read_authors(self):
+        # 팔로워가 많은 작성자의 일기는 읽을 때 작성자별 최신순 인덱스로 조회
+        FanoutOnReadAuthor.objects.create(member=self.author)
+        self.assertIndexedPlan(self.client, '/diaries/diary/home', 'diaries_diary', 'diary_member_created_idx', contains='"member_id" IN')
+
+
+class HomeTimelineTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.reader = create_member('reader')
+        self.author = create_member('author')
+        Follow.objects.create(follower=self.reader, following=self.author)
+        self.client = authenticated_client(self.reader)
+
+    def timeline_ids(self, page_size=3):
+        return [diary_id for page in walk_pages(self.client, f'/diaries/diary/home?page_size={page_size}') for diary_id in page]
+
+    def test_fan_out_skips_private_diaries(self):
+        public = create_diary(self.author)
+        followers_only = create_diary(self.author, Diary.FOLLOWERS_ONLY)
+        private = create_diary(self.author, Diary.PRIVATE)
+        self.assertEqual(set(TimelineEntry.objects.filter(owner=self.reader).values_list('diary_id', flat=True)), {public.id, followers_only.id})
+        self.assertFalse(TimelineEntry.objects.filter(diary=private).exists())
+        self.assertEqual(self.timeline_ids(), [followers_only.id, public.id])
+
+    def test_tombstoned_diaries_do_not_end_pagination(self):
+        diaries = [create_diary(self.author, content=str(number)) for number in range(10)]
+        for diary in diaries[-2:]:
+            tombstone_diary(diary)  # 엔트리는 정리 작업 전까지 남아 있음
+        self.assertEqual(self.timeline_ids(), [diary.id for diary in reversed(diaries[:-2])])
+
+    def test_fanout_on_read_author_is_merged(self):
+        fanned = create_diary(self.author, content='fanned')
+        loud = create_member('loud')
+        Follow.objects.create(follower=self.reader, following=loud)
+        FanoutOnReadAuthor.objects.create(member=loud)
+        on_read = create_diary(loud, content='on read')
+        self.assertFalse(TimelineEntry.objects.filter(owner=self.reader, diary=on_read).exists())
+        self.assertEqual(self.timeline_ids(page_size=1), [on_read.id, fanned.id])
+
+
+class DiaryVisibilityTests(TestCase):
+    def setUp(self):
+        self.addCleanup(like_counter.flush)
+        cache.clear()
+        self.author = create_member('author')
+        self.follower = create_member('follower')
+        self.stranger = create_member('stranger')
+        Follow.objects.create(follower=self.follower, following=self.author)
+        self.public = create_diary(self.author, Diary.PUBLIC)
+        self.followers_only = create_diary(self.author, Diary.FOLLOWERS_ONLY)
+        self.private = create_diary(self.author, Diary.PRIVATE)
+
+    def list_ids(self, member):
+        return {diary_id for page in walk_pages(authenticated_client(member), '/diaries/diary') for diary_id in page}
+
+    def detail_status(self, member, diary):
+        return authenticated_client(member).get(f'/diaries/diary/{diary.id}').status_code
+
+    def test_list_filters_by_visibility(self):
+        self.assertEqual(self.list_ids(self.author), {self.public.id, self.followers_only.id, self.private.id})
+        self.assertEqual(self.list_ids(self.follower), {self.public.id, self.followers_only.id})
+        self.assertEqual(self.list_ids(self.stranger), {self.public.id})
+
+    def test_hidden_diaries_answer_404(self):
+        self.assertEqual(self.detail_status(self.stranger, self.public), 200)
+        self.assertEqual(self.detail_status(self.stranger, self.followers_only), 404)
+        self.assertEqual(self.detail_status(self.follower, self.followers_only), 200)
+        self.assertEqual(self.detail_status(self.follower, self.private), 404)
+        self.assertEqual(self.detail_status(self.author, self.private), 200)
+
+        client = authenticated_client(self.stranger)
+        self.assertEqual(client.post(f'/diaries/diary/{self.private.id}/like').status_code, 404)
+        self.assertEqual(client.post(f'/diaries/diary/{self.followers_only.id}/comments', {'content': 'hi'}, format='json').status_code, 404)
+
+        DiaryComment.objects.create(member=self.author, diary=self.followers_only, content='hidden')
+        response = client.get(f'/diaries/diary/{self.followers_only.id}/comments/list')
+        self.assertEqual(response.data['results'], [])  # 댓글 목록은 볼 수 없는 일기면 빈 목록
+
+    def test_follow_and_unfollow_invalidate_followee_cache(self):
+        client = authenticated_client(self.stranger)
+        self.assertEqual(self.detail_status(self.stranger, self.followers_only), 404)  # 빈 팔로우 목록이 캐시됨
+        self.assertEqual(client.post('/diaries/follow', {'following': self.author.id}, format='json').status_code, 201)
+        self.assertEqual(self.detail_status(self.stranger, self.followers_only), 200)
+        self.assertEqual(client.delete('/diaries/unfollow', {'following': self.author.id}, format='json').status_code, 204)
+        self.assertEqual(self.detail_status(self.stranger, self.followers_only), 404)
+
+
+class DiaryDetailQueryTests(TestCase):
+    def setUp(self):
+        self.addCleanup(like_counter.flush)  # 버퍼는 프로세스 전역이므로 테스트 트랜잭션 안에서 비움
+        self.author = create_member('author')
+        self.diary = create_diary(self.author)
+        self.client = authenticated_client(self.author)
+
+    def react(self, count):
+        for number in range(count):
+            client = authenticated_client(create_member(f'fan{DiaryLike.objects.count()}'))
+            self.assertEqual(client.post(f'/diaries/diary/{self.diary.id}/like').status_code, 201)
+            self.assertEqual(client.post(f'/diaries/diary/{self.diary.id}/comments', {'content': str(number)}, format='json').status_code, 201)
+
+    def detail_queries(self):
+        cache.clear()  # 응답 캐시 미스 상태에서 측정
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(f'/diaries/diary/{self.diary.id}')
+        self.assertEqual(response.status_code, 200)
+        return response, len(queries.captured_queries)
+
+    def test_query_count_does_not_grow_with_likes_and_comments(self):
+        self.react(1)
+        _, baseline = self.detail_queries()
+        self.react(LIKE_PREVIEW_SIZE + 5)
+        with self.assertNumQueries(baseline):
+            cache.clear()
+            response = self.client.get(f'/diaries/diary/{self.diary.id}')
+        self.assertEqual(len(response.data['likes']), LIKE_PREVIEW_SIZE)
+        self.assertEqual(len(response.data['comments']), COMMENT_PREVIEW_SIZE)
+        self.assertEqual(response.data['like_count'], LIKE_PREVIEW_SIZE + 6)
+        self.assertEqual(response.data['comment_count'], COMMENT_PREVIEW_SIZE + 6)
+        self.assertEqual(response.data['comments'][0]['content'], str(LIKE_PREVIEW_SIZE + 4))  # 최신 댓글부터
+
+
+class DiaryConditionalGetTests(TestCase):
+    def setUp(self):
+        self.addCleanup(like_counter.flush)
+        cache.clear()
+        self.author = create_member('author')
+        self.diary = create_diary(self.author)
+        self.fan = create_member('fan')
+        self.client = authenticated_client(self.author)
+        authenticated_client(self.fan).post(f'/diaries/diary/{self.diary.id}/comments', {'content': 'hi'}, format='json')
+
+    def etag(self):
+        response = self.client.get(f'/diaries/diary/{self.diary.id}')
+        self.assertEqual(response.status_code, 200)
+        return response['ETag']
+
+    def assertNotModified(self, etag):
+        self.assertEqual(self.client.get(f'/diaries/diary/{self.diary.id}', HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+    def assertModified(self, etag):
+        response = self.client.get(f'/diaries/diary/{self.diary.id}', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+        return response
+
+    def test_unchanged_diary_answers_304(self):
+        response = self.client.get(f'/diaries/diary/{self.diary.id}')
+        self.assertNotModified(response['ETag'])
+        self.assertEqual(
+            self.client.get(f'/diaries/diary/{self.diary.id}', HTTP_IF_MODIFIED_SINCE=response['Last-Modified']).status_code, 304,
+        )
+
+    def test_like_changes_etag(self):
+        etag = self.etag()
+        with self.captureOnCommitCallbacks(execute=True):  # 응답 캐시 무효화는 커밋 후에 실행됨
+            authenticated_client(self.fan).post(f'/diaries/diary/{self.diary.id}/like')  # 버퍼에만 쌓인 증감분
+        self.assertEqual(self.assertModified(etag).json()['like_count'], 1)
+
+    def test_profile_changes_of_author_and_commenter_change_etag(self):
+        for member in (self.author, self.fan):
+            etag = self.etag()
+            member.name = f'{member.user_id} renamed'
+            member.save()
+            self.assertModified(etag)
+
+    def test_commenter_tombstone_changes_etag(self):
+        etag = self.etag()
+        tombstone_member(self.fan)
+        self.assertModified(etag)
+
+    def test_hidden_diary_is_404_not_304(self):
+        etag = self.etag()
+        Diary.objects.filter(pk=self.diary.pk).update(is_public=Diary.PRIVATE)
+        response = authenticated_client(self.fan).get(f'/diaries/diary/{self.diary.id}', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 404)
+
+
+class DiaryResponseCacheTests(TestCase):
+    def setUp(self):
+        self.addCleanup(like_counter.flush)
+        cache.clear()
+        self.author = create_member('author')
+        self.diary = create_diary(self.author)
+        self.fan = create_member('fan')
+        self.client = authenticated_client(self.author)
+        fan_client = authenticated_client(self.fan)
+        with self.captureOnCommitCallbacks(execute=True):  # 무효화는 커밋 후에 실행됨
+            fan_client.post(f'/diaries/diary/{self.diary.id}/like')
+            fan_client.post(f'/diaries/diary/{self.diary.id}/comments', {'content': 'hi'}, format='json')
+
+    def get(self, url):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return response['X-Cache'], response.json()
+
+    def detail(self):
+        return self.get(f'/diaries/diary/{self.diary.id}')
+
+    def comment_list(self):
+        return self.get(f'/diaries/diary/{self.diary.id}/comments/list')
+
+    def test_repeated_reads_hit(self):
+        self.assertEqual(self.detail()[0], 'MISS')
+        self.assertEqual(self.detail()[0], 'HIT')
+        self.assertEqual(self.comment_list()[0], 'MISS')
+        self.assertEqual(self.comment_list()[0], 'HIT')
+
+    def test_new_comment_invalidates(self):
+        self.detail(), self.comment_list()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(f'/diaries/diary/{self.diary.id}/comments', {'content': 'reply'}, format='json')
+        status, body = self.detail()
+        self.assertEqual((status, body['comment_count'], body['comments'][0]['content']), ('MISS', 2, 'reply'))
+        self.assertEqual(len(self.comment_list()[1]['results']), 2)
+
+    def test_liker_and_commenter_profile_change_invalidates(self):
+        self.detail(), self.comment_list()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.fan.user_id = 'renamed'
+            self.fan.save()
+        status, body = self.detail()
+        self.assertEqual(status, 'MISS')
+        self.assertEqual(body['likes'][0]['member']['user_id'], 'renamed')
+        self.assertEqual(body['comments'][0]['member']['user_id'], 'renamed')
+        self.assertEqual(self.comment_list()[1]['results'][0]['member']['user_id'], 'renamed')
+
+    def test_commenter_tombstone_invalidates(self):
+        self.detail(), self.comment_list()
+        with self.captureOnCommitCallbacks(execute=True):
+            tombstone_member(self.fan)
+        status, body = self.detail()
+        self.assertEqual((status, body['likes'], body['comments']), ('MISS', [], []))
+        self.assertEqual(self.comment_list()[1]['results'], [])
+
+    def test_login_does_not_invalidate(self):
+        self.detail()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.fan.save(update_fields=['last_login'])
+        self.assertEqual(self.detail()[0], 'HIT')
+
+
+@override_settings(DIARY_LIKE_FLUSH_INTERVAL=60)
+class LikeCountBufferTests(TestCase):
+    def setUp(self):
+        self.diary = create_diary(create_member('author'))
+        self.buffer = LikeCountBuffer()
+        self.addCleanup(self.buffer.flush)
+
+    def test_flush_applies_pending_deltas(self):
+        self.buffer.add(self.diary.id, 1)
+        self.buffer.add(self.diary.id, 1)
+        self.buffer.add(self.diary.id, -1)
+        self.assertEqual(self.buffer.pending(self.diary.id), 1)
+        self.buffer.flush()
+        self.diary.refresh_from_db()
+        self.assertEqual(self.diary.like_count, 1)
+        self.assertEqual(self.buffer.pending(self.diary.id), 0)
+
+    def test_failed_flush_keeps_deltas(self):
+        self.buffer.add(self.diary.id, 2)
+        with mock.patch.object(Diary.objects, 'filter', side_effect=OperationalError('database is locked')):
+            with self.assertRaises(OperationalError):
+                self.buffer.flush()
+        self.assertEqual(self.buffer.pending(self.diary.id), 2)
+        self.assertIsNotNone(self.buffer._timer)  # 다음 주기에 다시 시도
+
+        self.buffer.add(self.diary.id, 1)
+        self.buffer.flush()
+        self.diary.refresh_from_db()
+        self.assertEqual(self.diary.like_count, 3)
+
+    def test_background_flush_logs_failure(self):
+        self.buffer.add(self.diary.id, 1)
+        with mock.patch.object(Diary.objects, 'filter', side_effect=OperationalError('database is locked')):
+            with self.assertLogs('diaries.counters', level='ERROR'):
+                self.buffer._flush_in_background()
+        self.assertEqual(self.buffer.pending(self.diary.id), 1)
+
+    def test_reconcile_fixes_drifted_counts(self):
+        for number in range(3):
+            DiaryLike.objects.create(member=create_member(f'fan{number}'), diary=self.diary)
+        Diary.objects.filter(pk=self.diary.pk).update(like_count=10)
+        call_command('reconcile_like_counts', stdout=io.StringIO())
+        self.diary.refresh_from_db()
+        self.assertEqual(self.diary.like_count, 3)
+
+
+class TrendingCreateTests(TestCase):
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        self.enterContext(override_settings(MEDIA_ROOT=media_root))
+
+    def photo(self):
+        buffer = io.BytesIO()
+        Image.new('RGB', (8, 8)).save(buffer, 'JPEG')
+        return SimpleUploadedFile('photo.jpg', buffer.getvalue(), content_type='image/jpeg')
+
+    def test_new_diary_enters_trending_by_creation_time(self):
+        author = create_member('author')
+        old = Diary.objects.create(member=author, content='old', is_public=Diary.PUBLIC)
+        Diary.objects.filter(pk=old.pk).update(trending_score=trending_score(0, 0, timezone.now() - timedelta(days=3)))
+        client = authenticated_client(author)
+        response = client.post('/diaries/diary/create', {'content': 'new', 'is_public': Diary.PUBLIC, 'photo': self.photo()}, format='multipart')
+        self.assertEqual(response.status_code, 201)
+        cache.clear()
+        ids = [item['id'] for item in client.get('/diaries/diary/trending').data['results']]
+        self.assertEqual(ids, [response.data['id'], old.id])
+
+
+@override_settings(IMAGE_RENDITION_WIDTHS=[100, 200])
+class RenditionTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        self.enterContext(override_settings(MEDIA_ROOT=media_root))
+        self.member = create_member('owner')
+
+    def image_file(self, size=(400, 200), mode='RGB', color=(0, 128, 0), pil_format='JPEG', orientation=None, name='photo.jpg'):
+        buffer = io.BytesIO()
+        image = Image.new(mode, size, color)
+        exif = image.getexif()
+        if orientation is not None:
+            exif[0x0112] = orientation  # EXIF Orientation
+            exif[0x010F] = 'camera'  # EXIF Make (파생본에서는 빠져야 함)
+        image.save(buffer, pil_format, exif=exif)
+        return SimpleUploadedFile(name, buffer.getvalue())
+
+    def diary(self, photo):
+        return Diary.objects.create(member=self.member, content='diary', is_public=Diary.PUBLIC, photo=photo)  # 테스트에서는 커밋 후 예약이 실행되지 않음
+
+    def open_rendition(self, name):
+        with Diary._meta.get_field('photo').storage.open(name, 'rb') as file:
+            image = Image.open(file)
+            image.load()
+        return image
+
+    def test_widths_smaller_than_the_photo(self):
+        renditions = generate_renditions(self.diary(self.image_file(size=(400, 200))).photo)
+        self.assertEqual(sorted(renditions), ['jpeg', 'source', 'webp'])
+        self.assertEqual(sorted(renditions['webp'], key=int), ['100', '200'])
+        self.assertEqual(self.open_rendition(renditions['jpeg']['200']).size, (200, 100))
+        small = generate_renditions(self.diary(self.image_file(size=(50, 40))).photo)
+        self.assertEqual(list(small['jpeg']), ['50'])  # 가장 작은 너비보다 작으면 원래 크기 하나만
+
+    def test_orientation_is_applied_and_exif_is_stripped(self):
+        renditions = generate_renditions(self.diary(self.image_file(size=(400, 200), orientation=6)).photo)
+        self.assertEqual(list(renditions['jpeg']), ['100'])  # 회전 후 200x400
+        image = self.open_rendition(renditions['jpeg']['100'])
+        self.assertEqual(image.size, (100, 200))
+        self.assertEqual(dict(image.getexif()), {})
+
+    def test_transparent_areas_become_background(self):
+        rgba = self.image_file(size=(40, 40), mode='RGBA', color=(0, 0, 0, 0), pil_format='PNG', name='photo.png')
+        buffer = io.BytesIO()
+        Image.new('P', (40, 40), 0).save(buffer, 'PNG', transparency=0)  # 팔레트 이미지의 투명 색
+        palette = SimpleUploadedFile('palette.png', buffer.getvalue())
+        for photo in (rgba, palette):
+            renditions = generate_renditions(self.diary(photo).photo)
+            pixel = self.open_rendition(renditions['jpeg']['40']).getpixel((20, 20))
+            self.assertTrue(all(channel > 245 for channel in pixel), (photo.name, pixel))
+
+    def test_srcset_field(self):
+        diary = self.diary(self.image_file())
+        field = SrcsetField('photo', 'photo_renditions')
+        field.bind('photo_srcset', None)
+        self.assertIsNone(field.to_representation(diary))  # 아직 생성 전
+        diary.photo_renditions = {'source': diary.photo.name, 'webp': {'200': 'a_w200.webp', '100': 'a_w100.webp'}, 'jpeg': {'100': 'a_w100.jpeg'}}
+        self.assertEqual(field.to_representation(diary), {
+            'webp': '/media/a_w100.webp 100w, /media/a_w200.webp 200w',
+            'jpeg': '/media/a_w100.jpeg 100w',
+        })
+        diary.photo_renditions['source'] = 'diary_photos/old.jpg'  # 사진이 바뀐 뒤의 예전 파생본
+        self.assertIsNone(field.to_representation(diary))
+
+    def test_saved_renditions_refresh_cached_responses(self):
+        diary = self.diary(self.image_file())
+        Member.objects.filter(pk=self.member.pk).update(pet_photo=diary.photo.name)  # 시그널 없이 사진만 지정
+        client = authenticated_client(self.member)
+        url = f'/diaries/diary/{diary.id}'
+        client.get(url)
+        response = client.get(url)
+        self.assertEqual(response['X-Cache'], 'HIT')
+        self.assertIsNone(response.json()['member']['pet_photo_srcset'])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            build_renditions(Member, self.member.pk, 'pet_photo', 'pet_photo_renditions')
+        response = client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertIsNotNone(response.json()['member']['pet_photo_srcset'])
+
+        etag = response['ETag']
+        with self.captureOnCommitCallbacks(execute=True):
+            build_renditions(Diary, diary.pk, 'photo', 'photo_renditions')
+        self.assertEqual(client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_background_failure_is_logged(self):
+        diary = self.diary(SimpleUploadedFile('broken.jpg', b'not an image'))
+        with mock.patch('pawStory.renditions.connections'), self.assertLogs('pawStory.renditions', 'ERROR') as logs:
+            _run_in_background(Diary, diary.pk, 'photo', 'photo_renditions')
+        self.assertIn(f'Diary {diary.pk}', logs.output[0])
+
+    def test_backfill_renditions(self):
+        done = self.diary(self.image_file())
+        broken = self.diary(SimpleUploadedFile('broken.jpg', b'not an image'))
+        stdout, stderr = io.StringIO(), io.StringIO()
+        call_command('backfill_renditions', stdout=stdout, stderr=stderr)
+        self.assertIn('Diary: 1개 생성, 1개 실패', stdout.getvalue())
+        self.assertIn(f'Diary {broken.pk}', stderr.getvalue())
+        done.refresh_from_db()
+        self.assertEqual(done.photo_renditions['source'], done.photo.name)
+
+        stdout = io.StringIO()
+        call_command('backfill_renditions', stdout=stdout, stderr=io.StringIO())
+        self.assertIn('Diary: 0개 생성, 1개 실패', stdout.getvalue())  # 이미 생성된 사진은 건너뜀
+
+
+class ViewerStateTests(QueryPlanTestCase):
+    def setUp(self):
+        super().setUp()
+        self.addCleanup(like_counter.flush)
+        self.viewer = create_member('viewer')
+        self.followed, self.other = create_member('followed'), create_member('other')
+        self.liked = create_diary(self.followed)
+        self.unliked = create_diary(self.other)
+        DiaryLike.objects.create(member=self.viewer, diary=self.liked)
+        Follow.objects.create(follower=self.viewer, following=self.followed)
+        self.client = authenticated_client(self.viewer)
+        self.url = f'/diaries/diary/viewer-state?diary_ids={self.liked.id},{self.unliked.id}&member_ids={self.followed.id},{self.other.id}'
+
+    def state(self, client=None):
+        response = (client or self.client).get(self.url)
+        self.assertEqual(response.status_code, 200)
+        return response.data['liked'], response.data['following']
+
+    def test_likes_and_follows_use_one_indexed_query_each(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(self.state(), ('10', '10'))
+        self.assertEqual(len(queries.captured_queries), 2)
+        cache.clear()
+        self.assertIndexedPlan(self.client, self.url, 'diaries_diarylike', 'sqlite_autoindex_diaries_diarylike_1')  # unique_like
+        cache.clear()
+        self.assertIndexedPlan(self.client, self.url, 'diaries_follow', 'sqlite_autoindex_diaries_follow_1')  # unique_follow
+
+    def test_cached_per_viewer(self):
+        self.state()
+        with self.assertNumQueries(0):
+            self.assertEqual(self.state(), ('10', '10'))
+        self.assertEqual(self.state(authenticated_client(self.other)), ('00', '00'))  # 다른 회원의 캐시를 쓰지 않음
+
+    def test_like_and_unlike_invalidate(self):
+        self.state()
+        self.assertEqual(self.client.post(f'/diaries/diary/{self.unliked.id}/like').status_code, 201)
+        self.assertEqual(self.state(), ('11', '10'))
+        self.assertEqual(self.client.delete(f'/diaries/diary/{self.liked.id}/unlike').status_code, 204)
+        self.assertEqual(self.state(), ('01', '10'))
+
+    def test_follow_and_unfollow_invalidate(self):
+        self.state()
+        self.assertEqual(self.client.post('/diaries/follow', {'following': self.other.id}, format='json').status_code, 201)
+        self.assertEqual(self.state(), ('10', '11'))
+        self.assertEqual(self.client.delete('/diaries/unfollow', {'following': self.followed.id}, format='json').status_code, 204)
+        self.assertEqual(self.state(), ('10', '01'))
+
+    def test_followees_are_not_read_without_member_ids(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(f'/diaries/diary/viewer-state?diary_ids={self.liked.id}')
+        self.assertEqual((response.data['liked'], response.data['following']), ('1', ''))
+        self.assertEqual([query['sql'] for query in queries.captured_queries if 'diaries_follow' in query['sql']], [])
+
+    def test_id_limit(self):
+        ids = ','.join(str(number) for number in range(1, MAX_VIEWER_STATE_IDS + 1))
+        self.assertEqual(self.client.get(f'/diaries/diary/viewer-state?diary_ids={ids}').status_code, 200)
+        self.assertEqual(self.client.get(f'/diaries/diary/viewer-state?member_ids={ids},{MAX_VIEWER_STATE_IDS + 1}').status_code, 400)
+        self.assertEqual(self.client.get('/diaries/diary/viewer-state?diary_ids=1,a').status_code, 400)
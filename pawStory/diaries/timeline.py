@@ -0,0 +1,118 @@
+# 팔로잉 홈 타임라인
+# 일기를 작성하면 팔로워들의 타임라인 테이블에 미리 넣어두고(fan-out-on-write),
+# 팔로워가 아주 많은 작성자는 팬아웃 대신 읽을 때 작성자의 일기를 직접 조회합니다(fan-out-on-read).
+from django.conf import settings
+
+from pawStory.pagination import KeysetCursorPagination
+from .models import Diary, Follow, TimelineEntry, FanoutOnReadAuthor
+
+FANOUT_BATCH_SIZE = 1000
+TIMELINE_VISIBILITY = [Diary.PUBLIC, Diary.FOLLOWERS_ONLY]  # 팔로워 피드에 노출되는 공개 범위
+
+
+def fanout_limit():
+    return getattr(settings, 'TIMELINE_FANOUT_LIMIT', 5000)
+
+
+def is_fanout_on_read(author):
+    return FanoutOnReadAuthor.objects.filter(member=author).exists()
+
+
+def fan_out_diary(diary):
+    # 새 일기를 작성자 본인과 팔로워들의 타임라인에 추가
+    if diary.is_public not in TIMELINE_VISIBILITY:
+        return
+    author = diary.member
+    entries = [TimelineEntry(owner=author, diary=diary, author=author, created_at=diary.created_at)]
+    if not is_fanout_on_read(author):
+        if Follow.objects.filter(following=author).count() > fanout_limit():
+            FanoutOnReadAuthor.objects.get_or_create(member=author)
+        else:
+            follower_ids = Follow.objects.filter(following=author).values_list('follower_id', flat=True)
+            entries += [
+                TimelineEntry(owner_id=follower_id, diary=diary, author=author, created_at=diary.created_at)
+                for follower_id in follower_ids.iterator(chunk_size=FANOUT_BATCH_SIZE)
+            ]
+    TimelineEntry.objects.bulk_create(entries, batch_size=FANOUT_BATCH_SIZE, ignore_conflicts=True)
+
+
+def fan_out_diaries(diaries):
+    # 일괄 가져온 일기 여러 개를 한 번에 팬아웃 (작성자별 팔로워를 한 번만 조회)
+    diaries = [diary for diary in diaries if diary.is_public in TIMELINE_VISIBILITY]
+    author_ids = {diary.member_id for diary in diaries}
+    on_read = set(FanoutOnReadAuthor.objects.filter(member_id__in=author_ids).values_list('member_id', flat=True))
+    followers = {}
+    for follower_id, author_id in Follow.objects.filter(following_id__in=author_ids - on_read).values_list('follower_id', 'following_id'):
+        followers.setdefault(author_id, []).append(follower_id)
+    for author_id, ids in followers.items():
+        if len(ids) > fanout_limit():
+            FanoutOnReadAuthor.objects.get_or_create(member_id=author_id)
+            ids.clear()
+    entries = [
+        TimelineEntry(owner_id=owner_id, diary=diary, author_id=diary.member_id, created_at=diary.created_at)
+        for diary in diaries
+        for owner_id in [diary.member_id, *followers.get(diary.member_id, ())]
+    ]
+    TimelineEntry.objects.bulk_create(entries, batch_size=FANOUT_BATCH_SIZE, ignore_conflicts=True)
+
+
+def refresh_timeline(diary):
+    # 일기 공개범위가 바뀌었을 때 타임라인 정리 (비공개로 바뀌면 본인 외 타임라인에서 제거)
+    if diary.is_public in TIMELINE_VISIBILITY:
+        fan_out_diary(diary)
+    else:
+        TimelineEntry.objects.filter(diary=diary).exclude(owner_id=diary.member_id).delete()
+
+
+def backfill_timeline(owner, author):
+    # 새로 팔로우한 작성자의 최근 일기를 타임라인에 채워넣기
+    if is_fanout_on_read(author):
+        return
+    size = getattr(settings, 'TIMELINE_BACKFILL_SIZE', 50)
+    diaries = Diary.objects.filter(member=author, is_public__in=TIMELINE_VISIBILITY).order_by('-created_at', '-id')[:size]
+    TimelineEntry.objects.bulk_create(
+        [TimelineEntry(owner=owner, diary=diary, author=author, created_at=diary.created_at) for diary in diaries],
+        ignore_conflicts=True,
+    )
+
+
+def prune_timeline(owner, author):
+    # 언팔로우한 작성자의 일기를 타임라인에서 제거
+    TimelineEntry.objects.filter(owner=owner, author=author).delete()
+
+
+class HomeTimelinePagination(KeysetCursorPagination):
+    # 타임라인 테이블 범위 스캔 + 팬아웃하지 않는 작성자의 일기 범위 스캔을 병합해서 한 페이지를 만듭니다.
+    def paginate_queryset(self, queryset, request, view=None):
+        self.owner = request.user
+        return super().paginate_queryset(queryset, request, view)
+
+    def fetch(self, queryset, order_by, position, limit):
+        # 타임라인 엔트리는 (created_at, diary_id)가 일기의 (created_at, id)와 같은 값을 가집니다.
+        entry_order = [field.replace('id', 'diary_id') if field.lstrip('-') == 'id' else field for field in order_by]
+        # 삭제 표시된 일기의 엔트리는 정리 작업 전까지 남아 있으므로, 걸러진 만큼 다음 엔트리를 더 읽어서 한 페이지를 채움
+        entries = TimelineEntry.objects.filter(owner=self.owner).order_by(*entry_order)
+        diaries, cursor = [], position
+        while len(diaries) < limit:
+            batch = entries if cursor is None else entries.filter(self._keyset_filter(entry_order, cursor))
+            rows = list(batch.values_list('created_at', 'diary_id')[:limit])
+            if rows:
+                diaries += queryset.filter(id__in=[diary_id for _, diary_id in rows])
+            if len(rows) < limit:
+                break
+            cursor = list(rows[-1])
+
+        author_ids = list(
+            Follow.objects.filter(follower=self.owner, following__fanout_on_read__isnull=False)
+            .values_list('following_id', flat=True)
+        )
+        if author_ids:
+            diaries += super().fetch(
+                queryset.filter(member_id__in=author_ids, is_public__in=TIMELINE_VISIBILITY),
+                order_by, position, limit,
+            )
+
+        # 팬아웃 방식이 바뀐 작성자는 양쪽에 모두 있을 수 있으므로 중복 제거 후 정렬
+        unique = {diary.id: diary for diary in diaries}
+        descending = order_by[0].startswith('-')
+        return sorted(unique.values(), key=lambda diary: (diary.created_at, diary.id), reverse=descending)[:limit]
@@ -3,6 +3,8 @@ from .views import *
 
 urlpatterns = [
     path('diary', DiaryListView.as_view(), name='diary-list'),  # 일기 목록 조회
+    path('diary/home', HomeTimelineView.as_view(), name='diary-home'),  # 홈 타임라인 조회
+    path('diary/trending', DiaryTrendingListView.as_view(), name='diary-trending'),  # 인기 일기 조회
     path('diary/create', DiaryCreateView.as_view(), name='diary-create'),  # 일기 작성
     path('diary/<int:pk>', DiaryDetailView.as_view(), name='diary-detail'),  # 일기 상세 조회, 수정, 삭제
     path('diary/<int:id>/like', DiaryLikeCreateView.as_view(), name='diary-like'),  # 일기 좋아요
@@ -10,6 +12,7 @@ urlpatterns = [
     path('diary/<int:id>/comments', DiaryCommentCreateView.as_view(), name='diary-comment-create'),  # 일기 댓글 작성
     path('diary/<int:id>/comments/list', DiaryCommentListView.as_view(), name='diary-comment-list'),  # 일기 댓글 조회
     path('diary/<int:id>/comments/<int:comment_id>', DiaryCommentDeleteView.as_view(), name='diary-comment-delete'),  # 일기 댓글 삭제
+    path('diary/viewer-state', ViewerStateView.as_view(), name='diary-viewer-state'),  # 좋아요/팔로우 여부 일괄 조회
     path('follow', FollowCreateView.as_view(), name='follow-create'),  # 팔로우
     path('unfollow', FollowDeleteView.as_view(), name='follow-delete'),  # 언팔로우
 ]
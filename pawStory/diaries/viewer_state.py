@@ -0,0 +1,45 @@
+# 조회하는 회원 기준 좋아요/팔로우 여부 일괄 조회
+# 그리드 한 화면(일기 N개)의 상태를 한 번에 계산하고, 회원별로 짧게 캐시합니다.
+# 좋아요 여부는 unique_like (member, diary) 인덱스를 타는 IN 쿼리 한 번,
+# 팔로우 여부는 visibility의 팔로우 목록 캐시(미적중 시 unique_follow 인덱스 쿼리 한 번)로 계산합니다.
+import hashlib
+import time
+
+from django.core.cache import cache
+
+from .models import DiaryLike
+from .visibility import followee_ids, followee_version
+
+VIEWER_STATE_CACHE_TIMEOUT = 30
+MAX_VIEWER_STATE_IDS = 100
+
+
+def _likes_version_key(member_id):
+    return f'viewer_state:likes_version:{member_id}'
+
+
+def invalidate_liked(member_id):
+    # 좋아요/좋아요 취소 후 호출
+    cache.set(_likes_version_key(member_id), time.time_ns(), None)
+
+
+def _bitmap(ids, members):
+    return ''.join('1' if value in members else '0' for value in ids)
+
+
+def viewer_state(viewer, diary_ids, member_ids):
+    likes_version = cache.get(_likes_version_key(viewer.id), 0)
+    digest = hashlib.md5(f'{diary_ids}|{member_ids}'.encode()).hexdigest()
+    key = f'viewer_state:{viewer.id}:{likes_version}:{followee_version(viewer.id)}:{digest}'
+    state = cache.get(key)
+    if state is None:
+        followees = followee_ids(viewer) if member_ids else frozenset()  # 회원 목록이 없으면 팔로우 목록을 읽지 않음
+        liked = set(DiaryLike.objects.filter(member_id=viewer.id, diary_id__in=diary_ids).values_list('diary_id', flat=True)) if diary_ids else set()
+        state = {
+            'diary_ids': diary_ids,
+            'liked': _bitmap(diary_ids, liked),
+            'member_ids': member_ids,
+            'following': _bitmap(member_ids, followees),
+        }
+        cache.set(key, state, VIEWER_STATE_CACHE_TIMEOUT)
+    return state
@@ -1,9 +1,21 @@
+from django.db import transaction
+from django.db.models import OuterRef, Q, Subquery
+from django.utils import timezone
 from rest_framework import generics, status
 from rest_framework.permissions import IsAuthenticated, AllowAny
 from rest_framework.response import Response
 from rest_framework.generics import get_object_or_404
 from .models import Diary, DiaryLike, DiaryComment, Follow, Member
-from .serializers import DiaryCreateSerializer, DiarySerializer, DiaryListSerializer, DiaryLikeSerializer, DiaryCommentSerializer, FollowSerializer
+from .serializers import DiaryCreateSerializer, DiarySerializer, DiaryListSerializer, DiaryFeedSerializer, DiaryLikeSerializer, DiaryCommentSerializer, FollowSerializer, ViewerStateSerializer
+from .counters import like_counter
+from .viewer_state import viewer_state, invalidate_liked, MAX_VIEWER_STATE_IDS
+from accounts.purge import tombstone_diary
+from accounts import stats as member_stats
+from .visibility import VisibleDiaryPagination, visible_q, can_view, get_visible_diary_or_404, invalidate_followees
+from pawStory.trending import TrendingPagination, trending_score
+from pawStory.conditional import ConditionalListMixin, ConditionalRetrieveMixin, version_etag
+from pawStory.response_cache import CachedListMixin, CachedRetrieveMixin
+from .timeline import HomeTimelinePagination, fan_out_diary, refresh_timeline, backfill_timeline, prune_timeline
 from rest_framework.exceptions import ValidationError
 from drf_yasg.utils import swagger_auto_schema
 from drf_yasg import openapi
@@ -47,16 +59,21 @@ class DiaryCreateView(generics.CreateAPIView):
         return Response(serializer.data, status=status.HTTP_201_CREATED, headers=headers)
 
     def perform_create(self, serializer):
-        serializer.save(member=self.request.user)
+        with transaction.atomic():
+            # rescore_trending 전에도 작성 시각 기준으로 인기순 목록에 들어가도록 (0이면 맨 뒤로 밀림)
+            diary = serializer.save(member=self.request.user, trending_score=trending_score(0, 0, timezone.now()))
+            member_stats.adjust(diary.member_id, post_count=1)  # 프로필 일기 수
+        fan_out_diary(diary)  # 팔로워들의 홈 타임라인에 추가
 
-class DiaryListView(generics.ListAPIView):
-    queryset = Diary.objects.all().order_by('-created_at')
+class DiaryListView(ConditionalListMixin, generics.ListAPIView):
     serializer_class = DiaryListSerializer
+    pagination_class = VisibleDiaryPagination
     permission_classes = [IsAuthenticated]
+    etag_fields = ('id', 'updated_at', 'photo_renditions')  # 목록에 보이는 사진/축소본이 바뀌면 함께 바뀌는 필드
 
     @swagger_auto_schema(
         operation_summary="일기 목록 조회",
-        operation_description="모든 일기의 목록을 조회합니다.",
+        operation_description="볼 수 있는 일기(전체 공개, 팔로우한 사람의 팔로워 공개, 내 일기)의 목록을 최신순으로 조회합니다. 다음 페이지는 응답의 next 커서로 조회합니다.",
          manual_parameters=[openapi.Parameter(
             'Authorization',
             openapi.IN_HEADER,
@@ -74,8 +91,65 @@ class DiaryListView(generics.ListAPIView):
         response = super().list(request, *args, **kwargs)
         return response
 
-class DiaryDetailView(generics.RetrieveUpdateDestroyAPIView):
-    queryset = Diary.objects.all()
+    def get_queryset(self):
+        return Diary.objects.filter(visible_q(self.request.user)).order_by('-created_at')
+
+class DiaryTrendingListView(ConditionalListMixin, generics.ListAPIView):
+    serializer_class = DiaryListSerializer
+    pagination_class = TrendingPagination
+    permission_classes = [IsAuthenticated]
+    etag_fields = ('id', 'updated_at', 'photo_renditions')
+
+    @swagger_auto_schema(
+        operation_summary="인기 일기 목록 조회",
+        operation_description="전체 공개 일기를 좋아요/댓글 수와 작성 시각을 반영한 인기순으로 조회합니다. 점수는 주기적으로 갱신됩니다. 다음 페이지는 응답의 next 커서로 조회합니다.",
+        manual_parameters=[authorization_header],
+        responses={
+            200: DiaryListSerializer(many=True),
+            400: '잘못된 요청입니다.',
+            500: '서버 오류입니다.'
+        }
+    )
+    def get(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+
+    def get_queryset(self):
+        return Diary.objects.filter(is_public=Diary.PUBLIC)  # (is_public, trending_score, id) 인덱스 범위 스캔
+
+class HomeTimelineView(ConditionalListMixin, generics.ListAPIView):
+    serializer_class = DiaryFeedSerializer
+    pagination_class = HomeTimelinePagination
+    permission_classes = [IsAuthenticated]
+
+    @swagger_auto_schema(
+        operation_summary="홈 타임라인 조회",
+        operation_description="내가 팔로우한 사람들과 나의 일기를 최신순으로 조회합니다. 다음 페이지는 응답의 next 커서로 조회합니다.",
+        manual_parameters=[openapi.Parameter(
+            'Authorization',
+            openapi.IN_HEADER,
+            description="Bearer [JWT token]",
+            type=openapi.TYPE_STRING,
+            required=True
+        )],
+        responses={
+            200: DiaryFeedSerializer(many=True),
+            400: '잘못된 요청입니다.',
+            500: '서버 오류입니다.'
+        }
+    )
+    def get(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+
+    def get_queryset(self):
+        return Diary.objects.exclude(is_public=Diary.PRIVATE).select_related('member')
+
+    def get_item_stamp(self, item):
+        # 아직 반영되지 않은 좋아요 증감분과 작성자 프로필 변경도 포함
+        return (item.id, item.updated_at, like_counter.pending(item.id), item.member.updated_at)
+
+class DiaryDetailView(ConditionalRetrieveMixin, CachedRetrieveMixin, generics.RetrieveUpdateDestroyAPIView):
+    cache_scope = 'diary'  # 공개범위 확인(get_validators) 뒤에만 캐시를 사용
+    queryset = DiarySerializer.setup_eager_loading(Diary.objects.all())
     serializer_class = DiarySerializer
     permission_classes = [IsAuthenticated]
 
@@ -91,6 +165,7 @@ class DiaryDetailView(generics.RetrieveUpdateDestroyAPIView):
         )],
         responses={
             200: DiarySerializer,
+            304: '변경되지 않음 (If-None-Match/If-Modified-Since 일치)',
             404: '해당 일기를 찾을 수 없습니다.',
             500: '서버 오류입니다.'
         }
@@ -99,6 +174,43 @@ class DiaryDetailView(generics.RetrieveUpdateDestroyAPIView):
         response = super().retrieve(request, *args, **kwargs)
         return response
 
+    def get_object(self):
+        # 공개범위상 볼 수 없는 일기는 404
+        diary = get_visible_diary_or_404(self.request.user, self.get_queryset(), pk=self.kwargs['pk'])
+        self.check_object_permissions(self.request, diary)
+        return diary
+
+    def get_validators(self):
+        # 좋아요/댓글을 불러오기 전에 버전 값만 읽음. 볼 수 없는 일기는 여기서 404
+        diary = get_visible_diary_or_404(
+            self.request.user,
+            Diary.objects.only('id', 'member_id', 'is_public', 'updated_at', 'like_count', 'comment_count').annotate(
+                members_updated_at=self.members_updated_at(),
+            ),
+            pk=self.kwargs['pk'],
+        )
+        self.author_id = diary.member_id
+        pending = like_counter.pending(diary.id)
+        etag = version_etag(
+            diary.id, diary.updated_at, diary.is_public, diary.like_count, diary.comment_count, pending, diary.members_updated_at,
+        )
+        return etag, None if pending else diary.updated_at  # 아직 반영되지 않은 좋아요가 있으면 updated_at이 최신이 아님
+
+    @staticmethod
+    def members_updated_at():
+        # 응답에 프로필이 들어가는 작성자, 좋아요/댓글을 남긴 회원 중 가장 최근에 프로필이 바뀐(탈퇴 포함) 시각
+        # 탈퇴 표시된 회원도 포함해야 미리보기에서 빠지는 것을 알 수 있음 (tombstone_member가 updated_at을 바꿈)
+        diary = OuterRef(OuterRef('pk'))
+        members = Member.objects.filter(
+            Q(pk=OuterRef('member_id'))
+            | Q(pk__in=DiaryLike.objects.filter(diary_id=diary).values('member_id'))
+            | Q(pk__in=DiaryComment.objects.filter(diary_id=diary).values('member_id'))
+        )
+        return Subquery(members.order_by('-updated_at').values('updated_at')[:1])
+
+    def get_cache_objects(self):
+        return [('diary', self.kwargs['pk']), ('member', self.author_id)]
+
     @swagger_auto_schema(
         operation_summary="일기 수정",
         operation_description="특정 일기의 내용을 수정합니다.",
@@ -122,6 +234,12 @@ class DiaryDetailView(generics.RetrieveUpdateDestroyAPIView):
         response = super().update(request, *args, **kwargs)
         return response
 
+    def perform_update(self, serializer):
+        previous_visibility = serializer.instance.is_public
+        diary = serializer.save()
+        if diary.is_public != previous_visibility:
+            refresh_timeline(diary)  # 공개범위 변경 시 타임라인 갱신
+
     @swagger_auto_schema(
         operation_summary="일기 삭제",
         operation_description="특정 일기를 삭제합니다.",
@@ -144,10 +262,8 @@ class DiaryDetailView(generics.RetrieveUpdateDestroyAPIView):
         return Response(status=status.HTTP_204_NO_CONTENT)
 
     def perform_destroy(self, instance):
-        # 일기와 관련된 좋아요와 댓글 모두 삭제
-        DiaryLike.objects.filter(diary=instance).delete()
-        DiaryComment.objects.filter(diary=instance).delete()
-        instance.delete()
+        # 삭제 표시만 하고 즉시 숨김, 좋아요/댓글/타임라인 항목과 일기는 purge_tombstones가 나눠서 삭제
+        tombstone_diary(instance)
 
 class DiaryLikeCreateView(generics.CreateAPIView):
     queryset = DiaryLike.objects.all()
@@ -171,12 +287,14 @@ class DiaryLikeCreateView(generics.CreateAPIView):
         }
     )
     def post(self, request, *args, **kwargs):
-        diary = get_object_or_404(Diary, id=self.kwargs['id'])
+        diary = get_visible_diary_or_404(self.request.user, id=self.kwargs['id'])
         if DiaryLike.objects.filter(member=self.request.user, diary=diary).exists():
             raise ValidationError('You have already liked this diary.')
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
         serializer.save(member=self.request.user, diary=diary)
+        like_counter.add(diary.id, 1)  # 좋아요 수는 모아서 주기적으로 반영
+        invalidate_liked(self.request.user.id)
         return Response(serializer.data, status=status.HTTP_201_CREATED)
 
 class DiaryLikeDeleteView(generics.DestroyAPIView):
@@ -201,7 +319,7 @@ class DiaryLikeDeleteView(generics.DestroyAPIView):
         }
     )
     def get_object(self):
-        return DiaryLike.objects.get(diary_id=self.kwargs['id'], member=self.request.user)
+        return get_object_or_404(DiaryLike, diary_id=self.kwargs['id'], member=self.request.user)
 
     def delete(self, request, *args, **kwargs):
         instance = self.get_object()
@@ -210,6 +328,50 @@ class DiaryLikeDeleteView(generics.DestroyAPIView):
 
     def perform_destroy(self, instance):
         instance.delete()
+        like_counter.add(instance.diary_id, -1)
+        invalidate_liked(instance.member_id)
+
+class ViewerStateView(generics.GenericAPIView):
+    serializer_class = ViewerStateSerializer
+    permission_classes = [IsAuthenticated]
+    pagination_class = None
+
+    @swagger_auto_schema(
+        operation_summary="좋아요/팔로우 여부 일괄 조회",
+        operation_description="여러 일기에 대한 내 좋아요 여부와 여러 회원에 대한 내 팔로우 여부를 한 번에 조회합니다. "
+                              f"diary_ids, member_ids는 쉼표로 구분하며 각각 최대 {MAX_VIEWER_STATE_IDS}개까지 가능합니다.",
+        manual_parameters=[
+            openapi.Parameter(
+                'Authorization',
+                openapi.IN_HEADER,
+                description="Bearer [JWT token]",
+                type=openapi.TYPE_STRING,
+                required=True
+            ),
+            openapi.Parameter('diary_ids', openapi.IN_QUERY, description="일기 ID 목록 (예: 1,2,3)", type=openapi.TYPE_STRING),
+            openapi.Parameter('member_ids', openapi.IN_QUERY, description="회원 ID 목록 (예: 4,5)", type=openapi.TYPE_STRING),
+        ],
+        responses={
+            200: ViewerStateSerializer,
+            400: '잘못된 요청입니다.',
+            500: '서버 오류입니다.'
+        }
+    )
+    def get(self, request, *args, **kwargs):
+        diary_ids = self.parse_ids('diary_ids')
+        member_ids = self.parse_ids('member_ids')
+        state = viewer_state(request.user, diary_ids, member_ids)
+        return Response(self.get_serializer(state).data)
+
+    def parse_ids(self, param):
+        raw = self.request.query_params.get(param, '')
+        try:
+            ids = [int(value) for value in raw.split(',') if value.strip()]
+        except ValueError:
+            raise ValidationError({param: '숫자 ID를 쉼표로 구분해서 입력해주세요.'})
+        if len(ids) > MAX_VIEWER_STATE_IDS:
+            raise ValidationError({param: f'최대 {MAX_VIEWER_STATE_IDS}개까지 조회할 수 있습니다.'})
+        return ids
 
 class DiaryCommentCreateView(generics.CreateAPIView):
     queryset = DiaryComment.objects.all()
@@ -234,7 +396,7 @@ class DiaryCommentCreateView(generics.CreateAPIView):
         }
     )
     def perform_create(self, serializer):
-        diary = Diary.objects.get(pk=self.kwargs['id'])
+        diary = get_visible_diary_or_404(self.request.user, pk=self.kwargs['id'])
         serializer.save(member=self.request.user, diary=diary)
 
     def create(self, request, *args, **kwargs):
@@ -243,13 +405,15 @@ class DiaryCommentCreateView(generics.CreateAPIView):
         self.perform_create(serializer)
         return Response(serializer.data, status=status.HTTP_201_CREATED)
 
-class DiaryCommentListView(generics.ListAPIView):
+class DiaryCommentListView(CachedListMixin, generics.ListAPIView):
     serializer_class = DiaryCommentSerializer
     permission_classes = [IsAuthenticated]
+    cache_scope = 'diary_comments'
+    cache_lookup_kwarg = 'id'
 
     @swagger_auto_schema(
         operation_summary="일기 댓글 목록 조회",
-        operation_description="특정 일기에 달린 모든 댓글을 조회합니다.",
+        operation_description="특정 일기에 달린 댓글을 최신순으로 조회합니다. 다음 페이지는 응답의 next 커서로 조회합니다.",
         manual_parameters=[openapi.Parameter(
             'Authorization',
             openapi.IN_HEADER,
@@ -263,14 +427,20 @@ class DiaryCommentListView(generics.ListAPIView):
             500: '서버 오류입니다.'
         }
     )
+    def get(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+
+    def use_cache(self):
+        # 볼 수 있는 일기의 댓글만 캐시된 응답을 공유 (볼 수 없으면 캐시 없이 빈 목록)
+        diary = Diary.objects.only('id', 'member_id', 'is_public').filter(pk=self.kwargs['id']).first()
+        return diary is not None and can_view(diary, self.request.user)
+
     def get_queryset(self):
         diary_id = self.kwargs['id']
-        return DiaryComment.objects.filter(diary_id=diary_id)
-
-    def list(self, request, *args, **kwargs):
-        queryset = self.get_queryset()
-        serializer = self.get_serializer(queryset, many=True)
-        return Response(serializer.data)
+        # 공개범위 조건을 일기 조인에 함께 걸어서 별도 조회 없이 거르기
+        return DiaryComment.objects.filter(
+            visible_q(self.request.user, prefix='diary__'), diary_id=diary_id, member__deleted_at__isnull=True,
+        ).select_related('member')
 
 class DiaryCommentDeleteView(generics.DestroyAPIView):
     queryset = DiaryComment.objects.all()
@@ -294,7 +464,7 @@ class DiaryCommentDeleteView(generics.DestroyAPIView):
         }
     )
     def get_object(self):
-        return DiaryComment.objects.get(pk=self.kwargs['comment_id'], diary_id=self.kwargs['id'])
+        return get_object_or_404(DiaryComment, pk=self.kwargs['comment_id'], diary_id=self.kwargs['id'])
 
     def delete(self, request, *args, **kwargs):
         instance = self.get_object()
@@ -328,12 +498,17 @@ class FollowCreateView(generics.CreateAPIView):
     )
     def perform_create(self, serializer):
         follower = self.request.user
-        following = Member.objects.get(pk=self.request.data['following'])
+        following = get_object_or_404(Member, pk=self.request.data['following'], deleted_at__isnull=True)
         if follower == following:
             raise ValidationError('You cannot follow yourself.')
         if Follow.objects.filter(follower=follower, following=following).exists():
             raise ValidationError('You are already following this user.')
-        serializer.save(follower=follower, following=following)
+        with transaction.atomic():
+            serializer.save(follower=follower, following=following)
+            member_stats.adjust(follower.id, following_count=1)  # 프로필 팔로잉/팔로워 수
+            member_stats.adjust(following.id, follower_count=1)
+        invalidate_followees(follower.id)  # 팔로우 목록 캐시 무효화
+        backfill_timeline(follower, following)  # 팔로우한 사람의 최근 일기를 타임라인에 추가
 
     def create(self, request, *args, **kwargs):
         serializer = self.get_serializer(data=request.data)
@@ -373,4 +548,9 @@ class FollowDeleteView(generics.DestroyAPIView):
         return Response(status=status.HTTP_204_NO_CONTENT)
 
     def perform_destroy(self, instance):
-        instance.delete()
+        prune_timeline(instance.follower, instance.following)  # 언팔로우한 사람의 일기를 타임라인에서 제거
+        with transaction.atomic():
+            instance.delete()
+            member_stats.adjust(instance.follower_id, following_count=-1)
+            member_stats.adjust(instance.following_id, follower_count=-1)
+        invalidate_followees(instance.follower_id)  # 팔로우 목록 캐시 무효화
@@ -0,0 +1,108 @@
+# 일기 공개범위(public/followers/private) 판단
+# 조회하는 회원이 팔로우한 사람 목록을 버전이 붙은 캐시 키로 저장해두고,
+# 팔로우/언팔로우 시 버전을 바꿔 무효화합니다. 캐시 적중 시 상세 조회의 권한 확인은 추가 쿼리가 없습니다.
+# 버전 키는 Django 기본 캐시에 있으므로, 캐시를 공유하지 않는 다른 프로세스(locmem을 쓰는 다른 워커, 관리 명령)에는
+# 무효화가 전달되지 않고 FOLLOWEE_CACHE_TIMEOUT이 지날 때까지 예전 목록으로 판단합니다. (settings.CACHES 참고)
+import time
+
+from django.core.cache import cache
+from django.db.models import Q
+from django.http import Http404
+from rest_framework.generics import get_object_or_404
+
+from pawStory.pagination import KeysetCursorPagination
+from .models import Diary, Follow
+
+FOLLOWEE_CACHE_TIMEOUT = 60 * 10
+FOLLOWEE_IN_LIST_LIMIT = 500  # 이보다 많이 팔로우하면 IN 목록 대신 서브쿼리 사용
+
+
+def _version_key(member_id):
+    return f'followees:version:{member_id}'
+
+
+def followee_version(member_id):
+    version = cache.get(_version_key(member_id))
+    if version is None:
+        # 버전 키가 만료되었을 때 예전 목록과 겹치지 않도록 시각으로 초기화
+        version = time.time_ns()
+        cache.add(_version_key(member_id), version, None)
+        version = cache.get(_version_key(member_id), version)
+    return version
+
+
+def followee_ids(member):
+    key = f'followees:{member.id}:{followee_version(member.id)}'
+    ids = cache.get(key)
+    if ids is None:
+        ids = frozenset(Follow.objects.filter(follower_id=member.id).values_list('following_id', flat=True))
+        cache.set(key, ids, FOLLOWEE_CACHE_TIMEOUT)
+    return ids
+
+
+def invalidate_followees(member_id):
+    # 팔로우/언팔로우 후 호출. 같은 캐시를 쓰는 프로세스에만 바로 반영됨
+    cache.set(_version_key(member_id), time.time_ns(), None)
+
+
+def _followers_only_q(viewer, prefix=''):
+    # 팔로우한 사람의 팔로워 공개 일기. 팔로우한 사람이 없으면 None
+    followees = followee_ids(viewer)
+    if len(followees) > FOLLOWEE_IN_LIST_LIMIT:
+        return Q(**{
+            f'{prefix}is_public': Diary.FOLLOWERS_ONLY,
+            f'{prefix}member_id__in': Follow.objects.filter(follower_id=viewer.id).values('following_id'),
+        })
+    if followees:
+        return Q(**{f'{prefix}is_public': Diary.FOLLOWERS_ONLY, f'{prefix}member_id__in': followees})
+    return None
+
+
+def visible_q(viewer, prefix=''):
+    # 목록 조회용: 하나의 WHERE 조건으로 공개범위를 거릅니다. prefix는 'diary__' 처럼 조인 경로
+    q = Q(**{f'{prefix}is_public': Diary.PUBLIC}) | Q(**{f'{prefix}member_id': viewer.id})
+    followers_only = _followers_only_q(viewer, prefix)
+    if followers_only is not None:
+        q |= followers_only
+    return q
+
+
+def visible_branches(viewer):
+    # visible_q를 서로 겹치지 않는 조건으로 나눈 목록. 각 조건은 (공개범위 또는 작성자, created_at, id) 인덱스 하나로 정렬 순서대로 읽힘
+    branches = [Q(is_public=Diary.PUBLIC), Q(member_id=viewer.id) & ~Q(is_public=Diary.PUBLIC)]
+    followers_only = _followers_only_q(viewer)
+    if followers_only is not None:
+        branches.append(followers_only & ~Q(member_id=viewer.id))
+    return branches
+
+
+class VisibleDiaryPagination(KeysetCursorPagination):
+    # 공개범위 OR 조건으로는 인덱스 하나를 정렬 순서대로 읽을 수 없어서 매번 전체를 정렬하게 됩니다.
+    # 조건별 쿼리를 UNION ALL로 묶으면 SQLite가 각 쿼리를 인덱스 순서대로 읽으면서 병합하고 LIMIT에서 멈춥니다.
+    def paginate_queryset(self, queryset, request, view=None):
+        self.viewer = request.user
+        return super().paginate_queryset(queryset, request, view)
+
+    def fetch(self, queryset, order_by, position, limit):
+        queryset = queryset.order_by()  # UNION의 각 쿼리에는 ORDER BY를 둘 수 없음
+        if position is not None:
+            queryset = queryset.filter(self._keyset_filter(order_by, position))
+        parts = [queryset.filter(branch) for branch in visible_branches(self.viewer)]
+        return list(parts[0].union(*parts[1:], all=True).order_by(*order_by)[:limit])
+
+
+def can_view(diary, viewer):
+    # 상세 조회용: 이미 불러온 일기에 대해 쿼리 없이 판단 (팔로우 목록 캐시 적중 시)
+    if diary.is_public == Diary.PUBLIC or diary.member_id == viewer.id:
+        return True
+    if diary.is_public == Diary.FOLLOWERS_ONLY:
+        return diary.member_id in followee_ids(viewer)
+    return False
+
+
+def get_visible_diary_or_404(viewer, queryset=None, **lookup):
+    # 볼 수 없는 일기는 존재 여부를 드러내지 않도록 404로 응답
+    diary = get_object_or_404(Diary.objects.all() if queryset is None else queryset, **lookup)
+    if not can_view(diary, viewer):
+        raise Http404
+    return diary
@@ -0,0 +1,66 @@
+# 조건부 GET (ETag / Last-Modified)
+# 상세/목록 응답을 만들기 전에 행의 버전 값(updated_at, 좋아요/댓글 수 등)만 가볍게 읽어서 검증자를 만들고,
+# 클라이언트가 보낸 If-None-Match / If-Modified-Since와 일치하면 직렬화 없이 304로 응답합니다.
+import hashlib
+
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date, quote_etag
+from rest_framework.response import Response
+
+
+def version_etag(*values):
+    # 버전 값들의 해시로 만든 강한 ETag
+    return quote_etag(hashlib.sha1(repr(values).encode('utf-8')).hexdigest())
+
+
+def conditional_response(request, etag, last_modified, render):
+    # render: 검증자가 일치하지 않을 때만 호출해서 실제 응답을 만드는 함수
+    timestamp = int(last_modified.timestamp()) if last_modified is not None else None
+    response = get_conditional_response(request, etag=etag, last_modified=timestamp)
+    if response is None:
+        response = render()
+    if response.status_code in (200, 304):
+        if etag is not None:
+            response.headers['ETag'] = etag
+        if timestamp is not None:
+            response.headers['Last-Modified'] = http_date(timestamp)
+        patch_vary_headers(response, ['Authorization'])  # 회원마다 보이는 내용이 다를 수 있음
+    return response
+
+
+class ConditionalRetrieveMixin:
+    # 상세 조회: get_validators()가 (etag, last_modified)를 반환, 객체가 없으면 Http404
+    def get_validators(self):
+        raise NotImplementedError
+
+    def retrieve(self, request, *args, **kwargs):
+        etag, last_modified = self.get_validators()
+        render = super().retrieve
+        return conditional_response(request, etag, last_modified, lambda: render(request, *args, **kwargs))
+
+
+class ConditionalListMixin:
+    # 목록 조회: 현재 페이지 항목의 버전 값과 페이지 링크로 ETag를 만들고, 일치하면 직렬화하지 않음
+    etag_fields = ('id', 'updated_at')
+
+    def get_item_stamp(self, item):
+        return tuple(getattr(item, field) for field in self.etag_fields)
+
+    def get_etag_extra(self):
+        # 항목 외에 응답에 포함되는 값 (예: 게시판별 게시물 수)
+        return None
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        page = self.paginate_queryset(queryset)
+        items = list(queryset) if page is None else page
+        links = None if page is None else (self.paginator.get_next_link(), self.paginator.get_previous_link())
+        etag = version_etag([self.get_item_stamp(item) for item in items], links, self.get_etag_extra())
+
+        def render():
+            serializer = self.get_serializer(items, many=True)
+            if page is None:
+                return Response(serializer.data)
+            return self.get_paginated_response(serializer.data)
+
+        return conditional_response(request, etag, None, render)
@@ -0,0 +1,37 @@
+# 운영용 SQLite 백엔드
+# Django 4.2 기본 sqlite3 백엔드에 두 가지 OPTIONS를 더합니다. (Django 5.1부터는 기본 백엔드가 같은 이름으로 지원)
+#   init_command: 연결을 열 때마다 실행할 PRAGMA 목록 (WAL, synchronous, busy_timeout, mmap_size, cache_size 등)
+#   transaction_mode: atomic 블록을 BEGIN IMMEDIATE로 시작해서 처음부터 쓰기 잠금을 잡음
+# 기본(DEFERRED) 트랜잭션은 읽기로 시작했다가 쓰기로 올라가는 순간 다른 쓰기와 부딪히면 busy_timeout을 기다리지 않고
+# 바로 "database is locked"로 실패합니다. IMMEDIATE는 BEGIN에서 잠금을 기다리므로 쓰기가 차례로 처리됩니다.
+from django.core.exceptions import ImproperlyConfigured
+from django.db.backends.sqlite3 import base
+
+TRANSACTION_MODES = ('DEFERRED', 'IMMEDIATE', 'EXCLUSIVE')
+EXTRA_OPTIONS = ('init_command', 'transaction_mode')
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        options = self.settings_dict['OPTIONS']
+        mode = options.get('transaction_mode')
+        if mode is not None and mode.upper() not in TRANSACTION_MODES:
+            raise ImproperlyConfigured(f"transaction_mode는 {', '.join(TRANSACTION_MODES)} 중 하나여야 합니다.")
+        self.transaction_mode = mode.upper() if mode else None
+        self.init_commands = [command.strip() for command in options.get('init_command', '').split(';') if command.strip()]
+
+    def get_connection_params(self):
+        params = super().get_connection_params()
+        for name in EXTRA_OPTIONS:
+            params.pop(name, None)  # sqlite3.connect()가 모르는 옵션
+        return params
+
+    def get_new_connection(self, conn_params):
+        conn = super().get_new_connection(conn_params)
+        for command in self.init_commands:
+            conn.execute(command)
+        return conn
+
+    def _start_transaction_under_autocommit(self):
+        self.cursor().execute(f'BEGIN {self.transaction_mode}' if self.transaction_mode else 'BEGIN')
@@ -0,0 +1,117 @@
+import base64
+import json
+from datetime import date
+
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import CursorPagination
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+# 키셋(커서) 페이지네이션
+# OFFSET 대신 마지막으로 본 행의 (created_at, id) 값보다 뒤에 있는 행만 조회합니다.
+# 페이지 깊이와 상관없이 인덱스 범위 스캔 한 번으로 끝나고, 새 글이 추가되어도 이미 본 페이지가 밀리지 않습니다.
+class KeysetCursorPagination(CursorPagination):
+    ordering = ('-created_at', '-id')  # 정렬 키 (마지막 필드는 반드시 유일해야 함)
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    invalid_cursor_message = '잘못된 커서입니다.'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        self.model = queryset.model
+        reverse, position = self.decode_cursor(request)
+
+        # 이전 페이지로 이동할 때는 정렬을 뒤집어서 조회한 뒤 결과를 다시 뒤집습니다.
+        order_by = [self._flip(field) for field in self.ordering] if reverse else list(self.ordering)
+        results = self.fetch(queryset, order_by, position, self.page_size + 1)
+
+        has_more = len(results) > self.page_size
+        self.page = results[:self.page_size]
+        if reverse:
+            self.page.reverse()
+
+        self.first_position = self._position(self.page[0]) if self.page else None
+        self.last_position = self._position(self.page[-1]) if self.page else None
+        if reverse:
+            self.has_next = True
+            self.has_previous = has_more
+        else:
+            self.has_next = has_more
+            self.has_previous = position is not None
+        return self.page
+
+    def fetch(self, queryset, order_by, position, limit):
+        if position is not None:
+            queryset = queryset.filter(self._keyset_filter(order_by, position))
+        return list(queryset.order_by(*order_by)[:limit])
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        if self.last_position is None:
+            # 앞쪽으로 더 이상 행이 없으면 첫 페이지로 돌아갑니다.
+            return remove_query_param(self.base_url, self.cursor_query_param)
+        return self._link(False, self.last_position)
+
+    def get_previous_link(self):
+        if not self.has_previous or self.first_position is None:
+            return None
+        return self._link(True, self.first_position)
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded is None:
+            return False, None
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(encoded.encode('ascii')).decode('utf-8'))
+            reverse = bool(payload['r'])
+            values = payload['p']
+            if len(values) != len(self.ordering):
+                raise ValueError
+            position = [
+                self.model._meta.get_field(field.lstrip('-')).to_python(value)
+                for field, value in zip(self.ordering, values)
+            ]
+        except Exception:
+            raise NotFound(self.invalid_cursor_message)
+        return reverse, position
+
+    def encode_cursor(self, reverse, position):
+        # DjangoJSONEncoder는 마이크로초를 잘라내므로 날짜는 직접 isoformat으로 직렬화합니다.
+        values = [value.isoformat() if isinstance(value, date) else value for value in position]
+        payload = json.dumps({'r': int(reverse), 'p': values}, separators=(',', ':'))
+        return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii')
+
+    def _link(self, reverse, position):
+        return replace_query_param(self.base_url, self.cursor_query_param, self.encode_cursor(reverse, position))
+
+    def _position(self, instance):
+        names = [field.lstrip('-') for field in self.ordering]
+        if isinstance(instance, dict):
+            return [instance[name] for name in names]
+        return [getattr(instance, name) for name in names]
+
+    @staticmethod
+    def _flip(field):
+        return field[1:] if field.startswith('-') else '-' + field
+
+    @staticmethod
+    def _keyset_filter(order_by, position):
+        # (a, b) 내림차순 기준: a < 값a OR (a = 값a AND b < 값b)
+        keyset = Q()
+        for index, field in enumerate(order_by):
+            name = field.lstrip('-')
+            lookup = 'lt' if field.startswith('-') else 'gt'
+            condition = Q(**{f'{name}__{lookup}': position[index]})
+            for prev_field, prev_value in zip(order_by[:index], position[:index]):
+                condition &= Q(**{prev_field.lstrip('-'): prev_value})
+            keyset |= condition
+        # OR 조건만으로는 SQLite가 인덱스 범위를 잡지 못하므로 첫 정렬 키의 범위를 따로 붙여서 범위 스캔 시작점으로 사용
+        first = order_by[0]
+        bound = Q(**{f"{first.lstrip('-')}__{'lte' if first.startswith('-') else 'gte'}": position[0]})
+        return bound & keyset
@@ -0,0 +1,155 @@
+# 업로드 이미지 파생본(썸네일) 생성
+# 원본 옆에 여러 너비의 WebP/JPEG 파일을 만들어두고 (예: diary_photos/a_w320.webp),
+# 어떤 파일이 만들어졌는지는 모델의 *_renditions JSON 필드에 기록합니다.
+# 생성은 요청 스레드가 아닌 백그라운드 스레드 풀에서 커밋 이후에 실행됩니다.
+# 파생본은 UPDATE로 저장하므로 post_save 대신 renditions_saved 시그널로 응답 캐시를 무효화합니다.
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import connections, transaction
+from django.dispatch import Signal
+from django.utils import timezone
+from PIL import Image, ImageOps
+from rest_framework import serializers
+
+logger = logging.getLogger(__name__)
+
+RENDITION_FORMATS = {
+    'webp': ('WEBP', {'quality': 80, 'method': 4}),
+    'jpeg': ('JPEG', {'quality': 82, 'optimize': True, 'progressive': True}),
+}
+
+BACKGROUND_COLOR = (255, 255, 255)  # 투명한 부분을 채울 색 (JPEG에는 투명도가 없음)
+
+renditions_saved = Signal()  # 파생본을 저장한 뒤 (sender=모델, pk=키)
+
+_executor = None
+
+
+def rendition_widths():
+    return sorted(getattr(settings, 'IMAGE_RENDITION_WIDTHS', [320, 640, 1080]))
+
+
+def get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=getattr(settings, 'IMAGE_RENDITION_WORKERS', 2),
+            thread_name_prefix='renditions',
+        )
+    return _executor
+
+
+def needs_renditions(instance, field_name, renditions_field):
+    field_file = getattr(instance, field_name)
+    if not field_file:
+        return False
+    renditions = getattr(instance, renditions_field) or {}
+    return renditions.get('source') != field_file.name
+
+
+def flatten(image):
+    # 투명도가 있는 이미지는 배경색 위에 합성 (그냥 RGB로 바꾸면 투명한 부분이 검게 됨)
+    if image.mode == 'RGB':
+        return image
+    if not image.has_transparency_data:
+        return image.convert('RGB')
+    image = image.convert('RGBA')
+    background = Image.new('RGB', image.size, BACKGROUND_COLOR)
+    background.paste(image, mask=image.getchannel('A'))
+    return background
+
+
+def save_renditions(model, pk, renditions_field, renditions, **conditions):
+    # updated_at도 바꿔서 조건부 GET 검증자가 바뀌게 하고, 시그널 수신기가 응답 캐시를 무효화함
+    updated = model._base_manager.filter(pk=pk, **conditions).update(
+        **{renditions_field: renditions, 'updated_at': timezone.now()},
+    )
+    if updated:
+        renditions_saved.send(sender=model, pk=pk)
+    return updated
+
+
+def generate_renditions(field_file):
+    # EXIF 방향을 적용한 뒤 너비별로 축소하고, EXIF 없이 다시 인코딩해서 저장
+    storage = field_file.storage
+    with storage.open(field_file.name, 'rb') as source:
+        image = Image.open(source)
+        image = ImageOps.exif_transpose(image)
+        image.load()
+    image = flatten(image)
+
+    base, _ = os.path.splitext(field_file.name)
+    widths = [width for width in rendition_widths() if width < image.width] or [image.width]
+    renditions = {'source': field_file.name}
+    for width in widths:
+        resized = image.copy()
+        resized.thumbnail((width, image.height), Image.LANCZOS)
+        for ext, (pil_format, options) in RENDITION_FORMATS.items():
+            buffer = BytesIO()
+            resized.save(buffer, pil_format, **options)
+            name = f'{base}_w{width}.{ext}'
+            if storage.exists(name):
+                storage.delete(name)
+            renditions.setdefault(ext, {})[str(width)] = storage.save(name, ContentFile(buffer.getvalue()))
+    return renditions
+
+
+def build_renditions(model, pk, field_name, renditions_field):
+    instance = model._base_manager.filter(pk=pk).first()
+    if instance is None or not needs_renditions(instance, field_name, renditions_field):
+        return
+    field_file = getattr(instance, field_name)
+    renditions = generate_renditions(field_file)
+    save_renditions(model, pk, renditions_field, renditions, **{field_name: field_file.name})  # 그 사이에 사진이 바뀌었다면 덮어쓰지 않음
+
+
+def _run_in_background(model, pk, field_name, renditions_field):
+    try:
+        build_renditions(model, pk, field_name, renditions_field)
+    except Exception:
+        # 실행기 Future는 아무도 확인하지 않으므로 여기서 기록 (backfill_renditions로 다시 생성할 수 있음)
+        logger.exception('%s %s의 사진 파생본 생성에 실패했습니다.', model.__name__, pk)
+    finally:
+        connections.close_all()  # 워커 스레드가 연 DB 연결 정리
+
+
+def schedule_renditions(instance, field_name, renditions_field):
+    # post_save에서 호출: 사진이 새로 올라왔을 때만 커밋 이후 백그라운드로 생성
+    if not needs_renditions(instance, field_name, renditions_field):
+        return
+    model, pk = type(instance), instance.pk
+    transaction.on_commit(
+        lambda: get_executor().submit(_run_in_background, model, pk, field_name, renditions_field)
+    )
+
+
+class SrcsetField(serializers.Field):
+    # {"webp": "url 320w, url 640w", "jpeg": "..."} 형태로 반환, 아직 생성 전이면 None
+    def __init__(self, image_field, renditions_field, **kwargs):
+        self.image_field = image_field
+        self.renditions_field = renditions_field
+        kwargs['source'] = '*'
+        kwargs['read_only'] = True
+        super().__init__(**kwargs)
+
+    def to_representation(self, instance):
+        field_file = getattr(instance, self.image_field)
+        renditions = getattr(instance, self.renditions_field) or {}
+        if not field_file or renditions.get('source') != field_file.name:
+            return None
+        request = self.context.get('request')
+        srcset = {}
+        for ext in RENDITION_FORMATS:
+            candidates = []
+            for width, name in sorted(renditions.get(ext, {}).items(), key=lambda item: int(item[0])):
+                url = field_file.storage.url(name)
+                if request is not None:
+                    url = request.build_absolute_uri(url)
+                candidates.append(f'{url} {width}w')
+            srcset[ext] = ', '.join(candidates)
+        return srcset
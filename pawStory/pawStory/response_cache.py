@@ -0,0 +1,146 @@
+# 조회 응답 캐시
+# 직렬화한 JSON 본문을 객체 버전이 들어간 키로 저장합니다. 예) resp:post:12:v1718...:<요청 URL 해시>
+# 모델 post_save/post_delete 시그널에서 관련 객체의 버전만 바꾸면 이전 키는 더 이상 조회되지 않고 만료됩니다.
+# 같은 키를 여러 요청이 동시에 놓치면 cache.add 잠금을 잡은 요청 하나만 다시 만들고 나머지는 잠시 기다립니다.
+# Django 기본 캐시(locmem, 파일 기반 등)만 사용하므로 별도 서비스 없이 동작합니다.
+# 버전 키도 같은 캐시에 있으므로, 여러 프로세스가 캐시를 공유하지 않으면(locmem) 다른 프로세스의 무효화를 보지 못하고
+# 캐시 유지 시간(RESPONSE_CACHE_TIMEOUT) 동안 예전 응답을 돌려줍니다. (settings.CACHES 참고)
+# 일기/게시물 응답에 들어가는 다른 회원의 프로필은 회원 저장/탈퇴 시 users.signals.invalidate_activity_responses가 무효화합니다.
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.http import HttpResponse
+from rest_framework.renderers import JSONRenderer
+
+from . import routers
+
+LOCK_TIMEOUT = 10  # 잠금을 잡은 요청이 실패해도 이 시간이 지나면 풀림
+WAIT_INTERVAL = 0.05
+WAIT_LIMIT = 2.0  # 다른 요청이 만드는 응답을 기다리는 최대 시간
+STATS_KEY = 'resp:stats:{scope}:{event}'
+STAT_EVENTS = ('hit', 'miss', 'wait')
+
+
+def cache_timeout():
+    return getattr(settings, 'RESPONSE_CACHE_TIMEOUT', 60 * 5)
+
+
+def _version_key(scope, object_id):
+    return f'resp:version:{scope}:{object_id}'
+
+
+def object_versions(pairs):
+    # [(scope, id), ...] -> 버전 목록. 버전이 없으면 새로 정함
+    keys = [_version_key(scope, object_id) for scope, object_id in pairs]
+    found = cache.get_many(keys)
+    versions = []
+    for key in keys:
+        version = found.get(key)
+        if version is None:
+            version = time.time_ns()
+            cache.add(key, version, None)
+            version = cache.get(key, version)
+        versions.append(version)
+    return versions
+
+
+def invalidate(scope, *object_ids):
+    # 시그널이나 일괄 UPDATE 뒤에 호출. 해당 객체가 들어간 캐시 응답은 모두 무효가 됨
+    # 커밋 전에 버전을 바꾸면 다른 요청이 커밋 전 데이터로 새 버전 응답을 만들 수 있으므로 커밋 이후에 반영
+    keys = [_version_key(scope, object_id) for object_id in object_ids if object_id is not None]
+    transaction.on_commit(lambda: cache.set_many(dict.fromkeys(keys, time.time_ns()), None))
+
+
+def record(scope, event):
+    key = STATS_KEY.format(scope=scope, event=event)
+    if not cache.add(key, 1, None):
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.add(key, 1, None)  # 그 사이 만료된 경우
+
+
+def stats(scopes):
+    # {scope: {'hit': n, 'miss': n, 'wait': n}}
+    keys = {STATS_KEY.format(scope=scope, event=event): (scope, event) for scope in scopes for event in STAT_EVENTS}
+    found = cache.get_many(list(keys))
+    result = {scope: dict.fromkeys(STAT_EVENTS, 0) for scope in scopes}
+    for key, (scope, event) in keys.items():
+        result[scope][event] = found.get(key, 0)
+    return result
+
+
+def cached_response(request, scope, pairs, render):
+    # pairs: 응답 내용에 영향을 주는 (scope, id) 목록, render: 캐시에 없을 때 실제 응답을 만드는 함수
+    variant = hashlib.sha1(request.build_absolute_uri().encode('utf-8')).hexdigest()
+    versions = '.'.join(str(version) for version in object_versions(pairs))
+    key = f'resp:{scope}:{pairs[0][1]}:{versions}:{variant}'
+
+    content = cache.get(key)
+    if content is not None:
+        record(scope, 'hit')
+        return _cached(content, 'HIT')
+
+    lock_key = f'{key}:lock'
+    if not cache.add(lock_key, 1, LOCK_TIMEOUT):
+        # 다른 요청이 같은 응답을 만드는 중: 잠시 기다렸다가 그 결과를 사용
+        record(scope, 'wait')
+        deadline = time.monotonic() + WAIT_LIMIT
+        while time.monotonic() < deadline:
+            time.sleep(WAIT_INTERVAL)
+            content = cache.get(key)
+            if content is not None:
+                record(scope, 'hit')
+                return _cached(content, 'HIT')
+        lock_key = None  # 기다려도 없으면 직접 만듦
+
+    record(scope, 'miss')
+    try:
+        with routers.use_primary():  # 새 버전 키에 늦은 복제본 내용이 저장되지 않도록
+            response = render()
+        if response.status_code == 200:
+            cache.set(key, JSONRenderer().render(response.data), cache_timeout())
+        response.headers['X-Cache'] = 'MISS'
+        return response
+    finally:
+        if lock_key is not None:
+            cache.delete(lock_key)
+
+
+def _cached(content, status):
+    response = HttpResponse(content, content_type='application/json')
+    response.headers['X-Cache'] = status
+    return response
+
+
+class CachedRetrieveMixin:
+    # 상세 조회 응답 캐시. get_cache_objects()는 응답에 들어가는 객체의 (scope, id) 목록 (첫 항목이 대상 객체)
+    cache_scope = None
+
+    def get_cache_objects(self):
+        return [(self.cache_scope, self.kwargs[self.lookup_url_kwarg or self.lookup_field])]
+
+    def retrieve(self, request, *args, **kwargs):
+        render = super().retrieve
+        return cached_response(request, self.cache_scope, self.get_cache_objects(), lambda: render(request, *args, **kwargs))
+
+
+class CachedListMixin:
+    # 목록 응답 캐시 (예: 댓글 목록). use_cache()가 False면 캐시를 거치지 않음
+    cache_scope = None
+    cache_lookup_kwarg = None
+
+    def get_cache_objects(self):
+        return [(self.cache_scope, self.kwargs[self.cache_lookup_kwarg])]
+
+    def use_cache(self):
+        return True
+
+    def list(self, request, *args, **kwargs):
+        render = super().list
+        if not self.use_cache():
+            return render(request, *args, **kwargs)
+        return cached_response(request, self.cache_scope, self.get_cache_objects(), lambda: render(request, *args, **kwargs))
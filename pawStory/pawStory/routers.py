@@ -0,0 +1,125 @@
+# 읽기 복제본 라우터
+# settings.REPLICA_DATABASES에 복제본이 있으면 GET/HEAD/OPTIONS 요청의 읽기를 복제본 하나로 보내고, 그 밖의 읽기와 모든 쓰기는 기본 DB로 보냅니다.
+# 뷰 코드는 그대로 두고 미들웨어가 요청마다 라우팅 상태를 만들어서 라우터가 그 상태를 보고 DB를 고릅니다.
+# 복제본은 sync_replica 명령이 주기적으로 복사하므로 조금 늦을 수 있어서, 방금 쓴 내용이 보이도록 아래 경우에는 기본 DB에서 읽습니다.
+#   - 같은 요청 안에서 쓰기를 한 뒤의 읽기, atomic 블록 안의 읽기
+#   - 쓰기 요청을 보냈거나 토큰을 발급받은 회원의 요청 (REPLICA_PIN_SECONDS 동안, 캐시에 기록)
+# 이 고정 표시는 다른 웹 워커도 봐야 하므로 복제본을 쓰려면 워커끼리 공유하는 캐시가 필요합니다 (아니면 check가 실패)
+# 요청 밖(관리 명령, 백그라운드 스레드)의 쿼리는 항상 기본 DB를 사용합니다.
+import contextvars
+import random
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core import checks
+from django.core.cache import cache, caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import DEFAULT_DB_ALIAS, connections
+
+PIN_KEY = 'db:primary:{user_id}'
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+_state = contextvars.ContextVar('db_routing', default=None)
+
+
+class RoutingState:
+    __slots__ = ('replica', 'primary', 'user_id', 'wrote')
+
+    def __init__(self, replica, primary):
+        self.replica = replica  # 요청 하나는 같은 복제본만 읽음 (페이지 사이에서 데이터가 엇갈리지 않도록)
+        self.primary = primary
+        self.user_id = None
+        self.wrote = False
+
+
+def replica_aliases():
+    return getattr(settings, 'REPLICA_DATABASES', [])
+
+
+def pin_seconds():
+    return getattr(settings, 'REPLICA_PIN_SECONDS', 15)
+
+
+@checks.register(checks.Tags.caches)
+def check_shared_cache(app_configs, **kwargs):
+    # 프로세스 안에만 있는 캐시면 쓰기를 받은 워커 밖에서는 고정 표시가 보이지 않아 방금 쓴 내용을 복제본에서 읽게 됨
+    if replica_aliases() and isinstance(caches['default'], (LocMemCache, DummyCache)):
+        return [checks.Error(
+            '읽기 복제본을 쓰려면 웹 워커끼리 공유하는 캐시가 필요합니다.',
+            hint="CACHES['default']를 파일 기반 캐시처럼 모든 웹 워커가 같이 쓰는 캐시로 설정하세요.",
+            obj='REPLICA_DATABASES',
+            id='pawStory.E001',
+        )]
+    return []
+
+
+def pin_primary(user_id):
+    # 이 회원의 읽기를 잠시 기본 DB로 고정 (복제본에 방금 쓴 내용이 아직 없을 수 있음)
+    if replica_aliases():
+        cache.set(PIN_KEY.format(user_id=user_id), True, pin_seconds())
+
+
+def bind_user(user_id):
+    # 인증 직후 호출. 최근에 쓰기를 한 회원이면 이 요청의 읽기를 기본 DB로 보냄
+    state = _state.get()
+    if state is None:
+        return
+    state.user_id = user_id
+    if not state.primary and cache.get(PIN_KEY.format(user_id=user_id)):
+        state.primary = True
+
+
+@contextmanager
+def use_primary():
+    # 블록 안의 읽기를 기본 DB로 보냄 (캐시에 오래 남는 응답을 만들 때 등)
+    state = _state.get()
+    if state is None or state.primary:
+        yield
+        return
+    state.primary = True
+    try:
+        yield
+    finally:
+        state.primary = False
+
+
+class PrimaryReplicaRouter:
+    def db_for_read(self, model, **hints):
+        state = _state.get()
+        if state is None or state.primary or connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+        return state.replica
+
+    def db_for_write(self, model, **hints):
+        state = _state.get()
+        if state is not None:
+            state.wrote = True
+            state.primary = True  # 이후 읽기는 방금 쓴 내용을 봐야 함
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True  # 복제본은 기본 DB의 복사본이라 어느 쪽에서 읽은 객체든 연결 가능
+
+    def allow_migrate(self, db, app_label, **hints):
+        if db in replica_aliases():
+            return False  # 복제본은 sync_replica로 스키마까지 통째로 복사
+        return None
+
+
+class ReplicaRoutingMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        replicas = replica_aliases()
+        if not replicas:
+            return self.get_response(request)
+        state = RoutingState(random.choice(replicas), primary=request.method not in SAFE_METHODS)
+        token = _state.set(state)
+        try:
+            return self.get_response(request)
+        finally:
+            _state.reset(token)
+            if state.user_id is not None and (state.wrote or request.method not in SAFE_METHODS):
+                pin_primary(state.user_id)
@@ -48,6 +48,7 @@ INSTALLED_APPS = [
     'diaries',
     'users',
     'accounts',
+    'search',
     #basic apps
     'django.contrib.admin',
     'django.contrib.auth',
@@ -80,6 +81,7 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'pawStory.routers.ReplicaRoutingMiddleware', # GET 요청의 읽기를 복제본으로 보냄 (복제본이 설정된 경우)
 ]
 
 CORS_ALLOW_METHODS = [  # 허용할 옵션
@@ -120,8 +122,10 @@ REST_FRAMEWORK = {
         #'rest_framework.permissions.AllowAny',  # 누구나 접근 가능
     ),
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',  # JWT를 통한 인증방식 사용
+        'users.authentication.ClaimsJWTAuthentication',  # JWT를 통한 인증방식 사용 (토큰 클레임으로 회원을 만들어 요청마다 회원 조회를 생략)
     ),
+    'DEFAULT_PAGINATION_CLASS': 'pawStory.pagination.KeysetCursorPagination',  # (created_at, id) 기반 커서 페이지네이션
+    'PAGE_SIZE': 20,  # 한 페이지당 기본 항목 수 (?page_size= 로 최대 100까지 조절 가능)
 }
 
 SIMPLE_JWT = {
@@ -139,6 +143,39 @@ SIMPLE_JWT = {
 		# True로 설정하면 리프레시 토큰이 회전되면서, 이전의 리프레시 토큰은 블랙리스트에 추가되어 더 이상 사용할 수 없게 됩니다.
 }
 # JWT 설정으로, JSON Web Token의 특정 속성을 설정합니다.
+
+TIMELINE_FANOUT_LIMIT = 5000 # 팔로워가 이보다 많으면 홈 타임라인을 쓰기 시점이 아닌 읽기 시점에 구성합니다.
+TIMELINE_BACKFILL_SIZE = 50 # 새로 팔로우했을 때 타임라인에 채워넣을 최근 일기 수
+IMAGE_RENDITION_WIDTHS = [320, 640, 1080] # 업로드 사진 파생본 너비(px)
+IMAGE_RENDITION_WORKERS = 2 # 파생본 생성 백그라운드 스레드 수
+DIARY_LIKE_FLUSH_INTERVAL = 2 # 좋아요 수 증감분을 모아서 DB에 반영하는 주기(초), 0이면 즉시 반영
+TRENDING_HALF_LIFE_HOURS = 24 # 인기순 점수가 절반으로 줄어드는 시간
+RESPONSE_CACHE_TIMEOUT = 60 * 5 # 상세/댓글 목록 응답 캐시 유지 시간(초)
+AUTH_MEMBER_CACHE_SIZE = 1000 # 인증에 쓰는 회원 행 캐시 크기 (워커 프로세스마다)
+AUTH_MEMBER_CACHE_TTL = 60 # 인증 회원 캐시 유지 시간(초), 다른 워커에서 바뀐 회원 정보와 탈퇴/비활성화는 이 시간 안에 반영
+PASSWORD_HASH_ITERATIONS = 600000 # PBKDF2 반복 횟수 (바꾸면 회원별로 다음 로그인 때 다시 해싱됨)
+
+# 첫 번째 해셔로 새 비밀번호를 해싱하고, 나머지는 예전 형식 해시를 확인할 때만 사용합니다.
+PASSWORD_HASHERS = [
+    'users.hashers.TunablePBKDF2PasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+    'django.contrib.auth.hashers.Argon2PasswordHasher',
+    'django.contrib.auth.hashers.BCryptSHA256PasswordHasher',
+    'django.contrib.auth.hashers.ScryptPasswordHasher',
+]
+
+# 캐시 설정: 기본은 프로세스 메모리(locmem)로, 웹 프로세스 하나로 실행할 때만 맞게 동작합니다.
+# 팔로우 목록·태그 맵·응답 캐시의 버전 무효화는 캐시 키를 바꾸는 방식이라, 캐시를 공유하지 않는 프로세스에는 전달되지 않습니다.
+# 웹 워커를 여러 프로세스로 띄우거나 관리 명령으로 데이터를 바꾸는 경우에는 모든 프로세스가 같은 캐시를 쓰도록 파일 기반 캐시를 사용합니다.
+#   'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache', 'LOCATION': BASE_DIR / 'cache'
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'pawstory',
+        'OPTIONS': {'MAX_ENTRIES': 10000},
+    }
+}
+
 ROOT_URLCONF = 'pawStory.urls'
 
 TEMPLATES = [
@@ -159,13 +196,52 @@ TEMPLATES = [
 
 WSGI_APPLICATION = 'pawStory.wsgi.application'
 
+# SQLite 운영 설정 (pawStory/db/sqlite3/base.py)
+# WAL: 읽기가 쓰기를 막지 않음 / synchronous=NORMAL: WAL에서는 커밋마다 fsync하지 않아도 DB가 깨지지 않음
+# busy_timeout: 잠금을 기다리는 최대 시간(ms) / mmap_size, cache_size: 읽기 캐시 (cache_size 음수는 KB 단위)
+# IMMEDIATE 트랜잭션: 쓰기 잠금을 BEGIN에서 기다려서 동시 쓰기의 "database is locked" 오류를 없앰
+# CONN_MAX_AGE: 요청마다 연결을 새로 열지 않고 워커 스레드마다 재사용 (PRAGMA도 연결할 때 한 번만 실행)
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
+        'ENGINE': 'pawStory.db.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        'CONN_MAX_AGE': 600,
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {
+            'transaction_mode': 'IMMEDIATE',
+            'timeout': 20,
+            'init_command': (
+                'PRAGMA journal_mode = WAL;'
+                'PRAGMA synchronous = NORMAL;'
+                'PRAGMA busy_timeout = 20000;'
+                'PRAGMA mmap_size = 134217728;'
+                'PRAGMA cache_size = -20000;'
+                'PRAGMA temp_store = MEMORY;'
+            ),
+        },
     }
 }
 
+# 읽기 복제본 (pawStory/routers.py)
+# secrets.json의 DATABASE_REPLICAS에 복제본 파일 이름을 적으면 GET 요청의 읽기가 복제본으로 갑니다. 예) "DATABASE_REPLICAS": ["db.replica.sqlite3"]
+# 복제본은 sync_replica 명령이 기본 DB를 복사해서 만들고 갱신합니다. 예) python manage.py sync_replica --interval 5
+# 쓰기를 한 회원은 REPLICA_PIN_SECONDS 동안 기본 DB에서 읽으므로 복사 주기보다 길게 잡아야 합니다.
+# 이 고정 표시는 캐시에 기록하므로 복제본을 쓸 때는 위 CACHES를 공유 캐시(파일 기반)로 바꿔야 합니다. (locmem이면 check 실패)
+REPLICA_PIN_SECONDS = 15
+REPLICA_DATABASES = []
+for number, name in enumerate(secrets.get('DATABASE_REPLICAS', []), start=1):
+    DATABASES[f'replica{number}'] = {
+        **DATABASES['default'],
+        'NAME': BASE_DIR / name,
+        'OPTIONS': {
+            'timeout': 20,
+            'init_command': DATABASES['default']['OPTIONS']['init_command'] + 'PRAGMA query_only = ON;',
+        },
+        'TEST': {'MIRROR': 'default'},
+    }
+    REPLICA_DATABASES.append(f'replica{number}')
+DATABASE_ROUTERS = ['pawStory.routers.PrimaryReplicaRouter']
+
 
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -0,0 +1,63 @@
+import os
+import tempfile
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connection, connections, transaction
+from django.test import SimpleTestCase
+from django.test.utils import CaptureQueriesContext
+
+from .db.sqlite3.base import DatabaseWrapper
+
+ALIAS = 'backend_test'
+
+
+class SQLiteBackendTests(SimpleTestCase):
+    # 테스트 DB는 메모리 DB라 WAL을 쓸 수 없으므로 설정의 OPTIONS로 임시 파일 DB에 따로 연결
+    def setUp(self):
+        directory = self.enterContext(tempfile.TemporaryDirectory())
+        self.settings_dict = {
+            **connection.settings_dict,
+            'NAME': os.path.join(directory, 'db.sqlite3'),
+            'OPTIONS': dict(settings.DATABASES['default']['OPTIONS']),
+        }
+
+    def connect(self, **options):
+        wrapper = DatabaseWrapper({**self.settings_dict, 'OPTIONS': {**self.settings_dict['OPTIONS'], **options}}, ALIAS)
+        connections[ALIAS] = wrapper
+        self.addCleanup(connections.__delitem__, ALIAS)
+        self.addCleanup(wrapper.close)
+        return wrapper
+
+    def pragma(self, wrapper, name):
+        with wrapper.cursor() as cursor:
+            cursor.execute(f'PRAGMA {name}')
+            return cursor.fetchone()[0]
+
+    def test_init_command_runs_on_each_new_connection(self):
+        wrapper = self.connect()
+        for _ in range(2):
+            self.assertEqual(self.pragma(wrapper, 'journal_mode'), 'wal')
+            self.assertEqual(self.pragma(wrapper, 'busy_timeout'), 20000)
+            self.assertEqual(self.pragma(wrapper, 'synchronous'), 1)  # NORMAL
+            wrapper.close()
+
+    def test_atomic_begins_immediate(self):
+        wrapper = self.connect()
+        wrapper.ensure_connection()
+        with CaptureQueriesContext(wrapper) as queries:
+            with transaction.atomic(using=ALIAS):
+                self.pragma(wrapper, 'user_version')
+        self.assertEqual(queries.captured_queries[0]['sql'], 'BEGIN IMMEDIATE')
+
+    def test_default_transaction_mode(self):
+        wrapper = self.connect(transaction_mode=None)
+        wrapper.ensure_connection()
+        with CaptureQueriesContext(wrapper) as queries:
+            with transaction.atomic(using=ALIAS):
+                self.pragma(wrapper, 'user_version')
+        self.assertEqual(queries.captured_queries[0]['sql'], 'BEGIN')
+
+    def test_invalid_transaction_mode(self):
+        with self.assertRaisesMessage(ImproperlyConfigured, 'transaction_mode'):
+            DatabaseWrapper({**self.settings_dict, 'OPTIONS': {'transaction_mode': 'LAZY'}}, ALIAS)
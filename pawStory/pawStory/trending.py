@@ -0,0 +1,50 @@
+# 인기순(trending) 점수
+# 점수 = (1 + 좋아요 + 2 × 댓글) × 2^(-경과시간 / 반감기)
+# 그대로 저장하면 시간이 지날 때마다 모든 글을 다시 계산해야 하므로, 로그를 취해
+#   log(1 + 좋아요 + 2 × 댓글) + 작성시각 / τ    (τ = 반감기 / ln 2)
+# 로 저장합니다. 현재 시각 항은 모든 글에 똑같이 빠지므로 순서는 같고,
+# 좋아요/댓글이 새로 생긴 글만 다시 계산하면 됩니다. 목록은 (trending_score, id) 인덱스를 그대로 읽습니다.
+import math
+
+from django.conf import settings
+
+from .pagination import KeysetCursorPagination
+
+LIKE_WEIGHT = 1.0
+COMMENT_WEIGHT = 2.0
+RESCORE_BATCH_SIZE = 500
+
+
+def decay_scale():
+    half_life = getattr(settings, 'TRENDING_HALF_LIFE_HOURS', 24) * 60 * 60
+    return half_life / math.log(2)
+
+
+def trending_score(likes, comments, created_at):
+    engagement = 1 + LIKE_WEIGHT * max(likes, 0) + COMMENT_WEIGHT * max(comments, 0)
+    return math.log(engagement) + created_at.timestamp() / decay_scale()
+
+
+def touched_ids(model, since, related):
+    # since 이후에 작성되었거나 좋아요/댓글이 새로 생긴 글의 id. related는 (좋아요/댓글 모델, 글 FK 필드명) 목록
+    # 테이블마다 created_at 인덱스로 따로 조회해서 합칩니다.
+    ids = set(model.objects.filter(created_at__gte=since).values_list('id', flat=True))
+    for related_model, field in related:
+        ids.update(related_model.objects.filter(created_at__gte=since).values_list(field, flat=True))
+    return ids
+
+
+def rescore(queryset, ids, counts):
+    # counts(obj) -> (좋아요 수, 댓글 수). 배치마다 bulk_update로 점수를 저장하고 갱신한 개수를 반환
+    model = queryset.model
+    ids = sorted(ids)
+    for start in range(0, len(ids), RESCORE_BATCH_SIZE):
+        objs = list(queryset.filter(id__in=ids[start:start + RESCORE_BATCH_SIZE]))
+        for obj in objs:
+            obj.trending_score = trending_score(*counts(obj), obj.created_at)
+        model.objects.bulk_update(objs, ['trending_score'])
+    return len(ids)
+
+
+class TrendingPagination(KeysetCursorPagination):
+    ordering = ('-trending_score', '-id')
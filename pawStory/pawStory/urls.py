@@ -27,6 +27,7 @@ urlpatterns = [
     path('diaries/', include('diaries.urls')),
     path('users/', include('users.urls')),
     path('accounts/', include('accounts.urls')),
+    path('search/', include('search.urls')),
     # Swagger
     re_path(r'^swagger(?P<format>\.json|\.yaml)$', schema_view.without_ui(cache_timeout=0), name='schema-json'),
     re_path(r'^swagger/$', schema_view.with_ui('swagger', cache_timeout=0), name='schema-swagger-ui'),
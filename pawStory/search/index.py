@@ -0,0 +1,109 @@
+# 게시물/일기 전문 검색 색인 (SQLite FTS5)
+# 한글은 띄어쓰기 단위로 찾으면 조사 때문에 거의 걸리지 않으므로, 단어를 글자 2개씩 겹쳐 자른 바이그램으로 색인합니다.
+# 예) "산책했어요" -> 산책 책했 했어 어요
+# 검색어도 같은 방식으로 자르고 단어별로 연속된 바이그램 구문(phrase)으로 찾기 때문에 부분 문자열 검색과 같은 결과가 됩니다.
+# 순위는 BM25 점수에 최신 글 가중치를 더해서 매기고, (점수, rowid) 키셋으로 페이지를 나눕니다.
+# 쿼리는 Django 커서 형식(%s 자리표시자)으로 작성합니다. sqlite3 연결을 직접 쓸 때는 SQLiteCursorWrapper 커서를 사용합니다.
+import re
+import unicodedata
+
+TABLE = 'search_document'
+DIARY = 'diary'
+POST = 'post'
+KIND_CODES = {DIARY: 0, POST: 1}
+
+RECENCY_WEIGHT = 2.0  # 방금 쓴 글이 받는 최대 가산점 (BM25 점수와 같은 단위)
+RECENCY_SCALE = 60 * 60 * 24 * 30  # 30일이 지나면 가산점이 절반
+
+_WORD = re.compile(r'\w+')
+_CJK = re.compile(r'[\u1100-\u11ff\u3130-\u318f\uac00-\ud7af\u3040-\u30ff\u4e00-\u9fff]')
+
+CREATE_SQL = (
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {TABLE} USING fts5("
+    "body, kind UNINDEXED, object_id UNINDEXED, created_at UNINDEXED, "
+    "tokenize = 'unicode61 remove_diacritics 2')"
+)
+
+
+def tokenize(text):
+    # 단어별 토큰 목록. 한글/한자/가나가 들어간 단어는 바이그램, 나머지는 단어 그대로
+    words = []
+    for word in _WORD.findall(unicodedata.normalize('NFKC', text or '').lower()):
+        if _CJK.search(word) and len(word) > 1:
+            words.append([word[i:i + 2] for i in range(len(word) - 1)])
+        else:
+            words.append([word])
+    return words
+
+
+def document_text(*texts):
+    return ' '.join(token for text in texts for word in tokenize(text) for token in word)
+
+
+def match_query(query):
+    # 단어마다 바이그램을 이어붙인 구문으로 만들고 AND로 묶음. 한 글자 한글은 접두어 검색
+    phrases = []
+    for word in tokenize(query):
+        if len(word) == 1 and len(word[0]) == 1 and _CJK.match(word[0]):
+            phrases.append(f'"{word[0]}"*')
+        else:
+            phrases.append('"' + ' '.join(word) + '"')
+    return ' AND '.join(phrases) or None
+
+
+def document_rowid(kind, object_id):
+    return int(object_id) * len(KIND_CODES) + KIND_CODES[kind]
+
+
+def create_table(cursor):
+    cursor.execute(CREATE_SQL)
+
+
+def drop_table(cursor):
+    cursor.execute(f'DROP TABLE IF EXISTS {TABLE}')
+
+
+def upsert(cursor, kind, object_id, body, created_at):
+    rowid = document_rowid(kind, object_id)
+    cursor.execute(f'DELETE FROM {TABLE} WHERE rowid = %s', [rowid])
+    cursor.execute(
+        f'INSERT INTO {TABLE} (rowid, body, kind, object_id, created_at) VALUES (%s, %s, %s, %s, %s)',
+        [rowid, body, kind, object_id, created_at.timestamp()],
+    )
+
+
+def insert_many(cursor, rows):
+    # rows: (kind, object_id, body, created_at) 목록. 색인 재생성용
+    cursor.executemany(
+        f'INSERT INTO {TABLE} (rowid, body, kind, object_id, created_at) VALUES (%s, %s, %s, %s, %s)',
+        [(document_rowid(kind, object_id), body, kind, object_id, created_at.timestamp()) for kind, object_id, body, created_at in rows],
+    )
+
+
+def delete(cursor, kind, object_id):
+    cursor.execute(f'DELETE FROM {TABLE} WHERE rowid = %s', [document_rowid(kind, object_id)])
+
+
+def search(cursor, query, now, kind=None, after=None, limit=20):
+    # (rowid, kind, object_id, score) 목록, score가 작을수록 상위. after는 이전 페이지 마지막의 (score, rowid)
+    match = match_query(query)
+    if match is None:
+        return []
+    params = [RECENCY_WEIGHT, now, RECENCY_SCALE, match]
+    kind_filter = ''
+    if kind is not None:
+        kind_filter = 'AND kind = %s'
+        params.append(kind)
+    keyset = ''
+    if after is not None:
+        keyset = 'WHERE score > %s OR (score = %s AND rowid > %s)'
+        params += [after[0], after[0], after[1]]
+    params.append(limit)
+    cursor.execute(
+        f'SELECT rowid, kind, object_id, score FROM ('
+        f'  SELECT rowid, kind, object_id, bm25({TABLE}) - %s / (1.0 + MAX(%s - created_at, 0) / %s) AS score'
+        f'  FROM {TABLE} WHERE {TABLE} MATCH %s {kind_filter}'
+        f') {keyset} ORDER BY score, rowid LIMIT %s',
+        params,
+    )
+    return cursor.fetchall()
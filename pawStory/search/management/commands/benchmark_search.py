@@ -0,0 +1,86 @@
+import os
+import random
+import sqlite3
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+
+from django.core.management.base import BaseCommand
+from django.db.backends.sqlite3.base import SQLiteCursorWrapper
+
+from search import index
+
+# 합성 말뭉치용 어휘 (반려동물 일상 글에 흔한 단어 + 조사)
+WORDS = [
+    '산책', '강아지', '고양이', '간식', '사료', '병원', '미용', '목욕', '장난감', '공원', '친구', '주말',
+    '날씨', '낮잠', '훈련', '산책로', '예방접종', '털갈이', '캣타워', '하네스', '동물병원', '입양', '보호소', '사진',
+    '귀여운', '행복한', '오늘', '같이', '처음', '정말', '너무', '함께', '추천', '질문', '정보', '후기',
+]
+PARTICLES = ['', '', '은', '는', '이', '가', '을', '를', '에', '에서', '와', '하고', '했어요', '해요', '했다']
+QUERIES = ['산책', '강아지 간식', '동물병원 후기', '예방접종', '고양이 캣타워 추천', '털갈이', '공원에서 산책', '입양']
+
+
+class Command(BaseCommand):
+    help = '임시 SQLite 파일에 합성 말뭉치를 만들어 검색 색인 크기와 쿼리 지연 시간을 측정합니다. (운영 DB는 건드리지 않음)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=2_000_000, help='합성 문서 수')
+        parser.add_argument('--repeat', type=int, default=20, help='검색어별 반복 횟수')
+        parser.add_argument('--path', help='말뭉치 파일 경로 (이미 있으면 재사용)')
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        path = options['path'] or os.path.join(tempfile.gettempdir(), f"pawstory_search_bench_{options['rows']}.sqlite3")
+        conn = sqlite3.connect(path)
+        cursor = conn.cursor(SQLiteCursorWrapper)  # %s 자리표시자 변환
+        index.create_table(cursor)
+        existing = cursor.execute(f'SELECT COUNT(*) FROM {index.TABLE}').fetchone()[0]
+        if existing < options['rows']:
+            self.build_corpus(conn, existing, options['rows'], random.Random(options['seed']))
+        self.stdout.write(f"말뭉치: {options['rows']:,}개 문서, 파일 크기 {os.path.getsize(path) / 1024 / 1024:.1f}MB ({path})")
+
+        now = time.time()
+        for query in QUERIES:
+            first_page, next_page = [], []
+            for _ in range(options['repeat']):
+                started = time.perf_counter()
+                rows = index.search(cursor, query, now, limit=21)
+                first_page.append(time.perf_counter() - started)
+                if len(rows) > 20:
+                    started = time.perf_counter()
+                    index.search(cursor, query, now, after=(rows[19][3], rows[19][0]), limit=21)
+                    next_page.append(time.perf_counter() - started)
+            matches = cursor.execute(f'SELECT COUNT(*) FROM {index.TABLE} WHERE {index.TABLE} MATCH %s', [index.match_query(query)]).fetchone()[0]
+            self.stdout.write(
+                f'{query!r:<16} 일치 {matches:>9,}건  첫 페이지 p50 {self.ms(first_page, 50)} p95 {self.ms(first_page, 95)}'
+                f'  다음 페이지 p50 {self.ms(next_page, 50)}'
+            )
+        conn.close()
+
+    def build_corpus(self, conn, start, rows, rng):
+        cursor = conn.cursor(SQLiteCursorWrapper)
+        base = datetime.now(timezone.utc)
+        batch = []
+        started = time.perf_counter()
+        for object_id in range(start + 1, rows + 1):
+            text = ' '.join(rng.choice(WORDS) + rng.choice(PARTICLES) for _ in range(rng.randint(4, 25)))
+            created_at = base - timedelta(seconds=rng.randint(0, 60 * 60 * 24 * 365 * 2))
+            batch.append((rng.choice([index.DIARY, index.POST]), object_id, index.document_text(text), created_at))
+            if len(batch) == 10_000:
+                index.insert_many(cursor, batch)
+                conn.commit()
+                batch = []
+        if batch:
+            index.insert_many(cursor, batch)
+        cursor.execute(f"INSERT INTO {index.TABLE}({index.TABLE}) VALUES ('optimize')")
+        conn.commit()
+        self.stdout.write(f'{rows - start:,}개 문서 색인: {time.perf_counter() - started:.1f}초')
+
+    @staticmethod
+    def ms(samples, percentile):
+        if not samples:
+            return '-'
+        if len(samples) == 1:
+            return f'{samples[0] * 1000:.1f}ms'
+        return f'{statistics.quantiles(samples, n=100)[percentile - 1] * 1000:.1f}ms'
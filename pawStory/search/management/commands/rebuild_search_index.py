@@ -0,0 +1,48 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from community.models import Post
+from diaries.models import Diary
+from search import index
+
+
+class Command(BaseCommand):
+    help = '검색 색인(search_document)을 지우고 게시물과 전체 공개 일기로 다시 만듭니다.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=2000, help='한 번에 색인할 행 수')
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'sqlite':
+            raise CommandError('검색 색인은 SQLite(FTS5)에서만 지원합니다.')
+        batch_size = options['batch_size']
+
+        with transaction.atomic(), connection.cursor() as cursor:
+            index.drop_table(cursor)
+            index.create_table(cursor)
+
+            diaries = Diary.objects.filter(is_public=Diary.PUBLIC).only('id', 'content', 'created_at')
+            count = self.index_rows(cursor, diaries, batch_size, lambda d: (index.DIARY, d.id, index.document_text(d.content), d.created_at))
+            self.stdout.write(f'일기 {count}개 색인')
+
+            posts = Post.objects.only('id', 'title', 'content', 'created_at')
+            count = self.index_rows(cursor, posts, batch_size, lambda p: (index.POST, p.id, index.document_text(p.title, p.content), p.created_at))
+            self.stdout.write(f'게시물 {count}개 색인')
+
+            cursor.execute(f"INSERT INTO {index.TABLE}({index.TABLE}) VALUES ('optimize')")
+        self.stdout.write(self.style.SUCCESS('검색 색인 재생성 완료'))
+
+    @staticmethod
+    def index_rows(cursor, queryset, batch_size, to_row):
+        count = 0
+        batch = []
+        for obj in queryset.iterator(chunk_size=batch_size):
+            batch.append(to_row(obj))
+            if len(batch) >= batch_size:
+                index.insert_many(cursor, batch)
+                count += len(batch)
+                batch = []
+        if batch:
+            index.insert_many(cursor, batch)
+            count += len(batch)
+        return count
@@ -0,0 +1,4 @@
+from django.db import models
+
+# Create your models here.
+# 검색 색인은 SQLite FTS5 가상 테이블(search_document)이라 모델이 없습니다. index.py 참고
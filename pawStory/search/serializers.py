@@ -0,0 +1,8 @@
+from rest_framework import serializers
+
+
+# 검색 결과 시리얼라이저
+class SearchResultSerializer(serializers.Serializer):
+    kind = serializers.ChoiceField(choices=['diary', 'post'])  # 결과 종류
+    score = serializers.FloatField()  # 순위 점수 (작을수록 상위)
+    item = serializers.DictField()  # 일기는 DiaryListSerializer, 게시물은 PostListSerializer 형식
@@ -0,0 +1,61 @@
+from django.db import connection, connections
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from community.models import Post
+from diaries.models import Diary
+from . import index
+
+
+def search_enabled():
+    return connection.vendor == 'sqlite'
+
+
+def create_search_table(sender, using='default', **kwargs):
+    # migrate 후 FTS5 가상 테이블 생성 (이미 있으면 그대로 둠)
+    if connections[using].vendor == 'sqlite':
+        with connections[using].cursor() as cursor:
+            index.create_table(cursor)
+
+
+def index_diary(diary):
+    with connection.cursor() as cursor:
+        # 검색에는 전체 공개 일기만 노출
+        if diary.is_public == Diary.PUBLIC and diary.deleted_at is None:
+            index.upsert(cursor, index.DIARY, diary.pk, index.document_text(diary.content), diary.created_at)
+        else:
+            index.delete(cursor, index.DIARY, diary.pk)
+
+
+def index_post(post):
+    with connection.cursor() as cursor:
+        if post.deleted_at is None:
+            index.upsert(cursor, index.POST, post.pk, index.document_text(post.title, post.content), post.created_at)
+        else:
+            index.delete(cursor, index.POST, post.pk)
+
+
+@receiver(post_save, sender=Diary)
+def diary_saved(sender, instance, update_fields=None, **kwargs):
+    if search_enabled() and (update_fields is None or {'content', 'is_public'} & set(update_fields)):
+        index_diary(instance)
+
+
+@receiver(post_save, sender=Post)
+def post_saved(sender, instance, update_fields=None, **kwargs):
+    if search_enabled() and (update_fields is None or {'title', 'content'} & set(update_fields)):
+        index_post(instance)
+
+
+@receiver(post_delete, sender=Diary)
+def diary_deleted(sender, instance, **kwargs):
+    if search_enabled():
+        with connection.cursor() as cursor:
+            index.delete(cursor, index.DIARY, instance.pk)
+
+
+@receiver(post_delete, sender=Post)
+def post_deleted(sender, instance, **kwargs):
+    if search_enabled():
+        with connection.cursor() as cursor:
+            index.delete(cursor, index.POST, instance.pk)
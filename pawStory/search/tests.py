@@ -0,0 +1,72 @@
+from django.test import SimpleTestCase, TestCase
+
+from accounts.purge import tombstone_diary
+from community.models import Post
+from diaries.models import Diary
+from diaries.tests import authenticated_client, create_member
+from . import index
+
+
+class TokenizerTests(SimpleTestCase):
+    def test_korean_words_become_overlapping_bigrams(self):
+        self.assertEqual(index.tokenize('산책했어요'), [['산책', '책했', '했어', '어요']])
+        self.assertEqual(index.document_text('오늘 산책'), '오늘 산책')
+
+    def test_latin_words_are_kept_whole_and_normalized(self):
+        self.assertEqual(index.tokenize('Walk ＤＯＧ 2024'), [['walk'], ['dog'], ['2024']])
+
+    def test_match_query(self):
+        self.assertEqual(index.match_query('강아지 산책'), '"강아 아지" AND "산책"')
+        self.assertEqual(index.match_query('개'), '"개"*')  # 한 글자 한글은 접두어 검색
+        self.assertEqual(index.match_query('dog'), '"dog"')
+        self.assertIsNone(index.match_query('!!'))
+
+    def test_quotes_cannot_break_the_query(self):
+        self.assertEqual(index.match_query('"dog" OR cat'), '"dog" AND "or" AND "cat"')
+
+
+class SearchViewTests(TestCase):
+    def setUp(self):
+        self.member = create_member('searcher')
+        self.client = authenticated_client(self.member)
+
+    def search(self, query, **params):
+        response = self.client.get('/search/', {'q': query, **params})
+        self.assertEqual(response.status_code, 200)
+        return [(item['kind'], item['item']['id']) for item in response.data['results']]
+
+    def test_substring_match_inside_korean_words(self):
+        diary = Diary.objects.create(member=self.member, content='오늘은 강아지랑 산책했어요', is_public=Diary.PUBLIC)
+        post = Post.objects.create(user=self.member, member=self.member, title='산책 코스 추천', content='공원')
+        Diary.objects.create(member=self.member, content='고양이 사진', is_public=Diary.PUBLIC)
+        self.assertEqual(set(self.search('산책')), {('diary', diary.id), ('post', post.id)})
+        self.assertEqual(self.search('강아지 산책'), [('diary', diary.id)])
+        self.assertEqual(self.search('산책', kind='post'), [('post', post.id)])
+
+    def test_only_live_public_diaries_are_found(self):
+        public = Diary.objects.create(member=self.member, content='산책', is_public=Diary.PUBLIC)
+        Diary.objects.create(member=self.member, content='산책', is_public=Diary.FOLLOWERS_ONLY)
+        Diary.objects.create(member=self.member, content='산책', is_public=Diary.PRIVATE)
+        removed = Diary.objects.create(member=self.member, content='산책', is_public=Diary.PUBLIC)
+        tombstone_diary(removed)
+        self.assertEqual(self.search('산책'), [('diary', public.id)])
+
+        public.is_public = Diary.PRIVATE
+        public.save()
+        self.assertEqual(self.search('산책'), [])
+
+    def test_cursor_walks_every_result_once(self):
+        diaries = [Diary.objects.create(member=self.member, content=f'산책 {number}', is_public=Diary.PUBLIC) for number in range(45)]
+        pages, response = [], self.client.get('/search/', {'q': '산책'})
+        while True:
+            pages.append([item['item']['id'] for item in response.data['results']])
+            if response.data['next'] is None:
+                break
+            response = self.client.get(response.data['next'])
+        self.assertEqual([len(page) for page in pages], [20, 20, 5])
+        self.assertEqual(sorted(item_id for page in pages for item_id in page), [diary.id for diary in diaries])
+
+    def test_invalid_requests(self):
+        self.assertEqual(self.client.get('/search/', {'q': ' '}).status_code, 400)
+        self.assertEqual(self.client.get('/search/', {'q': '산책', 'kind': 'member'}).status_code, 400)
+        self.assertEqual(self.client.get('/search/', {'q': '산책', 'cursor': 'broken'}).status_code, 404)
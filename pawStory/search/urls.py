@@ -0,0 +1,6 @@
+from django.urls import path
+from .views import *
+
+urlpatterns = [
+    path('', SearchView.as_view(), name='search'),  # 게시물/일기 검색
+]
@@ -0,0 +1,104 @@
+import base64
+import json
+import time
+
+from django.db import connection
+from rest_framework import generics, status
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+from drf_yasg.utils import swagger_auto_schema
+from drf_yasg import openapi
+
+from community.models import Post
+from community.serializers import PostListSerializer
+from diaries.models import Diary
+from diaries.serializers import DiaryListSerializer
+from . import index
+from .serializers import SearchResultSerializer
+from .signals import search_enabled
+
+PAGE_SIZE = 20
+
+
+class SearchView(generics.GenericAPIView):
+    serializer_class = SearchResultSerializer
+    permission_classes = [IsAuthenticated]
+    pagination_class = None
+
+    @swagger_auto_schema(
+        operation_summary="게시물/일기 검색",
+        operation_description="게시물 제목/내용과 전체 공개 일기 내용을 검색합니다. 관련도(BM25)와 최신순을 함께 반영해 정렬하며, 다음 페이지는 응답의 next 커서로 조회합니다.",
+        manual_parameters=[
+            openapi.Parameter('q', openapi.IN_QUERY, description="검색어", type=openapi.TYPE_STRING, required=True),
+            openapi.Parameter('kind', openapi.IN_QUERY, description="검색 대상 (diary 또는 post, 생략 시 전체)", type=openapi.TYPE_STRING),
+            openapi.Parameter('cursor', openapi.IN_QUERY, description="다음 페이지 커서", type=openapi.TYPE_STRING),
+        ],
+        responses={
+            200: SearchResultSerializer(many=True),
+            400: '잘못된 요청입니다.',
+            501: '검색을 지원하지 않는 데이터베이스입니다.',
+        }
+    )
+    def get(self, request, *args, **kwargs):
+        if not search_enabled():
+            return Response({'detail': '검색을 지원하지 않는 데이터베이스입니다.'}, status=status.HTTP_501_NOT_IMPLEMENTED)
+        query = request.query_params.get('q', '').strip()
+        if not query:
+            raise ValidationError({'q': '검색어를 입력해주세요.'})
+        kind = request.query_params.get('kind')
+        if kind not in (None, index.DIARY, index.POST):
+            raise ValidationError({'kind': 'diary 또는 post만 가능합니다.'})
+
+        # 같은 검색의 모든 페이지가 같은 기준 시각으로 점수를 계산해야 커서가 안정적
+        now, after = self.decode_cursor()
+        now = now or time.time()
+        with connection.cursor() as cursor:
+            rows = index.search(cursor, query, now, kind=kind, after=after, limit=PAGE_SIZE + 1)
+        has_more = len(rows) > PAGE_SIZE
+        rows = rows[:PAGE_SIZE]
+
+        results = self.load_results(rows)
+        next_link = None
+        if has_more:
+            last = rows[-1]
+            next_link = replace_query_param(request.build_absolute_uri(), 'cursor', self.encode_cursor(now, last[3], last[0]))
+        return Response({
+            'next': next_link,
+            'results': self.get_serializer(results, many=True).data,
+        })
+
+    def load_results(self, rows):
+        # 종류별로 한 번씩만 조회 (삭제 표시된 행은 매니저에서 걸러짐)
+        diary_ids = [object_id for _, kind, object_id, _ in rows if kind == index.DIARY]
+        post_ids = [object_id for _, kind, object_id, _ in rows if kind == index.POST]
+        diaries = Diary.objects.filter(is_public=Diary.PUBLIC).in_bulk(diary_ids) if diary_ids else {}
+        posts = Post.objects.select_related('tag').in_bulk(post_ids) if post_ids else {}
+        context = self.get_serializer_context()
+
+        results = []
+        for _, kind, object_id, score in rows:
+            if kind == index.DIARY and object_id in diaries:
+                item = DiaryListSerializer(diaries[object_id], context=context).data
+            elif kind == index.POST and object_id in posts:
+                item = PostListSerializer(posts[object_id], context=context).data
+            else:
+                continue
+            results.append({'kind': kind, 'score': score, 'item': item})
+        return results
+
+    def decode_cursor(self):
+        encoded = self.request.query_params.get('cursor')
+        if encoded is None:
+            return None, None
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(encoded.encode('ascii')).decode('utf-8'))
+            return float(payload['t']), (float(payload['s']), int(payload['r']))
+        except Exception:
+            raise NotFound('잘못된 커서입니다.')
+
+    @staticmethod
+    def encode_cursor(now, score, rowid):
+        payload = json.dumps({'t': now, 's': score, 'r': rowid}, separators=(',', ':'))
+        return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii')
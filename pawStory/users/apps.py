@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class UsersConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'users'
+
+    def ready(self):
+        from . import signals  # 시그널 수신기 등록
+        from pawStory import routers  # 복제본/캐시 설정 검사 등록 (라우터는 첫 쿼리 때에야 불러오므로)
@@ -0,0 +1,128 @@
+# 토큰 클레임 기반 인증
+# 기본 JWTAuthentication은 요청마다 Member 행을 조회하지만, 대부분의 API는 회원 id만 사용합니다.
+# 토큰에 login_id / is_active / pet_photo 클레임을 넣어두고, 인증 시에는 이 값들만 채운 Member를 만듭니다.
+# 나머지 필드(이메일, 이름 등)에 처음 접근하면 프로세스 안의 LRU/TTL 캐시에서 한 번에 채우고,
+# 캐시에 없을 때만 DB를 한 번 조회합니다. 캐시는 Member 저장/삭제 시그널에서 비웁니다.
+# 탈퇴/비활성화 여부는 토큰의 is_active 클레임을 믿지 않고 요청마다 같은 캐시의 회원 행(is_active, deleted_at)으로 확인합니다.
+# 같은 프로세스에서 바뀐 회원은 시그널이 캐시를 비워 바로 거부되고, 다른 프로세스에서 바뀐 회원도
+# 캐시 행이 만료되는 AUTH_MEMBER_CACHE_TTL초 안에 거부됩니다. (Django 캐시의 표시는 캐시를 공유할 때 더 빨리 거부하는 용도)
+import copy
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import AccessToken, RefreshToken
+
+from pawStory import routers
+from .models import Member
+
+# simplejwt의 USER_ID_CLAIM('user_id')에는 pk가 들어가므로 로그인 아이디는 다른 이름으로 저장
+CLAIM_FIELDS = {'login_id': 'user_id', 'is_active': 'is_active', 'pet_photo': 'pet_photo'}
+INACTIVE_KEY = 'users:inactive:{member_id}'
+
+
+class MemberCache:
+    # id -> Member. 최대 maxsize개, 넣은 지 ttl초가 지나면 다시 조회
+    def __init__(self, maxsize, ttl):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, member_id):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(member_id)
+            if entry is not None and entry[0] > now:
+                self._entries.move_to_end(member_id)
+                return entry[1]
+        member = Member.objects.filter(pk=member_id).first()
+        if member is not None:
+            with self._lock:
+                self._entries[member_id] = (now + self.ttl, member)
+                self._entries.move_to_end(member_id)
+                while len(self._entries) > self.maxsize:
+                    self._entries.popitem(last=False)
+        return member
+
+    def discard(self, member_id):
+        with self._lock:
+            self._entries.pop(member_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+member_cache = MemberCache(
+    getattr(settings, 'AUTH_MEMBER_CACHE_SIZE', 1000),
+    getattr(settings, 'AUTH_MEMBER_CACHE_TTL', 60),
+)
+
+
+def fill_deferred(member):
+    # 클레임으로 만든 Member의 나머지 필드를 캐시된 행에서 채움. 회원이 없으면 False
+    cached = member_cache.get(member.pk)
+    if cached is None:
+        return False
+    for attname in member.get_deferred_fields():
+        member.__dict__[attname] = copy.deepcopy(cached.__dict__[attname])
+    return True
+
+
+def add_member_claims(token, member):
+    for claim, field in CLAIM_FIELDS.items():
+        value = getattr(member, field)
+        token[claim] = value.name or '' if field == 'pet_photo' else value
+    return token
+
+
+def tokens_for(member):
+    # 리프레시 토큰의 클레임은 여기서 만든 액세스 토큰에도 복사됨
+    routers.pin_primary(member.pk)  # 가입/로그인 직후에는 복제본에 아직 회원 행이 없을 수 있음
+    return add_member_claims(RefreshToken.for_user(member), member)
+
+
+def access_token_for(member, lifetime=None):
+    access = add_member_claims(AccessToken.for_user(member), member)
+    if lifetime is not None:
+        access.set_exp(lifetime=lifetime)
+    return access
+
+
+def mark_inactive(member_id):
+    # 이미 발급된 토큰이 만료될 때까지 거부
+    cache.set(INACTIVE_KEY.format(member_id=member_id), True, int(api_settings.ACCESS_TOKEN_LIFETIME.total_seconds()))
+
+
+class ClaimsJWTAuthentication(JWTAuthentication):
+    def get_user(self, validated_token):
+        try:
+            member_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken('토큰에 회원 정보가 없습니다.')
+
+        if cache.get(INACTIVE_KEY.format(member_id=member_id)):
+            raise AuthenticationFailed('비활성화된 회원입니다.', code='user_inactive')
+        routers.bind_user(member_id)  # 최근에 쓰기를 한 회원이면 이 요청은 기본 DB에서 읽음
+
+        cached = member_cache.get(member_id)  # 캐시 적중 시 쿼리 없음
+        if cached is None:
+            raise AuthenticationFailed('회원을 찾을 수 없습니다.', code='user_not_found')
+        if not cached.is_active or cached.deleted_at is not None:
+            raise AuthenticationFailed('비활성화된 회원입니다.', code='user_inactive')
+
+        if all(claim in validated_token for claim in CLAIM_FIELDS):
+            loaded = {'id': member_id, **{field: validated_token[claim] for claim, field in CLAIM_FIELDS.items()}}
+            loaded['is_active'] = cached.is_active  # 발급 이후 바뀌었을 수 있는 클레임 대신 현재 값
+            field_names = [field.attname for field in Member._meta.concrete_fields if field.attname in loaded]
+            member = Member.from_db(DEFAULT_DB_ALIAS, field_names, [loaded[name] for name in field_names])  # 값은 모델 필드 순서로
+            member._from_claims = True  # Member.refresh_from_db에서 나머지 필드를 캐시로 채움
+            return member
+        return copy.copy(cached)  # 클레임이 없는 예전 토큰. 요청에서 값을 바꿔도 캐시된 행은 그대로
@@ -0,0 +1,135 @@
+# 아이디 중복 확인용 블룸 필터
+# 가입된 모든 user_id를 비트 배열 하나에 넣어두고, 필터에 없다고 나오면 DB 조회 없이 "사용 가능"으로 응답합니다.
+# 필터는 "없음"은 항상 정확하고 "있음"은 오탐일 수 있으므로, 있다고 나온 경우에만 인덱스 조회로 확인합니다.
+# 처음 사용할 때 백그라운드 스레드에서 만들고, 다 만들어지기 전에는 모든 확인을 DB로 넘깁니다.
+# 이 프로세스의 가입자는 post_save에서 바로 추가하고, 다른 프로세스나 일괄 가져오기로 추가된 회원은 CATCH_UP_SECONDS마다
+# 백그라운드 스레드가 필터에 반영된 마지막 회원 id 이후의 행을 읽어서 반영합니다. 확인 요청은 DB도 잠금도 거치지 않습니다.
+# 그래서 다른 프로세스의 가입은 최대 CATCH_UP_SECONDS 동안 "사용 가능"으로 보일 수 있습니다 (가입 시 유니크 검사가 최종 확인).
+# 기준 id는 실제로 읽은 행까지만 옮기며, 회원 테이블의 id는 AUTOINCREMENT라 가장 큰 id의 회원이 삭제되어도 다시 쓰이지 않습니다.
+# (SQLite는 쓰기가 한 번에 하나라 id 순서와 커밋 순서가 같아서, 더 큰 id가 보이면 그보다 작은 id도 이미 보입니다.)
+import hashlib
+import math
+import threading
+import time
+
+from django.db import connections
+
+FALSE_POSITIVE_RATE = 0.01
+MIN_CAPACITY = 100_000
+BUILD_CHUNK_SIZE = 10_000
+CATCH_UP_SECONDS = 5  # 다른 프로세스의 가입자를 읽어오는 주기
+
+
+class BloomFilter:
+    def __init__(self, capacity, error_rate=FALSE_POSITIVE_RATE):
+        # 비트 수 m = -n·ln(p) / (ln 2)², 해시 수 k = (m / n)·ln 2
+        self.capacity = capacity
+        self.size = max(8, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, value):
+        # 128비트 해시 하나를 둘로 나눠 k개 위치를 만드는 더블 해싱
+        digest = hashlib.blake2b(value.encode('utf-8'), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        return [(h1 + i * h2) % self.size for i in range(self.hash_count)]
+
+    def add(self, value):
+        for position in self._positions(value):
+            self.bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, value):
+        bits = self.bits
+        return all(bits[position >> 3] & (1 << (position & 7)) for position in self._positions(value))
+
+    @property
+    def nbytes(self):
+        return len(self.bits)
+
+
+class UserIdFilter:
+    def __init__(self):
+        self._filter = None
+        self._last_id = 0  # 필터에 반영된 마지막 회원 id
+        self._lock = threading.Lock()
+        self._building = False
+        self._catching_up = False
+        self._next_catch_up = 0  # time.monotonic() 기준
+
+    def might_exist(self, user_id):
+        # False면 확실히 없는 아이디, True면 DB로 확인해야 함
+        bloom = self._filter
+        if bloom is None:
+            self._start_build()
+            return True
+        if time.monotonic() >= self._next_catch_up:
+            self._start_catch_up()  # 기다리지 않고 지금 필터로 답함
+        return user_id in bloom
+
+    def add(self, user_id):
+        # 이 프로세스에서 가입했거나 아이디를 바꾼 회원 (post_save)
+        # 관리자 화면 등에서 아이디를 바꾸면 이 프로세스에만 반영되고, 다른 프로세스는 필터를 다시 만들 때 반영됨
+        with self._lock:
+            if self._filter is not None:
+                self._filter.add(user_id)
+
+    def _start_build(self):
+        with self._lock:
+            if self._building or self._filter is not None:
+                return
+            self._building = True
+        threading.Thread(target=self._build, name='user-id-bloom', daemon=True).start()
+
+    def _start_catch_up(self):
+        with self._lock:
+            if self._catching_up or self._filter is None:
+                return
+            self._catching_up = True
+            self._next_catch_up = time.monotonic() + CATCH_UP_SECONDS
+        threading.Thread(target=self._catch_up_in_background, name='user-id-bloom-catch-up', daemon=True).start()
+
+    def _build(self):
+        from .models import Member
+
+        try:
+            members = Member.objects.order_by('id')
+            bloom = BloomFilter(max(MIN_CAPACITY, members.count() * 2))  # 가입자가 두 배가 될 때까지 오탐률 유지
+            last_id = 0
+            for member_id, user_id in members.values_list('id', 'user_id').iterator(chunk_size=BUILD_CHUNK_SIZE):
+                bloom.add(user_id)
+                last_id = member_id
+            with self._lock:
+                self._filter, self._last_id = bloom, last_id
+                self._next_catch_up = time.monotonic() + CATCH_UP_SECONDS
+            self._catch_up()  # 빌드하는 동안 가입한 회원 반영
+        finally:
+            self._building = False
+            connections.close_all()  # 빌드 스레드가 연 DB 연결 정리
+
+    def _catch_up_in_background(self):
+        try:
+            self._catch_up()
+        finally:
+            self._catching_up = False
+            connections.close_all()
+
+    def _catch_up(self):
+        # 마지막으로 읽은 id 이후의 회원만 읽음 (기본 키 범위 조회). 잠금은 읽은 행을 넣을 때만 잡음
+        from .models import Member
+
+        last_id = self._last_id
+        new_members = list(Member.objects.filter(id__gt=last_id).order_by('id').values_list('id', 'user_id'))
+        with self._lock:
+            if self._filter is None or self._last_id != last_id:
+                return  # 그 사이에 다시 만들어졌거나 다른 스레드가 먼저 반영함
+            for member_id, user_id in new_members:
+                self._filter.add(user_id)
+                self._last_id = member_id  # 실제로 읽은 행까지만 기준을 옮김
+            if self._filter.count > self._filter.capacity:
+                self._filter = None  # 용량을 넘으면 오탐률이 올라가므로 다음 확인 때 다시 만듦
+
+
+user_id_filter = UserIdFilter()
@@ -0,0 +1,363 @@
+# 회원/팔로우/일기/게시물 일괄 가져오기 (bulk_import 명령)
+# CSV나 JSONL 파일을 한 줄씩 읽어 배치 단위로 처리하므로 파일 크기와 상관없이 메모리 사용량이 일정합니다.
+# 배치마다 1) 필수값/형식 검사 2) 배치 안 중복과 이미 있는 행을 쿼리 한두 번으로 걸러내고
+# 3) 비밀번호는 프로세스 풀에서 해싱한 뒤 4) bulk_create로 한 트랜잭션에 넣습니다.
+# bulk_create는 save()와 시그널을 거치지 않으므로 회원 통계, 게시판별 게시물 수, 검색 색인, 타임라인,
+# 응답 캐시처럼 시그널/뷰에서 하던 후속 처리를 배치 단위로 직접 합니다. 사진 파생본은 backfill_renditions로 만듭니다.
+# 팔로우 목록/응답 캐시 무효화는 Django 캐시에 기록하므로 웹 워커와 같은 캐시를 쓸 때만 웹 워커에 반영됩니다.
+# (명령은 캐시를 공유하지 않는 설정이면 --allow-local-cache 없이는 실행되지 않음)
+# 팔로우/일기/게시물 파일은 회원을 user_id(로그인 아이디)로 가리키므로 회원을 먼저 가져와야 합니다.
+import csv
+import json
+from collections import Counter
+from contextlib import contextmanager
+from itertools import islice
+
+from django.contrib.auth.hashers import identify_hasher, make_password
+from django.contrib.auth.base_user import BaseUserManager
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_email
+from django.db import connection, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from accounts import stats as member_stats
+from accounts.models import MemberStats
+from community import tag_counts
+from community.models import TAG_PARTS, Post
+from community.tags import tag_registry
+from diaries.models import Diary, Follow
+from diaries.timeline import fan_out_diaries
+from diaries.visibility import invalidate_followees
+from pawStory import response_cache
+from pawStory.trending import trending_score
+from search import index as search_index
+from search.signals import search_enabled
+from .models import Member
+
+HASH_CHUNK_SIZE = 16  # 프로세스 풀에 한 번에 넘기는 비밀번호 수
+TAG_NAME_PARTS = {name: part for part, name in TAG_PARTS}  # '같이해요' -> 'TOG' (PostCreateSerializer와 같은 규칙)
+
+
+class RowError(Exception):
+    # 잘못된 행: 건너뛰고 줄 번호와 함께 보고
+    pass
+
+
+def read_rows(path, file_format=None):
+    # (줄 번호, dict)를 한 줄씩 반환. JSON으로 읽을 수 없는 줄은 dict 대신 None
+    if file_format is None:
+        file_format = 'jsonl' if path.endswith(('.jsonl', '.ndjson')) else 'csv'
+    with open(path, newline='', encoding='utf-8-sig') as file:
+        if file_format == 'csv':
+            reader = csv.DictReader(file)
+            for row in reader:
+                yield reader.line_num, row
+            return
+        for line_number, line in enumerate(file, start=1):
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except json.JSONDecodeError:
+                row = None
+            yield line_number, row if isinstance(row, dict) else None
+
+
+def batches(rows, size):
+    rows = iter(rows)
+    while batch := list(islice(rows, size)):
+        yield batch
+
+
+@contextmanager
+def keep_created_at(model):
+    # bulk_create 동안 auto_now_add를 꺼서 파일에 있는 작성일자를 그대로 저장 (명령은 한 스레드에서만 실행)
+    field = next((field for field in model._meta.concrete_fields if field.name == 'created_at'), None)
+    if field is None:
+        yield
+        return
+    field.auto_now_add = False
+    try:
+        yield
+    finally:
+        field.auto_now_add = True
+
+
+def _text(row, name, max_length=None, required=True):
+    value = row.get(name)
+    value = '' if value is None else str(value).strip()
+    if required and not value:
+        raise RowError(f'{name} 값이 없습니다.')
+    if max_length is not None and len(value) > max_length:
+        raise RowError(f'{name}은(는) {max_length}자 이하여야 합니다.')
+    return value
+
+
+def _parsed(row, name, parse, required=True):
+    value = _text(row, name, required=required)
+    if not value:
+        return None
+    try:
+        parsed = parse(value)
+    except ValueError:  # 형식은 맞지만 없는 날짜 (예: 13월)
+        parsed = None
+    if parsed is None:
+        raise RowError(f'{name} 형식이 올바르지 않습니다.')
+    return parsed
+
+
+def _created_at(row):
+    parsed = _parsed(row, 'created_at', parse_datetime, required=False)
+    if parsed is None:
+        return timezone.now()
+    return timezone.make_aware(parsed) if timezone.is_naive(parsed) else parsed
+
+
+def member_ids(user_ids):
+    # user_id -> pk (탈퇴하지 않은 회원만), 배치마다 한 번 조회
+    return dict(Member.objects.filter(user_id__in=set(user_ids), deleted_at__isnull=True).values_list('user_id', 'id'))
+
+
+class Importer:
+    model = None
+
+    def __init__(self, pool=None):
+        self.pool = pool  # 비밀번호 해싱용 ProcessPoolExecutor (없으면 현재 프로세스에서)
+
+    def parse(self, row):
+        # 한 행 -> 모델 인스턴스 (RowError로 거부)
+        raise NotImplementedError
+
+    def prepare(self, batch):
+        # 배치 -> (저장할 인스턴스 목록, [(줄 번호, 오류), ...])
+        objs, errors = [], []
+        for line_number, row in batch:
+            try:
+                if row is None:
+                    raise RowError('JSON 객체가 아닙니다.')
+                objs.append((line_number, self.parse(row)))
+            except RowError as e:
+                errors.append((line_number, str(e)))
+        return objs, errors
+
+    def after_insert(self, objs):
+        pass
+
+    def import_batch(self, batch):
+        objs, errors = self.prepare(batch)
+        objs = [obj for _, obj in objs]
+        with transaction.atomic(), keep_created_at(self.model):
+            created = self.model.objects.bulk_create(objs)  # 한 INSERT 문의 행 수는 DB 변수 한도에 맞춰 자동으로 나뉨
+            self.after_insert(created)
+        return len(created), sorted(errors)
+
+
+class MemberImporter(Importer):
+    # 열: user_id, email, name, user_bir(YYYY-MM-DD), password 또는 password_hash, phone, pet_name, pet_type, created_at
+    model = Member
+
+    def parse(self, row):
+        user_id = _text(row, 'user_id', max_length=20)
+        email = BaseUserManager.normalize_email(_text(row, 'email', max_length=254))
+        try:
+            validate_email(email)
+        except ValidationError:
+            raise RowError('email 형식이 올바르지 않습니다.')
+        user_bir = _parsed(row, 'user_bir', parse_date)
+        pet_type = _text(row, 'pet_type', required=False) or Member.PetType.DOG
+        if pet_type not in Member.PetType.values:
+            raise RowError('pet_type 값이 올바르지 않습니다.')
+
+        password_hash = _text(row, 'password_hash', required=False)
+        if password_hash:
+            try:
+                identify_hasher(password_hash)
+            except ValueError:
+                raise RowError('password_hash를 확인할 수 없는 형식입니다.')
+        elif not _text(row, 'password', required=False):
+            raise RowError('password 값이 없습니다.')
+
+        member = Member(
+            user_id=user_id,
+            email=email,
+            name=_text(row, 'name', max_length=50),
+            user_bir=user_bir,
+            phone=_text(row, 'phone', max_length=15, required=False),
+            pet_name=_text(row, 'pet_name', max_length=50, required=False) or None,
+            pet_type=pet_type,
+            created_at=_created_at(row),
+            password=password_hash,
+        )
+        member.raw_password = None if password_hash else str(row['password'])  # 해싱 전 임시 보관
+        return member
+
+    def prepare(self, batch):
+        objs, errors = super().prepare(batch)
+        # 유니크 제약(user_id, email)을 INSERT 전에 확인: 배치 안 중복과 이미 가입한 회원
+        existing_ids = set(Member.objects.filter(user_id__in=[m.user_id for _, m in objs]).values_list('user_id', flat=True))
+        existing_emails = set(Member.objects.filter(email__in=[m.email for _, m in objs]).values_list('email', flat=True))
+        accepted = []
+        for line_number, member in objs:
+            if member.user_id in existing_ids:
+                errors.append((line_number, f'이미 사용 중인 user_id입니다: {member.user_id}'))
+            elif member.email in existing_emails:
+                errors.append((line_number, f'이미 사용 중인 email입니다: {member.email}'))
+            else:
+                existing_ids.add(member.user_id)
+                existing_emails.add(member.email)
+                accepted.append((line_number, member))
+
+        # 거부되지 않은 행만 해싱 (해싱이 가져오기 시간의 대부분)
+        pending = [member for _, member in accepted if member.raw_password is not None]
+        passwords = [member.raw_password for member in pending]
+        hashed = self.pool.map(make_password, passwords, chunksize=HASH_CHUNK_SIZE) if self.pool else map(make_password, passwords)
+        for member, password in zip(pending, hashed):
+            member.password = password
+        for _, member in accepted:
+            del member.raw_password
+        return accepted, errors
+
+    def after_insert(self, members):
+        # 프로필 조회 때 통계 행을 따로 만들지 않도록 0으로 미리 생성 (아이디 중복 확인 필터는 확인할 때 DB에서 새 회원을 읽음)
+        MemberStats.objects.bulk_create([MemberStats(member_id=member.pk) for member in members], ignore_conflicts=True)
+
+
+class FollowImporter(Importer):
+    # 열: follower, following (둘 다 user_id)
+    model = Follow
+
+    def parse(self, row):
+        follower, following = _text(row, 'follower'), _text(row, 'following')
+        if follower == following:
+            raise RowError('자기 자신은 팔로우할 수 없습니다.')
+        return Follow(follower_id=follower, following_id=following)  # prepare에서 user_id를 pk로 바꿈
+
+    def prepare(self, batch):
+        objs, errors = super().prepare(batch)
+        ids = member_ids([f.follower_id for _, f in objs] + [f.following_id for _, f in objs])
+        resolved = []
+        for line_number, follow in objs:
+            missing = [user_id for user_id in (follow.follower_id, follow.following_id) if user_id not in ids]
+            if missing:
+                errors.append((line_number, f'없는 회원입니다: {", ".join(missing)}'))
+                continue
+            follow.follower_id, follow.following_id = ids[follow.follower_id], ids[follow.following_id]
+            resolved.append((line_number, follow))
+
+        # unique_follow 제약을 INSERT 전에 확인
+        existing = set(Follow.objects.filter(
+            follower_id__in={f.follower_id for _, f in resolved}, following_id__in={f.following_id for _, f in resolved},
+        ).values_list('follower_id', 'following_id'))
+        accepted = []
+        for line_number, follow in resolved:
+            pair = (follow.follower_id, follow.following_id)
+            if pair in existing:
+                errors.append((line_number, '이미 팔로우한 관계입니다.'))
+            else:
+                existing.add(pair)
+                accepted.append((line_number, follow))
+        return accepted, errors
+
+    def after_insert(self, follows):
+        following_counts = Counter(follow.follower_id for follow in follows)
+        follower_counts = Counter(follow.following_id for follow in follows)
+        for member_id in following_counts.keys() | follower_counts.keys():
+            deltas = {'following_count': following_counts[member_id], 'follower_count': follower_counts[member_id]}
+            member_stats.adjust(member_id, **{field: delta for field, delta in deltas.items() if delta})
+        for follower_id in following_counts:
+            invalidate_followees(follower_id)
+        response_cache.invalidate('member', *(following_counts.keys() | follower_counts.keys()))
+
+
+class DiaryImporter(Importer):
+    # 열: member(user_id), photo(MEDIA_ROOT 기준 경로), content, is_public(public/followers/private), created_at
+    model = Diary
+
+    def parse(self, row):
+        is_public = _text(row, 'is_public', required=False) or Diary.PUBLIC
+        if is_public not in dict(Diary.VISIBILITY_CHOICES):
+            raise RowError('is_public 값이 올바르지 않습니다.')
+        created_at = _created_at(row)
+        return Diary(
+            member_id=_text(row, 'member'),
+            photo=_text(row, 'photo', max_length=100),
+            content=_text(row, 'content', max_length=100),
+            is_public=is_public,
+            created_at=created_at,
+            trending_score=trending_score(0, 0, created_at),  # 인기순 목록에 작성 시각 기준으로 들어가도록
+        )
+
+    def prepare(self, batch):
+        objs, errors = super().prepare(batch)
+        ids = member_ids([diary.member_id for _, diary in objs])
+        accepted = []
+        for line_number, diary in objs:
+            if diary.member_id not in ids:
+                errors.append((line_number, f'없는 회원입니다: {diary.member_id}'))
+            else:
+                diary.member_id = ids[diary.member_id]
+                accepted.append((line_number, diary))
+        return accepted, errors
+
+    def after_insert(self, diaries):
+        for member_id, count in Counter(diary.member_id for diary in diaries).items():
+            member_stats.adjust(member_id, post_count=count)
+        response_cache.invalidate('member', *{diary.member_id for diary in diaries})
+        fan_out_diaries(diaries)
+        if search_enabled():
+            with connection.cursor() as cursor:
+                search_index.insert_many(cursor, [
+                    (search_index.DIARY, diary.pk, search_index.document_text(diary.content), diary.created_at)
+                    for diary in diaries if diary.is_public == Diary.PUBLIC
+                ])
+
+
+class PostImporter(Importer):
+    # 열: user(user_id), title, content, tag(태그 이름), created_at
+    model = Post
+
+    def parse(self, row):
+        created_at = _created_at(row)
+        return Post(
+            user_id=_text(row, 'user'),
+            title=_text(row, 'title', max_length=50),
+            content=_text(row, 'content'),
+            tag=self.resolve_tag(_text(row, 'tag', max_length=20)),
+            created_at=created_at,
+            trending_score=trending_score(0, 0, created_at),
+        )
+
+    @staticmethod
+    def resolve_tag(name):
+        return tag_registry.resolve(name, TAG_NAME_PARTS.get(name, 'OTH'))
+
+    def prepare(self, batch):
+        objs, errors = super().prepare(batch)
+        ids = member_ids([post.user_id for _, post in objs])
+        accepted = []
+        for line_number, post in objs:
+            if post.user_id not in ids:
+                errors.append((line_number, f'없는 회원입니다: {post.user_id}'))
+            else:
+                post.user_id = post.member_id = ids[post.user_id]
+                post.tag_part = post.tag.part  # Post.save()에서 하던 동기화
+                accepted.append((line_number, post))
+        return accepted, errors
+
+    def after_insert(self, posts):
+        tag_counts.adjust(Counter(post.tag_part for post in posts))
+        if search_enabled():
+            with connection.cursor() as cursor:
+                search_index.insert_many(cursor, [
+                    (search_index.POST, post.pk, search_index.document_text(post.title, post.content), post.created_at)
+                    for post in posts
+                ])
+
+
+IMPORTERS = {
+    'members': MemberImporter,
+    'follows': FollowImporter,
+    'diaries': DiaryImporter,
+    'posts': PostImporter,
+}
@@ -0,0 +1,14 @@
+# 비밀번호 해셔
+# PBKDF2 반복 횟수를 settings.PASSWORD_HASH_ITERATIONS로 조절합니다. (없으면 Django 기본값)
+# 로그인 때 저장된 해시의 반복 횟수가 설정과 다르면 check_password가 새 설정으로 다시 해싱해서
+# password 필드만 저장하므로, 설정을 바꿔도 회원은 다음 로그인부터 자연스럽게 새 해시로 옮겨갑니다.
+# 반복 횟수를 낮추면 로그인 처리량이 늘지만 유출 시 대입 공격 비용도 같이 줄어듭니다.
+from django.conf import settings
+from django.contrib.auth.hashers import PBKDF2PasswordHasher
+
+
+class TunablePBKDF2PasswordHasher(PBKDF2PasswordHasher):
+    # algorithm 이름이 같으므로 기존 pbkdf2_sha256 해시도 그대로 확인됨
+    @property
+    def iterations(self):
+        return getattr(settings, 'PASSWORD_HASH_ITERATIONS', None) or PBKDF2PasswordHasher.iterations
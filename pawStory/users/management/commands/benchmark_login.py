@@ -0,0 +1,100 @@
+import os
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.contrib.auth import get_user_model
+from django.contrib.sessions.models import Session
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import override_settings
+from rest_framework.test import APIClient
+
+BENCH_USER_ID = 'bench_login'
+BENCH_PASSWORD = 'bench-login-password'
+
+
+class Command(BaseCommand):
+    help = (
+        'PBKDF2 반복 횟수별로 /users/login 처리량을 측정합니다. 측정용 회원을 만들었다가 끝나면 삭제하며, '
+        '로그인 중에 생긴 세션 행 수와 재해싱 여부도 함께 출력합니다. '
+        '기본으로 임시 SQLite 파일에 스키마를 만들어 측정하고 운영 DB는 건드리지 않습니다.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, nargs='+', default=[600000, 260000, 100000], help='비교할 반복 횟수')
+        parser.add_argument('--requests', type=int, default=50, help='반복 횟수마다 보낼 로그인 요청 수')
+        parser.add_argument('--concurrency', type=int, default=4, help='동시에 요청하는 스레드 수 (PBKDF2는 GIL을 놓음)')
+        parser.add_argument(
+            '--in-place', action='store_true',
+            help='임시 DB 대신 설정된 DB에서 측정 (디스크/PRAGMA 설정까지 포함해서 볼 때). 측정용 회원이 이미 있으면 실행하지 않음',
+        )
+
+    def handle(self, *args, **options):
+        if options['in_place']:
+            self.run(options)
+            return
+        with tempfile.TemporaryDirectory() as directory:
+            # 테스트 러너처럼 임시 파일에 마이그레이션을 적용하고 기본 연결을 그쪽으로 돌림 (요청 스레드의 새 연결도 같은 파일 사용)
+            connection.settings_dict.setdefault('TEST', {})['NAME'] = os.path.join(directory, 'bench.sqlite3')
+            old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+            try:
+                self.run(options)
+            finally:
+                connection.creation.destroy_test_db(old_name, verbosity=0)
+
+    def run(self, options):
+        User = get_user_model()
+        if User.objects.filter(user_id=BENCH_USER_ID).exists():
+            # 실제 회원일 수도 있으므로 지우지 않음
+            raise CommandError(f"'{BENCH_USER_ID}' 회원이 이미 있습니다. 다른 데이터베이스에서 실행하거나 직접 확인 후 정리하세요.")
+        user = User.objects.create_user(
+            email=f'{BENCH_USER_ID}@example.com', user_id=BENCH_USER_ID, name='bench', user_bir='2000-01-01',
+            password=BENCH_PASSWORD,
+        )
+        try:
+            for iterations in options['iterations']:
+                with override_settings(PASSWORD_HASH_ITERATIONS=iterations):
+                    user.set_password(BENCH_PASSWORD)
+                    user.save(update_fields=['password'])
+                    self._measure(iterations, options['requests'], options['concurrency'])
+        finally:
+            user.delete()
+        if len(options['iterations']) < 2:
+            return
+
+        # 설정과 다른 반복 횟수로 저장된 해시는 첫 로그인에서 한 번만 다시 해싱됨
+        with override_settings(PASSWORD_HASH_ITERATIONS=options['iterations'][-1]):
+            user = User.objects.create_user(
+                email=f'{BENCH_USER_ID}@example.com', user_id=BENCH_USER_ID, name='bench', user_bir='2000-01-01',
+                password=BENCH_PASSWORD,
+            )
+        try:
+            with override_settings(PASSWORD_HASH_ITERATIONS=options['iterations'][0]):
+                before = User.objects.get(pk=user.pk).password
+                self._login()  # 첫 로그인에서 password 필드만 다시 저장
+                after = User.objects.get(pk=user.pk).password
+            self.stdout.write(
+                f'재해싱: {before.split("$")[1]}회 -> {after.split("$")[1]}회 ({"완료" if before != after else "안 됨"})'
+            )
+        finally:
+            user.delete()
+
+    def _login(self):
+        started = time.perf_counter()
+        # 기본 호스트 이름(testserver)은 ALLOWED_HOSTS에 없어서 400이 되므로 localhost로 요청
+        response = APIClient(SERVER_NAME='localhost').post('/users/login', {'user_id': BENCH_USER_ID, 'password': BENCH_PASSWORD}, format='json')
+        return response.status_code, time.perf_counter() - started
+
+    def _measure(self, iterations, requests, concurrency):
+        sessions = Session.objects.count()
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            results = list(executor.map(lambda _: self._login(), range(requests)))
+        elapsed = time.perf_counter() - started
+        failed = sum(1 for code, _ in results if code != 200)
+        latency = sum(duration for _, duration in results) / requests
+        self.stdout.write(
+            f'반복 {iterations:,}회: {requests / elapsed:,.1f}건/초 (평균 {latency * 1000:.0f}ms/건), '
+            f'실패 {failed}건, 새 세션 {Session.objects.count() - sessions}개'
+        )
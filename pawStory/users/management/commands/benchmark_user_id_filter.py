@@ -0,0 +1,47 @@
+import random
+import string
+import sys
+import time
+
+from django.core.management.base import BaseCommand
+
+from users.bloom import BloomFilter
+
+
+class Command(BaseCommand):
+    help = '합성 아이디로 블룸 필터를 만들어 생성 시간, 메모리, 확인 처리량, 오탐률을 측정합니다. (DB는 사용하지 않음)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=10_000_000, help='가입자 수')
+        parser.add_argument('--checks', type=int, default=200_000, help='측정할 확인 횟수')
+        parser.add_argument('--error-rate', type=float, default=0.01, help='목표 오탐률')
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        users, checks = options['users'], options['checks']
+        rng = random.Random(options['seed'])
+
+        bloom = BloomFilter(users, options['error_rate'])
+        started = time.perf_counter()
+        for number in range(users):
+            bloom.add(f'user{number}')
+        elapsed = time.perf_counter() - started
+        self.stdout.write(
+            f'{users:,}명 추가: {elapsed:.1f}초 ({users / elapsed:,.0f}건/초), '
+            f'비트 배열 {bloom.nbytes / 1024 / 1024:.1f}MB (해시 {bloom.hash_count}개)'
+        )
+        # 비교용: 같은 아이디를 파이썬 set에 담을 때의 대략적인 크기 (문자열 + 해시 테이블 슬롯)
+        sample = f'user{users - 1}'
+        set_bytes = users * (sys.getsizeof(sample) + 2 * 8 * 2)
+        self.stdout.write(f'참고: 같은 아이디를 set으로 들고 있으면 약 {set_bytes / 1024 / 1024:,.0f}MB')
+
+        present = [f'user{rng.randrange(users)}' for _ in range(checks)]
+        absent = [''.join(rng.choices(string.ascii_lowercase, k=10)) for _ in range(checks)]
+        for label, values in (('가입된 아이디', present), ('새 아이디', absent)):
+            started = time.perf_counter()
+            hits = sum(1 for value in values if value in bloom)
+            elapsed = time.perf_counter() - started
+            self.stdout.write(
+                f'{label}: {checks / elapsed:,.0f}건/초 ({elapsed / checks * 1e6:.1f}µs/건), 필터 통과 {hits / checks:.2%}'
+            )
+        self.stdout.write(self.style.SUCCESS('새 아이디의 필터 통과 비율이 오탐률이며, 이 경우만 DB 조회가 필요합니다.'))
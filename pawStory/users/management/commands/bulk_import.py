@@ -0,0 +1,74 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import django
+from django.core.cache import caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.management.base import BaseCommand, CommandError
+
+from users.bulk_import import IMPORTERS, batches, read_rows
+
+MAX_REPORTED_ERRORS = 20
+
+
+class Command(BaseCommand):
+    help = (
+        'CSV/JSONL 파일에서 회원(members), 팔로우(follows), 일기(diaries), 게시물(posts)을 일괄로 가져옵니다. '
+        '파일을 한 줄씩 읽어 배치마다 검사 후 bulk_create로 저장하고, 배치별/전체 처리 속도를 출력합니다. '
+        '회원 -> 팔로우 -> 일기/게시물 순서로 가져오세요. 열 형식은 users/bulk_import.py를 참고하세요.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('kind', choices=sorted(IMPORTERS), help='가져올 데이터 종류')
+        parser.add_argument('path', help='CSV 또는 JSONL(.jsonl/.ndjson) 파일 경로')
+        parser.add_argument('--format', choices=['csv', 'jsonl'], help='파일 형식 (기본: 확장자로 판단)')
+        parser.add_argument('--batch-size', type=int, default=2000, help='한 트랜잭션에 저장할 행 수')
+        parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='비밀번호 해싱 프로세스 수 (1이면 현재 프로세스에서)')
+        parser.add_argument(
+            '--allow-local-cache', action='store_true',
+            help='캐시를 공유하지 않는 설정(locmem 등)에서도 실행. 웹 워커가 아직 캐시를 채우지 않은 첫 적재 때만 사용하세요',
+        )
+
+    def handle(self, *args, **options):
+        if not os.path.exists(options['path']):
+            raise CommandError(f'파일이 없습니다: {options["path"]}')
+        if isinstance(caches['default'], (LocMemCache, DummyCache)) and not options['allow_local_cache']:
+            # 팔로우 목록/응답 캐시 무효화는 이 프로세스의 캐시에만 기록되어 웹 워커에는 캐시가 만료될 때까지 예전 값이 남음
+            raise CommandError(
+                '기본 캐시가 이 프로세스 안에만 있어서 웹 워커의 캐시를 무효화할 수 없습니다. '
+                '파일 기반 캐시처럼 웹 워커와 공유하는 캐시로 설정하거나, 웹 워커를 띄우기 전이면 --allow-local-cache를 붙이세요.'
+            )
+        pool = None
+        if options['kind'] == 'members' and options['workers'] > 1:
+            pool = ProcessPoolExecutor(max_workers=options['workers'], initializer=django.setup)
+        importer = IMPORTERS[options['kind']](pool)
+
+        created, rejected, reported = 0, 0, 0
+        started = time.perf_counter()
+        try:
+            rows = read_rows(options['path'], options['format'])
+            for number, batch in enumerate(batches(rows, options['batch_size']), start=1):
+                clock = time.perf_counter()
+                count, errors = importer.import_batch(batch)
+                elapsed = time.perf_counter() - clock
+                created += count
+                rejected += len(errors)
+                for line_number, message in errors[:max(0, MAX_REPORTED_ERRORS - reported)]:
+                    self.stderr.write(f'{line_number}번째 줄: {message}')
+                reported += len(errors)
+                self.stdout.write(
+                    f'배치 {number}: {count}개 저장, {len(errors)}개 거부 ({len(batch) / elapsed:,.0f}행/초, 누적 {created:,}개)'
+                )
+        finally:
+            if pool is not None:
+                pool.shutdown()
+
+        elapsed = time.perf_counter() - started
+        if reported > MAX_REPORTED_ERRORS:
+            self.stderr.write(f'... 거부된 행 {reported - MAX_REPORTED_ERRORS}개 더 있음')
+        self.stdout.write(self.style.SUCCESS(
+            f'{options["kind"]}: {created:,}개 저장, {rejected:,}개 거부, {elapsed:.1f}초 '
+            f'({(created + rejected) / elapsed if elapsed else 0:,.0f}행/초)'
+        ))
@@ -0,0 +1,54 @@
+from django.contrib.auth import SESSION_KEY, get_user_model
+from django.contrib.sessions.models import Session
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+
+class Command(BaseCommand):
+    help = (
+        '로그인/회원가입 때마다 쌓였던 django_session 행을 정리합니다. API는 JWT만 사용하므로 세션이 필요 없고, '
+        '기본값으로는 만료된 세션과 관리자(is_staff)가 아닌 회원의 세션을 지웁니다.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--all', action='store_true', help='관리자 페이지 세션까지 모두 삭제')
+        parser.add_argument('--batch-size', type=int, default=1000, help='한 번에 삭제할 세션 수')
+        parser.add_argument('--dry-run', action='store_true', help='삭제하지 않고 개수만 출력')
+
+    def handle(self, *args, **options):
+        batch_size, dry_run = options['batch_size'], options['dry_run']
+
+        # 만료된 세션은 내용 확인 없이 삭제 (session_key로 잘라서 긴 잠금을 피함)
+        expired = Session.objects.filter(expire_date__lt=timezone.now())
+        removed = self._delete(expired, batch_size, dry_run)
+        self.stdout.write(f'만료된 세션 {removed}개 {"삭제 예정" if dry_run else "삭제"}')
+
+        staff_ids = set() if options['all'] else {
+            str(pk) for pk in get_user_model().objects.filter(is_staff=True).values_list('pk', flat=True)
+        }
+        live = Session.objects.filter(expire_date__gte=timezone.now())
+        removed, kept, last_key = 0, 0, ''
+        while True:
+            rows = list(live.filter(session_key__gt=last_key).order_by('session_key')[:batch_size])
+            if not rows:
+                break
+            last_key = rows[-1].session_key
+            stale = [row.session_key for row in rows if str(row.get_decoded().get(SESSION_KEY)) not in staff_ids]
+            kept += len(rows) - len(stale)
+            removed += len(stale)
+            if stale and not dry_run:
+                Session.objects.filter(session_key__in=stale).delete()
+
+        self.stdout.write(self.style.SUCCESS(
+            f'회원 세션 {removed}개 {"삭제 예정" if dry_run else "삭제"}, 관리자 세션 {kept}개 유지'
+        ))
+
+    def _delete(self, queryset, batch_size, dry_run):
+        if dry_run:
+            return queryset.count()
+        removed = 0
+        while True:
+            keys = list(queryset.values_list('session_key', flat=True)[:batch_size])
+            if not keys:
+                return removed
+            removed += Session.objects.filter(session_key__in=keys).delete()[0]
@@ -68,10 +68,13 @@ class Member(AbstractBaseUser, PermissionsMixin): # 사용자 모델 정의
         blank=True
     )
     pet_photo = models.ImageField(upload_to='pet_photos/', null=True, blank=True)
+    pet_photo_renditions = models.JSONField(default=dict, blank=True) # 반려동물 사진 파생본(너비별 WebP/JPEG) 경로
     user_bir = models.DateField()
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True) # 프로필이 마지막으로 바뀐 시각 (조건부 GET 검증자)
     is_active = models.BooleanField(default=True)
     is_staff = models.BooleanField(default=False)
+    deleted_at = models.DateTimeField(null=True, blank=True) # 탈퇴 표시 일자 (백그라운드에서 실제 삭제)
 
     objects = CustomUserManager()
 
@@ -85,4 +88,14 @@ class Member(AbstractBaseUser, PermissionsMixin): # 사용자 모델 정의
         return self.name
 
     def get_short_name(self):
-        return self.name
\ No newline at end of file
+        return self.name
+
+    def refresh_from_db(self, using=None, fields=None, **kwargs):
+        # 토큰 클레임으로 만든 회원(users/authentication.py)은 처음 접근한 필드가 생기면 나머지 필드를 캐시된 행에서 한 번에 채움
+        if fields is not None and getattr(self, '_from_claims', False) and set(fields) <= self.get_deferred_fields():
+            from .authentication import fill_deferred
+
+            self._from_claims = False
+            if fill_deferred(self):
+                return
+        super().refresh_from_db(using, fields, **kwargs)
\ No newline at end of file
@@ -11,8 +11,9 @@ class SignUpSerializer(serializers.ModelSerializer): #이때는 반려동물정
         fields = ('id','user_id', 'email', 'name', 'user_bir', 'password','phone')
     
     # 유효성 검사를 통과한 데이터를 사용하여 새로운 사용자 인스턴스를 생성
+    # 비밀번호를 먼저 해싱한 뒤 한 번만 저장 (INSERT 한 번)
     def create(self, validated_data):
-        user = Member.objects.create(
+        user = Member(
             user_id=validated_data['user_id'],
             email=validated_data['email'],
             name=validated_data['name'],
@@ -21,7 +22,7 @@ class SignUpSerializer(serializers.ModelSerializer): #이때는 반려동물정
             
         )
         user.set_password(validated_data['password']) # 비밀번호 해싱
-        user.save()
+        user.save(force_insert=True)
         return user
     
 # 반려동물 정보 시리얼라이저    
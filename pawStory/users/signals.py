@@ -0,0 +1,63 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from community.models import PostComment
+from diaries.models import DiaryComment, DiaryLike
+from pawStory import response_cache
+from pawStory.renditions import renditions_saved, schedule_renditions
+from .authentication import mark_inactive, member_cache
+from .bloom import user_id_filter
+from .models import Member
+
+
+@receiver(post_save, sender=Member)
+def create_pet_photo_renditions(sender, instance, update_fields=None, **kwargs):
+    # 로그인 시각 갱신 등 사진과 무관한 저장은 건너뜀
+    if update_fields is None or 'pet_photo' in update_fields:
+        schedule_renditions(instance, 'pet_photo', 'pet_photo_renditions')
+
+
+def invalidate_activity_responses(member_id):
+    # 회원 프로필이 좋아요/댓글 미리보기로 들어가는 일기/게시물 응답을 무효화 (프로필 수정, 탈퇴 시)
+    commented = set(DiaryComment.objects.filter(member_id=member_id).values_list('diary_id', flat=True))
+    liked = DiaryLike.objects.filter(member_id=member_id).values_list('diary_id', flat=True)
+    response_cache.invalidate('diary', *commented.union(liked))
+    response_cache.invalidate('diary_comments', *commented)
+    posts = set(PostComment.objects.filter(user_id=member_id).values_list('post_id', flat=True))
+    response_cache.invalidate('post', *posts)
+    response_cache.invalidate('post_comments', *posts)
+
+
+@receiver(post_save, sender=Member)
+@receiver(post_delete, sender=Member)
+def invalidate_member_responses(sender, instance, update_fields=None, created=False, **kwargs):
+    # 로그인 시각이나 비밀번호 해시(로그인 시 재해싱)만 바뀐 저장은 응답 내용과 무관
+    if update_fields is not None and set(update_fields) <= {'last_login', 'password'}:
+        return
+    response_cache.invalidate('member', instance.pk)
+    if not created and kwargs.get('signal') is post_save:  # 삭제는 purge가 좋아요/댓글을 먼저 지우며 무효화
+        invalidate_activity_responses(instance.pk)
+
+
+@receiver(renditions_saved, sender=Member)
+def invalidate_pet_photo_responses(sender, pk, **kwargs):
+    # 반려동물 사진 축소본이 프로필, 작성한 글, 좋아요/댓글 미리보기에 들어감 (UPDATE로 저장해서 post_save 없음)
+    response_cache.invalidate('member', pk)
+    invalidate_activity_responses(pk)
+    member_cache.discard(pk)
+
+
+@receiver(post_save, sender=Member)
+def add_user_id_to_filter(sender, instance, created=False, update_fields=None, **kwargs):
+    # 이 프로세스의 가입자와 아이디 변경은 바로 반영 (다른 프로세스의 가입자는 필터가 주기적으로 DB에서 읽음)
+    if created or update_fields is None or 'user_id' in update_fields:
+        user_id_filter.add(instance.user_id)
+
+
+@receiver(post_save, sender=Member)
+@receiver(post_delete, sender=Member)
+def invalidate_auth_cache(sender, instance, **kwargs):
+    # 인증용 회원 캐시를 비우고, 비활성화/탈퇴한 회원의 토큰은 거부
+    member_cache.discard(instance.pk)
+    if kwargs.get('signal') is post_delete or not instance.is_active:  # 탈퇴 표시는 tombstone_member에서 처리
+        mark_inactive(instance.pk)
@@ -1,3 +1,400 @@
-from django.test import TestCase
+import io
+import os
+import tempfile
+import time
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth import SESSION_KEY
+from django.contrib.sessions.backends.db import SessionStore
+from django.contrib.sessions.models import Session
+from django.core import checks
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.http import HttpResponse
+from django.db import connection
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.tokens import AccessToken
+
+from accounts.models import MemberStats
+from accounts.purge import tombstone_member
+from diaries.models import Diary, Follow, TimelineEntry
+from diaries.tests import create_member
+from pawStory import routers
+from .authentication import ClaimsJWTAuthentication, member_cache, tokens_for
+from . import bloom
+from .bloom import BloomFilter, UserIdFilter
+from .models import Member
+
+
+class BloomFilterTests(TestCase):
+    def test_added_values_are_always_found(self):
+        bloom = BloomFilter(1000)
+        values = [f'user{number}' for number in range(1000)]
+        for value in values:
+            bloom.add(value)
+        self.assertTrue(all(value in bloom for value in values))
+        false_positives = sum(f'other{number}' in bloom for number in range(10000))
+        self.assertLess(false_positives, 300)  # 설계 오탐률 1%
+
+
+class UserIdFilterTests(TestCase):
+    def setUp(self):
+        self.filter = UserIdFilter()
+        self.enterContext(mock.patch('users.views.user_id_filter', self.filter))
+        self.enterContext(mock.patch('users.signals.user_id_filter', self.filter))
+        self.start_catch_up = self.enterContext(mock.patch.object(self.filter, '_start_catch_up'))  # 스레드 대신 직접 호출
+        create_member('existing')
+
+    def build(self):
+        # 백그라운드 스레드 대신 테스트 연결에서 바로 만듦 (테스트 트랜잭션의 연결은 닫지 않음)
+        with mock.patch('users.bloom.connections'):
+            self.filter._build()
+
+    def available(self, user_id):
+        response = self.client.post('/users/check_user_id', {'user_id': user_id}, content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+        return response.json()['available']
+
+    def test_checks_go_to_db_until_built(self):
+        with mock.patch.object(self.filter, '_start_build') as start_build:
+            self.assertTrue(self.filter.might_exist('anything'))
+            self.assertFalse(self.available('existing'))
+            self.assertTrue(self.available('fresh'))
+        start_build.assert_called()
+
+    def test_available_answers_skip_the_database(self):
+        self.build()
+        with CaptureQueriesContext(connection) as queries:
+            self.assertTrue(self.available('fresh'))
+        self.assertEqual(queries.captured_queries, [])
+        with self.assertNumQueries(1):
+            self.assertFalse(self.available('existing'))  # 있을 수도 있다고 나오면 인덱스로 확인
+        self.start_catch_up.assert_not_called()
+
+    def test_signups_in_this_process_are_added_immediately(self):
+        self.build()
+        create_member('signed_up')
+        member = Member.objects.get(user_id='existing')
+        member.user_id = 'renamed'
+        member.save()
+        self.assertTrue(self.filter.might_exist('signed_up'))
+        self.assertFalse(self.available('renamed'))
+
+    def test_members_from_other_processes_are_caught_up_periodically(self):
+        self.build()
+        Member.objects.bulk_create([
+            Member(email=f'bulk{number}@example.com', user_id=f'bulk{number}', name='bulk', user_bir='2000-01-01')
+            for number in range(3)
+        ])  # 시그널 없는 일괄 가져오기나 다른 프로세스의 가입
+        self.filter.might_exist('bulk0')
+        self.start_catch_up.assert_not_called()  # 주기가 지나기 전에는 지금 필터로 답함
+
+        with mock.patch('users.bloom.time.monotonic', return_value=time.monotonic() + bloom.CATCH_UP_SECONDS + 1):
+            self.filter.might_exist('bulk0')
+        self.start_catch_up.assert_called_once()
+        self.filter._catch_up()
+        for user_id in ('existing', 'bulk0', 'bulk1', 'bulk2'):
+            self.assertFalse(self.available(user_id), user_id)
+        self.assertEqual(self.filter._last_id, Member.objects.order_by('-id').values_list('id', flat=True)[0])
+
+    def test_watermark_only_moves_to_rows_read(self):
+        self.build()
+        last_id = self.filter._last_id
+        with mock.patch('users.models.Member.objects.filter', wraps=Member.objects.filter) as query:
+            self.filter._catch_up()
+        query.assert_called_once_with(id__gt=last_id)
+        self.assertEqual(self.filter._last_id, last_id)  # 새 행이 없으면 그대로
+
+        member = create_member('later')
+        self.filter._catch_up()
+        self.assertEqual(self.filter._last_id, member.id)
+
+    def test_ids_of_purged_members_are_not_reused(self):
+        # 가장 큰 id가 다시 쓰이면 기준 id 이하라 따라잡기에서 빠지므로 AUTOINCREMENT에 의존
+        newest = create_member('newest')
+        Member.objects.filter(pk=newest.pk).delete()
+        self.assertGreater(create_member('next').pk, newest.pk)
+
+
+class ClaimsAuthenticationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        member_cache.clear()
+        self.addCleanup(member_cache.clear)
+        self.member = create_member('member')
+        self.token = AccessToken(str(tokens_for(self.member).access_token))  # 요청에서처럼 검증된 토큰
+
+    def authenticate(self):
+        return ClaimsJWTAuthentication().get_user(self.token)
+
+    def assertRejected(self, code):
+        with self.assertRaises(AuthenticationFailed) as context:
+            self.authenticate()
+        self.assertEqual(context.exception.detail['code'], code)
+
+    def test_member_is_built_from_claims_without_queries(self):
+        self.authenticate()  # 회원 행을 캐시에 올림
+        with self.assertNumQueries(0):
+            member = self.authenticate()
+            self.assertEqual((member.pk, member.user_id, member.is_active), (self.member.pk, 'member', True))
+        with self.assertNumQueries(0):
+            self.assertEqual(member.email, 'member@example.com')  # 나머지 필드는 캐시된 행에서 채움
+
+    def test_api_request_with_token(self):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.token}')
+        self.assertEqual(client.get(f'/accounts/{self.member.pk}').status_code, 200)
+        client.credentials(HTTP_AUTHORIZATION='Bearer broken')
+        self.assertEqual(client.get(f'/accounts/{self.member.pk}').status_code, 401)
+
+    def test_tombstone_in_this_process_is_rejected_immediately(self):
+        self.authenticate()
+        with self.captureOnCommitCallbacks(execute=True):
+            tombstone_member(self.member)
+        self.assertRejected('user_inactive')
+
+    def test_deactivation_in_another_process_is_rejected_after_ttl(self):
+        # 다른 프로세스의 변경: 이 프로세스의 시그널도 Django 캐시 표시도 없이 DB만 바뀜
+        self.authenticate()
+        Member.objects.filter(pk=self.member.pk).update(is_active=False)
+        self.authenticate()  # 캐시된 행이 만료되기 전까지는 통과
+        with mock.patch('users.authentication.time.monotonic', return_value=time.monotonic() + member_cache.ttl + 1):
+            self.assertRejected('user_inactive')  # 토큰의 is_active 클레임은 True지만 현재 행을 따름
+
+    def test_deleted_at_is_rejected(self):
+        Member.objects.filter(pk=self.member.pk).update(deleted_at=timezone.now())
+        self.assertRejected('user_inactive')
+
+    def test_missing_member_is_rejected(self):
+        Member.objects.filter(pk=self.member.pk).delete()
+        cache.clear()  # 다른 프로세스에서 삭제된 경우처럼 Django 캐시 표시 없이
+        self.assertRejected('user_not_found')
+
+
+@override_settings(PASSWORD_HASH_ITERATIONS=1000)
+class BulkImportTests(TestCase):
+    def setUp(self):
+        self.directory = self.enterContext(tempfile.TemporaryDirectory())
+
+    def run_import(self, kind, lines, **options):
+        path = os.path.join(self.directory, f'{kind}.csv')
+        with open(path, 'w', encoding='utf-8') as file:
+            file.write('\n'.join(lines) + '\n')
+        stdout, stderr = io.StringIO(), io.StringIO()
+        options = {'workers': 1, 'allow_local_cache': True, **options}
+        call_command('bulk_import', kind, path, stdout=stdout, stderr=stderr, **options)
+        return stderr.getvalue()
+
+    def test_members_are_validated_before_insert(self):
+        create_member('existing')
+        errors = self.run_import('members', [
+            'user_id,email,name,user_bir,password,pet_type',
+            'alice,alice@example.com,앨리스,2000-01-01,password1234,',
+            'bob,not-an-email,밥,2000-01-01,password1234,',
+            'carol,carol@example.com,캐롤,2000-13-01,password1234,',
+            'dave,dave@example.com,데이브,2000-01-01,,',
+            'erin,erin@example.com,에린,2000-01-01,password1234,HAMSTER',
+            'existing,new@example.com,중복,2000-01-01,password1234,',
+            'frank,existing@example.com,중복,2000-01-01,password1234,',
+            'alice,alice2@example.com,중복,2000-01-01,password1234,',
+        ])
+        self.assertEqual(errors.splitlines(), [
+            '3번째 줄: email 형식이 올바르지 않습니다.',
+            '4번째 줄: user_bir 형식이 올바르지 않습니다.',
+            '5번째 줄: password 값이 없습니다.',
+            '6번째 줄: pet_type 값이 올바르지 않습니다.',
+            '7번째 줄: 이미 사용 중인 user_id입니다: existing',
+            '8번째 줄: 이미 사용 중인 email입니다: existing@example.com',
+            '9번째 줄: 이미 사용 중인 user_id입니다: alice',
+        ])
+        alice = Member.objects.get(user_id='alice')
+        self.assertTrue(alice.check_password('password1234'))
+        self.assertEqual(alice.pet_type, Member.PetType.DOG)
+        self.assertTrue(MemberStats.objects.filter(member=alice).exists())
+        self.assertEqual(Member.objects.count(), 2)
+
+    def test_follows_resolve_user_ids_and_update_stats(self):
+        alice, bob = create_member('alice'), create_member('bob')
+        errors = self.run_import('follows', [
+            'follower,following',
+            'alice,bob',
+            'alice,alice',
+            'alice,ghost',
+            'alice,bob',
+            'bob,alice',
+        ])
+        self.assertEqual(errors.splitlines(), [
+            '3번째 줄: 자기 자신은 팔로우할 수 없습니다.',
+            '4번째 줄: 없는 회원입니다: ghost',
+            '5번째 줄: 이미 팔로우한 관계입니다.',
+        ])
+        self.assertEqual(set(Follow.objects.values_list('follower_id', 'following_id')), {(alice.pk, bob.pk), (bob.pk, alice.pk)})
+        stats = MemberStats.objects.get(member=alice)
+        self.assertEqual((stats.follower_count, stats.following_count), (1, 1))
+
+    def test_diaries_are_fanned_out_to_followers(self):
+        author, follower = create_member('author'), create_member('follower')
+        Follow.objects.create(follower=follower, following=author)
+        errors = self.run_import('diaries', [
+            'member,photo,content,is_public',
+            'author,diaries/a.jpg,공개 일기,public',
+            'author,diaries/b.jpg,비공개 일기,private',
+            'author,diaries/c.jpg,잘못된 범위,everyone',
+            'ghost,diaries/d.jpg,없는 회원,public',
+        ])
+        self.assertEqual(errors.splitlines(), [
+            '4번째 줄: is_public 값이 올바르지 않습니다.',
+            '5번째 줄: 없는 회원입니다: ghost',
+        ])
+        public = Diary.objects.get(content='공개 일기')
+        self.assertEqual(Diary.objects.filter(member=author).count(), 2)
+        self.assertEqual(set(TimelineEntry.objects.filter(diary=public).values_list('owner_id', flat=True)), {author.pk, follower.pk})
+        self.assertFalse(TimelineEntry.objects.filter(diary__content='비공개 일기').exclude(owner=author).exists())
+        self.assertEqual(MemberStats.objects.get(member=author).post_count, 2)
+
+    def test_process_local_cache_requires_opt_in(self):
+        with self.assertRaisesMessage(CommandError, '--allow-local-cache'):
+            self.run_import('members', ['user_id,email,name,user_bir,password'], allow_local_cache=False)
+
+
+@override_settings(REPLICA_DATABASES=['replica1'])
+class ReplicaRoutingTests(SimpleTestCase):
+    # TestCase는 테스트를 atomic 블록으로 감싸서 모든 읽기가 기본 DB로 가므로 DB 없이 라우팅만 확인
+    def setUp(self):
+        cache.clear()
+        self.router = routers.PrimaryReplicaRouter()
+        self.middleware = routers.ReplicaRoutingMiddleware(self.view)
+        self.factory = RequestFactory()
+
+    def view(self, request):
+        # 인증처럼 회원을 알린 뒤 읽기가 어느 DB로 가는지 응답으로 돌려줌
+        routers.bind_user(request.member_id)
+        read_from = self.router.db_for_read(Member)
+        if request.method == 'POST':
+            self.router.db_for_write(Member)
+        return HttpResponse(read_from)
+
+    def read_from(self, method, member_id):
+        request = getattr(self.factory, method)('/')
+        request.member_id = member_id
+        return self.middleware(request).content.decode()
+
+    def test_reads_go_to_the_replica_until_the_member_writes(self):
+        self.assertEqual(self.read_from('get', 1), 'replica1')
+        self.assertEqual(self.read_from('post', 1), 'default')
+        self.assertEqual(self.read_from('get', 1), 'default')  # 고정 시간 동안은 방금 쓴 내용을 봄
+        self.assertEqual(self.read_from('get', 2), 'replica1')  # 다른 회원은 그대로
+
+    def test_pin_expires(self):
+        routers.pin_primary(1)
+        self.assertEqual(self.read_from('get', 1), 'default')
+        cache.delete(routers.PIN_KEY.format(user_id=1))  # REPLICA_PIN_SECONDS가 지난 것처럼
+        self.assertEqual(self.read_from('get', 1), 'replica1')
+
+    def test_reads_after_a_write_in_the_same_request_use_the_primary(self):
+        token = routers._state.set(routers.RoutingState('replica1', primary=False))
+        self.addCleanup(routers._state.reset, token)
+        self.assertEqual(self.router.db_for_read(Member), 'replica1')
+        with routers.use_primary():
+            self.assertEqual(self.router.db_for_read(Member), 'default')
+        self.assertEqual(self.router.db_for_read(Member), 'replica1')
+        self.router.db_for_write(Member)
+        self.assertEqual(self.router.db_for_read(Member), 'default')
+
+    def test_tokens_pin_the_member(self):
+        member = Member(pk=7, user_id='member', email='member@example.com', name='member')
+        tokens_for(member)  # 로그인/가입 응답
+        self.assertEqual(self.read_from('get', member.pk), 'default')
+
+    def test_outside_requests_use_the_primary(self):
+        self.assertEqual(self.router.db_for_read(Member), 'default')
+
+    def test_check_requires_a_shared_cache(self):
+        errors = routers.check_shared_cache(None)
+        self.assertEqual([error.id for error in errors], ['pawStory.E001'])
+        with tempfile.TemporaryDirectory() as location:
+            with override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache', 'LOCATION': location}}):
+                self.assertEqual(routers.check_shared_cache(None), [])
+        with override_settings(REPLICA_DATABASES=[]):
+            self.assertEqual(routers.check_shared_cache(None), [])
+        self.assertIn(routers.check_shared_cache, checks.registry.registry.registered_checks)
+
+
+@override_settings(PASSWORD_HASH_ITERATIONS=1000)
+class SessionlessLoginTests(TestCase):
+    def login(self, user_id, password='password1234'):
+        return self.client.post('/users/login', {'user_id': user_id, 'password': password}, content_type='application/json')
+
+    def test_signup_is_one_insert_without_session(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post('/users/signup', {
+                'user_id': 'newbie', 'email': 'newbie@example.com', 'name': 'newbie', 'user_bir': '2000-01-01', 'password': 'password1234',
+            }, content_type='application/json')
+        self.assertEqual(response.status_code, 201)
+        member_writes = [query['sql'] for query in queries.captured_queries if query['sql'].startswith(('INSERT INTO "users_member"', 'UPDATE "users_member"'))]
+        self.assertEqual(len(member_writes), 1)
+        self.assertTrue(member_writes[0].startswith('INSERT'))
+        self.assertTrue(Member.objects.get(user_id='newbie').check_password('password1234'))
+        self.assertFalse(Session.objects.exists())
+
+    def test_login_issues_tokens_without_session(self):
+        create_member('member')
+        response = self.login('member')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('access_token', response.json())
+        self.assertFalse(Session.objects.exists())
+        self.assertEqual(self.login('member', 'wrong').status_code, 401)
+
+    def test_login_rehashes_when_iterations_change(self):
+        member = create_member('member')  # 1000회로 해싱됨
+        self.assertTrue(member.password.startswith('pbkdf2_sha256$1000$'))
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(self.login('member').status_code, 200)
+        self.assertFalse(any(query['sql'].startswith('UPDATE "users_member"') for query in queries.captured_queries))  # 설정과 같으면 그대로
+
+        with override_settings(PASSWORD_HASH_ITERATIONS=2000):
+            self.assertEqual(self.login('member').status_code, 200)
+        member.refresh_from_db()
+        self.assertTrue(member.password.startswith('pbkdf2_sha256$2000$'))
+        self.assertTrue(member.check_password('password1234'))
+
+
+class PurgeSessionsTests(TestCase):
+    def setUp(self):
+        self.staff = create_member('staff')
+        Member.objects.filter(pk=self.staff.pk).update(is_staff=True)
+        self.staff_session = self.session(self.staff)
+        self.member_session = self.session(create_member('member'))
+        self.expired_session = self.session(self.staff, expiry=-60)
+
+    def session(self, member, expiry=None):
+        store = SessionStore()
+        store[SESSION_KEY] = str(member.pk)
+        if expiry is not None:
+            store.set_expiry(expiry)
+        store.create()
+        return store.session_key
+
+    def purge(self, *args):
+        stdout = io.StringIO()
+        call_command('purge_sessions', *args, stdout=stdout)
+        return stdout.getvalue()
+
+    def test_dry_run_deletes_nothing(self):
+        output = self.purge('--dry-run')
+        self.assertIn('만료된 세션 1개 삭제 예정', output)
+        self.assertIn('회원 세션 1개 삭제 예정, 관리자 세션 1개 유지', output)
+        self.assertEqual(Session.objects.count(), 3)
+
+    def test_staff_sessions_are_kept(self):
+        self.purge('--batch-size', '1')
+        self.assertEqual(list(Session.objects.values_list('session_key', flat=True)), [self.staff_session])
+
+    def test_all_removes_staff_sessions(self):
+        self.purge('--all')
+        self.assertFalse(Session.objects.exists())
@@ -1,9 +1,10 @@
-from django.contrib.auth import login, authenticate, get_user_model
+from django.contrib.auth import authenticate, get_user_model
 from rest_framework import status
 from rest_framework.response import Response
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import AllowAny, IsAuthenticated
-from rest_framework_simplejwt.tokens import RefreshToken
+from .authentication import access_token_for, tokens_for
+from .bloom import user_id_filter
 from .serializers import SignUpSerializer, PetInfoSerializer, LoginSerializer ,CheckUserIDSerializer
 from django.views.decorators.csrf import csrf_exempt
 from drf_yasg.utils import swagger_auto_schema
@@ -13,11 +14,9 @@ User = get_user_model()
 
 # 임시 토큰 생성 함수
 def create_temp_access_token(user):
-    from rest_framework_simplejwt.tokens import AccessToken
     from datetime import timedelta
     
-    access = AccessToken.for_user(user)
-    access.set_exp(lifetime=timedelta(minutes=5))  # 임시 토큰의 만료 시간을 5분으로 설정
+    access = access_token_for(user, lifetime=timedelta(minutes=5))  # 임시 토큰의 만료 시간을 5분으로 설정
     return str(access)
 
 # 회원가입을 처리하는 API 뷰
@@ -40,9 +39,8 @@ def signup_view(request):
         serializer = SignUpSerializer(data=request.data)
 
         if serializer.is_valid():  # 데이터가 유효할 때
-            user = serializer.save()  # 사용자 생성
-            login(request, user)  # 사용자 로그인
-            print("User created and logged in:", user)  # 로그 추가
+            user = serializer.save()  # 사용자 생성 (세션 로그인 없이 토큰만 발급)
+            print("User created:", user)  # 로그 추가
             
             # 임시 토큰 생성 펫 정보 입력 할 때 유효한 토큰 발급
             temp_access_token = create_temp_access_token(user)
@@ -90,7 +88,8 @@ def pet_info_view(request):
             user.pet_name = validated_data.get('pet_name')
             user.pet_type = validated_data.get('pet_type')
             user.pet_photo = validated_data.get('pet_photo')
-            user.save()
+            # request.user는 토큰 클레임으로 만든 회원이라 바뀐 필드만 저장
+            user.save(update_fields=['pet_name', 'pet_type', 'pet_photo', 'updated_at'])
             return Response(serializer.data, status=status.HTTP_200_OK)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
@@ -124,10 +123,11 @@ def login_view(request):
             user = authenticate(request, username=user_id, password=password)
 
             if user is not None: # 사용자 인증 성공
-                login(request, user) # 사용자 로그인
+                # 클라이언트는 JWT만 사용하므로 세션(django_session)은 만들지 않음
+                # 저장된 비밀번호 해시가 현재 해셔 설정과 다르면 authenticate 안에서 다시 해싱됨 (users/hashers.py)
 
                 # 정식 JWT 토큰 생성
-                refresh = RefreshToken.for_user(user)  # RefreshToken 객체 생성
+                refresh = tokens_for(user)  # RefreshToken 객체 생성 (회원 아이디/활성 여부/사진 클레임 포함)
                 access_token = str(refresh.access_token)  # 액세스 토큰 추출
                 refresh_token = str(refresh)  # 리프레시 토큰 추출
 
@@ -167,7 +167,8 @@ def check_user_id(request):
     serializer = CheckUserIDSerializer(data=request.data)
     if serializer.is_valid():
         user_id = serializer.validated_data['user_id']
-        if User.objects.filter(user_id=user_id).exists():
+        # 블룸 필터에 없으면 확실히 사용 가능 (DB 조회 생략), 있을 수도 있으면 인덱스로 확인
+        if user_id_filter.might_exist(user_id) and User.objects.filter(user_id=user_id).exists():
             return Response({'available': False}, status=status.HTTP_200_OK)
         else:
             return Response({'available': True}, status=status.HTTP_200_OK)